@@ -0,0 +1,100 @@
+# import libs
+import time
+import json
+from rich import print
+from fastapi.encoders import jsonable_encoder
+from langchain_core.messages import (
+    HumanMessage,
+    AIMessage,
+    ToolMessage
+)
+# local
+from pythermoai.models import ChatMessage
+from pythermoai.utils import (
+    agent_message_analyzer,
+    encode_chat_message,
+    encode_agent_message
+)
+from pythermoai.utils.serialization import JSON_BACKEND
+
+# SECTION: inputs
+# number of messages in the thread
+MESSAGES = 100
+# repetitions
+REPEATS = 200
+
+
+def build_messages():
+    """Build a 100-message data-agent thread."""
+    messages = []
+    for i in range(MESSAGES // 4):
+        call_id = f"call-{i}"
+        messages.append(HumanMessage(content=f"Find Tc and Pc of component {i}", id=f"h-{i}"))
+        messages.append(AIMessage(
+            content="",
+            id=f"a-{i}",
+            tool_calls=[{"name": "tavily-search", "args": {"query": f"component {i} critical properties"}, "id": call_id}],
+            usage_metadata={"input_tokens": 1200, "output_tokens": 40, "total_tokens": 1240},
+            response_metadata={"model_name": "gpt-4o-mini", "finish_reason": "tool_calls"}
+        ))
+        messages.append(ToolMessage(
+            content=json.dumps({"results": [{"url": "https://webbook.nist.gov", "content": "critical temperature " * 100}]}),
+            tool_call_id=call_id,
+            name="tavily-search",
+            id=f"t-{i}"
+        ))
+        messages.append(AIMessage(
+            content="TABLE-ID: 1\nVALUES:\n  - [1, 'Methane', 'CH4', 'g', 190.6, 4.60]",
+            id=f"f-{i}"
+        ))
+    return messages
+
+
+def timeit(name: str, fn) -> float:
+    """Run fn REPEATS times and report the time per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    elapsed = (time.perf_counter() - start) / REPEATS
+    print(f"{name:<42} {elapsed * 1e3:8.3f} ms/call")
+    return elapsed
+
+
+# SECTION: run benchmark
+if __name__ == "__main__":
+    messages = build_messages()
+    chat_message = ChatMessage(
+        role="assistant",
+        content=messages[-1].content,
+        thread_id="thread-1",
+        messages=messages
+    )
+    agent_messages = [m for m in map(agent_message_analyzer, messages) if m]
+
+    print(f"json backend: {JSON_BACKEND}, messages: {len(messages)}")
+
+    # NOTE: http response
+    default = timeit(
+        "ChatMessage jsonable_encoder + json.dumps",
+        lambda: json.dumps(jsonable_encoder(chat_message)).encode("utf-8")
+    )
+    fast = timeit(
+        "ChatMessage encode_chat_message",
+        lambda: encode_chat_message(chat_message)
+    )
+    print(f"[bold]speedup: {default / fast:.1f}x[/bold]")
+
+    # NOTE: websocket frames
+    default = timeit(
+        "AgentMessage json.dumps(model_dump()) x100",
+        lambda: [json.dumps(m.model_dump()) for m in agent_messages]
+    )
+    fast = timeit(
+        "AgentMessage encode_agent_message x100",
+        lambda: [encode_agent_message(m) for m in agent_messages]
+    )
+    print(f"[bold]speedup: {default / fast:.1f}x[/bold]")
+
+    # NOTE: same payload
+    assert json.loads(encode_chat_message(chat_message)) == jsonable_encoder(chat_message)
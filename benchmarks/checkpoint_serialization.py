@@ -0,0 +1,111 @@
+# import libs
+import time
+import json
+import random
+import string
+from typing import List
+from rich import print
+from langchain_core.messages import (
+    HumanMessage,
+    AIMessage,
+    ToolMessage,
+    BaseMessage
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+# local
+from pythermoai.memory import CompactSerializer
+
+# SECTION: inputs
+# number of turns in the thread
+TURNS = 30
+# tool calls per turn
+TOOL_CALLS_PER_TURN = 4
+# size of a tool output (web search result) in characters
+TOOL_OUTPUT_SIZE = 8000
+# repetitions for throughput
+REPEATS = 3
+
+random.seed(0)
+
+
+def tool_output(size: int) -> str:
+    """Build a web-search-like tool output."""
+    words = [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 9)))
+        for _ in range(200)
+    ]
+    text = []
+    while sum(len(w) + 1 for w in text) < size:
+        text.append(random.choice(words))
+    return json.dumps({"results": [{"url": "https://webbook.nist.gov", "content": " ".join(text)}]})
+
+
+def build_checkpoints() -> List[List[BaseMessage]]:
+    """Build the `messages` channel value of every checkpoint of a data-agent thread."""
+    messages: List[BaseMessage] = []
+    checkpoints: List[List[BaseMessage]] = []
+    for turn in range(TURNS):
+        messages = messages + [HumanMessage(
+            content=f"Find Tc, Pc and MW of component {turn}", id=f"h-{turn}")]
+        checkpoints.append(messages)
+        for call in range(TOOL_CALLS_PER_TURN):
+            call_id = f"call-{turn}-{call}"
+            messages = messages + [AIMessage(
+                content="",
+                id=f"a-{turn}-{call}",
+                tool_calls=[{"name": "tavily-search", "args": {"query": f"component {turn} property {call}"}, "id": call_id}]
+            )]
+            checkpoints.append(messages)
+            messages = messages + [ToolMessage(
+                content=tool_output(TOOL_OUTPUT_SIZE),
+                tool_call_id=call_id,
+                name="tavily-search",
+                id=f"t-{turn}-{call}"
+            )]
+            checkpoints.append(messages)
+        messages = messages + [AIMessage(
+            content="TABLE-ID: 1\nVALUES:\n  - [1, 'Methane', 'CH4', 'g', 16.04, 190.6, 4.60]",
+            id=f"f-{turn}"
+        )]
+        checkpoints.append(messages)
+    return checkpoints
+
+
+def run(name: str, serde, checkpoints: List[List[BaseMessage]], store=None):
+    """Serialize and deserialize all checkpoints and report bytes and throughput."""
+    # NOTE: serialize
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        if store is not None:
+            store.clear()
+        payloads = [serde.dumps_typed(c) for c in checkpoints]
+    dumps_time = (time.perf_counter() - start) / REPEATS
+
+    # NOTE: deserialize
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        for p in payloads:
+            serde.loads_typed(p)
+    loads_time = (time.perf_counter() - start) / REPEATS
+
+    # NOTE: bytes per thread
+    total_bytes = sum(len(data) for _, data in payloads)
+    if store is not None:
+        total_bytes += sum(len(v) for v in store.values())
+
+    print(
+        f"[bold]{name:<22}[/bold] bytes/thread: {total_bytes / 1e6:8.2f} MB | "
+        f"serialize: {len(checkpoints) / dumps_time:8.1f} ckpt/s | "
+        f"deserialize: {len(checkpoints) / loads_time:8.1f} ckpt/s"
+    )
+
+
+# SECTION: run benchmark
+if __name__ == "__main__":
+    checkpoints = build_checkpoints()
+    print(f"checkpoints per thread: {len(checkpoints)}, messages in last checkpoint: {len(checkpoints[-1])}")
+
+    run("JsonPlusSerializer", JsonPlusSerializer(), checkpoints)
+    run("CompactSerializer", CompactSerializer(), checkpoints)
+    store = {}
+    run("CompactSerializer+dedup", CompactSerializer(blob_store=store), checkpoints, store)
@@ -0,0 +1,103 @@
+# import libs
+import math
+import time
+import numpy as np
+from rich import print
+# local
+from pythermoai.tables import check_table, compile_body, compile_table, validate_table
+from pythermoai.tables.parser import build_table, load_yaml, table_sections
+
+# SECTION: inputs
+# number of components of the table
+SPECIES = 50
+# number of temperatures
+POINTS = 10_000
+# repetitions
+REPEATS = 20
+
+BODY = [
+    "res['vapor pressure | VaPr | Pa'] = math.exp(parms['C1 | C1 | 1'] + "
+    "parms['C2 | C2 | 1']/args['temperature | T | K'] + "
+    "parms['C3 | C3 | 1']*math.log(args['temperature | T | K']) + "
+    "parms['C4 | C4 | 1']*(args['temperature | T | K']**parms['C5 | C5 | 1']))"
+]
+
+
+def build_block(species: int) -> str:
+    """Build an equation table in the YAML of the equations agent."""
+    lines = [
+        "VAPOR-PRESSURE:",
+        "  TABLE-ID: 1",
+        "  DESCRIPTION:",
+        '    "Vapor pressure, Ambrose-Walton form"',
+        "  EQUATIONS:",
+        "    EQ-1:",
+        "      BODY:",
+        *[f'        - "{line}"' for line in BODY],
+        "  STRUCTURE:",
+        "    COLUMNS: [No., Name, Formula, State, C1, C2, C3, C4, C5, Tmin, VaPr(Tmin), Tmax, VaPr(Tmax), Eq]",
+        "    SYMBOL:  [None, None, None, None, C1, C2, C3, C4, C5, Tmin, VaPr, Tmax, VaPr, VaPr]",
+        "    UNIT:    [None, None, None, None, 1, 1, 1, 1, 1, K, Pa, K, Pa, Pa]",
+        "  VALUES:",
+    ]
+    for i in range(species):
+        c1, c2 = 73.649 + i / 100, -7258.2 - i
+        # NOTE: check points consistent with the parameters, to 4 significant digits
+        low, high = (
+            float(f"{math.exp(c1 + c2 / t - 7.3037 * math.log(t) + 4.1653e-06 * t ** 2):.4g}")
+            for t in (273.16, 647.1)
+        )
+        lines.append(
+            f'    - [{i + 1}, "component-{i}", "C{i + 1}", "l", '
+            f"{c1}, {c2}, -7.3037, 4.1653e-06, 2, 273.16, {low}, 647.1, {high}, 1]"
+        )
+    return "\n".join(lines)
+
+
+def timeit(name: str, fn) -> float:
+    """Run fn REPEATS times and report the time per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    elapsed = (time.perf_counter() - start) / REPEATS
+    print(f"{name:<42} {elapsed * 1e3:8.3f} ms/call")
+    return elapsed
+
+
+def python_loop(table, temperatures) -> list:
+    """Evaluate the body row by row and point by point, as `eval` of BODY would."""
+    results = []
+    for row in table.values:
+        c1, c2, c3, c4, c5 = row[4:9]
+        results.append([
+            math.exp(c1 + c2 / t + c3 * math.log(t) + c4 * t ** c5)
+            for t in temperatures
+        ])
+    return results
+
+
+# SECTION: run benchmark
+if __name__ == "__main__":
+    table = build_table(*next(iter(table_sections(load_yaml(build_block(SPECIES))).items())))
+    temperatures = np.linspace(273.16, 647.1, POINTS)
+
+    timeit("compile body (cached)", lambda: compile_body(BODY))
+    timeit(f"compile table, {SPECIES} species", lambda: compile_table(table))
+    equations = compile_table(table)
+    vectorized = timeit(
+        f"vectorized {POINTS} points x {SPECIES} species",
+        lambda: equations.evaluate({"T": temperatures}))
+    looped = timeit(
+        f"python loop {POINTS} points x {SPECIES} species",
+        lambda: python_loop(table, temperatures.tolist()))
+    print(f"speed-up: {looped / vectorized:.0f}x")
+    timeit(
+        f"self-check at Tmin/Tmax, {SPECIES} species",
+        lambda: check_table(validate_table(table)))
+
+    # NOTE: same numbers as the row by row evaluation
+    assert np.allclose(
+        equations.evaluate({"T": temperatures})["VaPr"],
+        np.array(python_loop(table, temperatures.tolist())), rtol=1e-12)
+    assert check_table(validate_table(table)).valid
@@ -0,0 +1,63 @@
+# import libs
+import time
+import yaml
+from rich import print
+# local
+from pythermoai.tables import convert_table
+
+# SECTION: inputs
+# number of components in the pasted tables
+ROWS = (5, 50, 500)
+# repetitions
+REPEATS = 50
+
+
+def build_csv(rows: int) -> str:
+    """Build a pasted CSV table with units to normalize."""
+    lines = [
+        "Please reformat this data:",
+        "Name,Formula,Tc (°C),Pc [bar],MW (g/mol),Tb (K),Hf (kcal/mol),omega",
+    ]
+    for i in range(rows):
+        lines.append(
+            f"component-{i},C{i + 1}H{2 * i + 4},{-82.6 + i},{45.99 - i / 100},"
+            f"{16.04 + 14 * i},{111.7 + 10 * i},{-17.9 - i / 10},{0.011 + i / 1000}"
+        )
+    return "\n".join(lines)
+
+
+def build_markdown(rows: int) -> str:
+    """Build a pasted Markdown table."""
+    lines = [
+        "| Component | Critical Temperature / K | Acentric factor | State |",
+        "|---|---|---|---|",
+    ]
+    for i in range(rows):
+        lines.append(f"| component-{i} | {190.6 + i} | {0.011 + i / 1000} | gas |")
+    return "\n".join(lines)
+
+
+def timeit(name: str, fn) -> float:
+    """Run fn REPEATS times and report the time per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    elapsed = (time.perf_counter() - start) / REPEATS
+    print(f"{name:<42} {elapsed * 1e3:8.3f} ms/call")
+    return elapsed
+
+
+# SECTION: run benchmark
+if __name__ == "__main__":
+    for rows in ROWS:
+        csv_text = build_csv(rows)
+        markdown_text = build_markdown(rows)
+        timeit(f"CSV {rows} rows -> YAML", lambda: convert_table(csv_text).to_yaml())
+        timeit(f"Markdown {rows} rows -> YAML", lambda: convert_table(markdown_text).to_yaml())
+
+    # NOTE: the output parses as the data agent's table
+    table = yaml.safe_load(convert_table(build_csv(5)).to_yaml())
+    assert table["STRUCTURE"]["UNIT"][4:] == ["K", "MPa", "g/mol", "K", "kJ/mol", 1]
+    assert all(len(row) == len(table["STRUCTURE"]["COLUMNS"]) for row in table["VALUES"])
+    print(table["VALUES"][0])
@@ -0,0 +1,63 @@
+# import libs
+import time
+from rich import print
+# local
+from pythermoai.tables import parse_tables, validate_table
+from pythermoai.tables.parser import build_table, load_yaml, table_sections
+
+# SECTION: inputs
+# number of components in the answers
+ROWS = (10, 1000, 5000)
+# repetitions
+REPEATS = 20
+
+
+def build_answer(rows: int) -> str:
+    """Build a data agent answer with a fenced YAML table."""
+    lines = [
+        "Here is the table:",
+        "```yaml",
+        "TABLE-ID: 101",
+        "DESCRIPTION:",
+        '  "Critical properties of light alkanes"',
+        "DATA: []",
+        "STRUCTURE:",
+        "  COLUMNS: [No., Name, Formula, State, Molecular-Weight, Critical-Temperature, Critical-Pressure, Acentric-Factor]",
+        "  SYMBOL:  [None, None, None, None, MW, Tc, Pc, AcFa]",
+        "  UNIT:    [None, None, None, None, g/mol, K, MPa, 1]",
+        "  CONVERSION: [None, None, None, None, 1, 1, 1, 1]",
+        "VALUES:",
+    ]
+    for i in range(rows):
+        lines.append(
+            f'  - [{i + 1}, "component-{i}", "C{i + 1}H{2 * i + 4}", "g", '
+            f"{16.04 + 14 * i}, {190.6 + i}, {4.6 - i / 1e4}, 1.1e-02]"
+        )
+    lines += ["```", "Sources: NIST"]
+    return "\n".join(lines)
+
+
+def timeit(name: str, fn) -> float:
+    """Run fn REPEATS times and report the time per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    elapsed = (time.perf_counter() - start) / REPEATS
+    print(f"{name:<42} {elapsed * 1e3:8.3f} ms/call")
+    return elapsed
+
+
+# SECTION: run benchmark
+if __name__ == "__main__":
+    for rows in ROWS:
+        answer = build_answer(rows)
+        table = build_table(*next(iter(table_sections(
+            load_yaml(answer.split("```yaml")[1].split("```")[0])).items())))
+        timeit(f"validate {rows} rows", lambda: validate_table(table))
+        timeit(f"parse + validate {rows} rows", lambda: parse_tables(answer))
+
+    # NOTE: the answer is valid, broken rows are reported by index
+    assert parse_tables(build_answer(10))[0].valid
+    broken = build_answer(10).replace('"g", 30.04', '"gas", MW')
+    print([issue.model_dump() for issue in parse_tables(broken)[0].issues])
@@ -1,6 +1,9 @@
 from .thermo_agent import ThermoAgent
 from .mcp_manager import MCPManager
 from .main import create_agent
+from .run_limits import run_config, recursion_limit, create_limits_hook
+from .fast_path import FastPathAgent, detect_raw_input
+from .table_repair import create_repair_hook, chain_post_model_hooks
 from .prompts import (
     DATA_AGENT_PROMPT,
     EQUATIONS_AGENT_PROMPT
@@ -14,6 +17,13 @@ __all__ = [
     "ThermoAgent",
     "MCPManager",
     "create_agent",
+    "run_config",
+    "recursion_limit",
+    "create_limits_hook",
+    "FastPathAgent",
+    "detect_raw_input",
+    "create_repair_hook",
+    "chain_post_model_hooks",
     "DATA_AGENT_PROMPT",
     "EQUATIONS_AGENT_PROMPT",
     "DATA_AGENT_NAME",
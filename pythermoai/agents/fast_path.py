@@ -0,0 +1,383 @@
+# import libs
+import json
+import logging
+import re
+import uuid
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Union
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    convert_to_messages
+)
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.state import CompiledStateGraph
+# local
+from ..llms.cascade_model import measure_table
+from ..models import ColumnMapping
+from ..tables import convert_table, get_repair_stats, repair_tables
+from .config import DATA_AGENT_NAME, EQUATIONS_AGENT_NAME
+from .prompts import (
+    DATA_FAST_PATH_PROMPT,
+    EQUATIONS_FAST_PATH_PROMPT,
+    HEADER_MAPPING_PROMPT
+)
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: name of the fast path in the streamed updates, tasks and token metadata
+FAST_PATH_NODE = "fast_path"
+
+# NOTE: kinds of raw input
+RAW_TABLE = "table"
+RAW_EQUATIONS = "equations"
+
+# NOTE: default fast path of the built-in agents
+FAST_PATHS = {
+    DATA_AGENT_NAME: (RAW_TABLE, DATA_FAST_PATH_PROMPT),
+    EQUATIONS_AGENT_NAME: (RAW_EQUATIONS, EQUATIONS_FAST_PATH_PROMPT),
+}
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+# NOTE: requests asking to look values up need the tools of the agent
+_LOOKUP = re.compile(
+    r"\b(?:find|look(?:ing)?\s*up|lookup|search|fetch|retrieve|source)\b", re.IGNORECASE)
+
+# NOTE: math functions, and the args[...]/parms[...] of the BODY schema
+_FUNCTION_CALL = re.compile(
+    r"\b(?:math\.|np\.)?(?:exp|ln|log|log10|sqrt|pow|sinh|cosh|tanh)\s*\(",
+    re.IGNORECASE)
+_BODY_REFERENCE = re.compile(r"\b(?:args|parms)\[")
+
+# NOTE: a binary operator between two identifiers or parentheses, e.g. `B/T`, `C*(`
+_OPERAND = r"(?:[A-Za-z_]\w*|\))"
+_IDENTIFIER_OPERATION = re.compile(
+    rf"{_OPERAND}\s*(?:\*\*|[-+*/^])\s*(?=[A-Za-z_(])")
+
+# NOTE: a quantity, e.g. `Cp = 75.3 J/mol/K`, is not a correlation
+_QUANTITY = re.compile(r"^\s*[-+]?\d[\d.,]*(?:[eE][-+]?\d+)?\s*[A-Za-z]")
+
+
+def is_correlation(line: str) -> bool:
+    '''
+    Check whether a line assigns a correlation: its right-hand side calls a math
+    function, references args[...] or parms[...], or has two operators between
+    identifiers (e.g. `A + B/T`). Ranges (`T = 273-373 K`) and quantities
+    (`Cp = 75.3 J/mol/K`) are not correlations.
+    '''
+    left, equal, right = line.partition("=")
+    if not equal or not left.strip() or right.startswith("="):
+        return False
+    if _FUNCTION_CALL.search(right) or _BODY_REFERENCE.search(right):
+        return True
+    if _QUANTITY.match(right):
+        return False
+    return len(_IDENTIFIER_OPERATION.findall(right)) >= 2
+
+
+def detect_raw_input(content: str, kind: str) -> bool:
+    """
+    Check whether a user message carries the data the agent would otherwise look up.
+
+    Parameters
+    ----------
+    content : str
+        The message from the user.
+    kind : str
+        "table" for raw data (a delimited or markdown table with numbers), "equations"
+        for equations (a line assigning a correlation, see `is_correlation`).
+
+    Returns
+    -------
+    bool
+        Whether the message can take the fast path; never for messages asking to find
+        or look values up.
+    """
+    if _LOOKUP.search(content):
+        return False
+    if kind == RAW_TABLE:
+        rows, _ = measure_table(content)
+        return rows >= 2
+    if kind == RAW_EQUATIONS:
+        return any(is_correlation(line) for line in content.splitlines())
+    return False
+
+
+class FastPathAgent:
+    '''
+    Agent answering raw-data requests with a single tool-less LLM call.
+
+    When the user message carries the data (or the equations) itself, the model is
+    called once with a trimmed prompt and no tools bound, and its answer must be a
+    valid YAML table of the agent's schema once repaired locally (`repair_tables`).
+    Pasted tables are first converted locally (`convert_table`), asking the model only
+    for the headers the converter cannot map. The turn is then written to the thread as
+    if the agent had answered it. Follow-ups on a thread with messages, other requests,
+    and answers failing the check, run the full ReAct agent. Everything else is delegated to the compiled agent.
+    '''
+
+    def __init__(
+        self,
+        agent: CompiledStateGraph,
+        llm: BaseChatModel,
+        kind: str,
+        prompt: str
+    ):
+        # NOTE: set attributes
+        self.agent = agent
+        self.llm = llm
+        self.kind = kind
+        self.prompt = prompt
+        # counters
+        self.calls = 0
+        self.local_answers = 0
+        self.fast_answers = 0
+        self.fallbacks = 0
+
+    def __getattr__(self, name: str) -> Any:
+        # NOTE: checkpointer, aget_state, aupdate_state, nodes, ...
+        return getattr(self.agent, name)
+
+    @staticmethod
+    def _user_message(input: Any) -> Optional[HumanMessage]:
+        messages = input.get("messages") if isinstance(input, dict) else None
+        if not messages:
+            return None
+        messages = convert_to_messages(
+            [messages] if isinstance(messages, str) else messages)
+        if len(messages) == 1 and isinstance(messages[0], HumanMessage):
+            return messages[0]
+        return None
+
+    async def answer(
+        self,
+        message: HumanMessage,
+        config: Optional[RunnableConfig] = None
+    ) -> Optional[AIMessage]:
+        '''
+        Return the answer of the fast path, or None to run the full agent.
+        '''
+        content = message.content if isinstance(message.content, str) else ""
+        if not detect_raw_input(content, self.kind):
+            return None
+        # NOTE: follow-ups need the thread, which the single call does not carry
+        if await self._has_history(config):
+            return None
+        self.calls += 1
+
+        # SECTION: local conversion of pasted tables
+        if self.kind == RAW_TABLE:
+            answer = await self.convert(content, config)
+            if answer is not None:
+                self.local_answers += 1
+                return answer
+
+        # SECTION: single tool-less call
+        try:
+            answer = await self.llm.ainvoke(
+                [SystemMessage(content=self.prompt), message],
+                config={"callbacks": (config or {}).get("callbacks")}
+            )
+        except Exception as e:
+            logger.warning(f"Fast path failed, running the full agent: {e}")
+            self.fallbacks += 1
+            return None
+        # NOTE: almost-valid tables are repaired locally, others run the full agent
+        repair = repair_tables(answer.content) \
+            if isinstance(answer.content, str) and not answer.tool_calls else None
+        if repair is not None:
+            get_repair_stats().record(repair)
+        if repair is None or not repair.valid:
+            logger.info("Fast path answer rejected, running the full agent")
+            self.fallbacks += 1
+            return None
+        self.fast_answers += 1
+        if repair.repaired:
+            answer = AIMessage(
+                content=repair.text,
+                id=answer.id,
+                usage_metadata=answer.usage_metadata,
+                response_metadata={
+                    **answer.response_metadata,
+                    "yaml_repair": "local",
+                    "yaml_fixes": repair.fixes,
+                }
+            )
+        answer.response_metadata["fast_path"] = True
+        return answer
+
+    async def convert(
+        self,
+        content: str,
+        config: Optional[RunnableConfig] = None
+    ) -> Optional[AIMessage]:
+        '''
+        Convert a pasted table locally, or return None if the request needs the model.
+
+        Headers the converter cannot map are mapped by one short model call; properties
+        asked for but not pasted, and values of unknown or missing units, need the model.
+        '''
+        conversion = convert_table(content)
+        # NOTE: values of unknown or missing units need the model
+        if conversion is None or conversion.extra_requests or conversion.unresolved:
+            return None
+        usage = None
+        if conversion.unmapped:
+            try:
+                mapping = await self.llm.ainvoke(
+                    [
+                        SystemMessage(content=HEADER_MAPPING_PROMPT),
+                        HumanMessage(content=json.dumps(conversion.unmapped)),
+                    ],
+                    config={"callbacks": (config or {}).get("callbacks")}
+                )
+                match = _JSON_OBJECT.search(
+                    mapping.content if isinstance(mapping.content, str) else "")
+                header_map = {
+                    header: ColumnMapping(**value)
+                    for header, value in json.loads(match.group(0)).items()
+                }
+            except Exception as e:
+                logger.info(f"Header mapping failed ({e}), using the fast path call")
+                return None
+            usage = mapping.usage_metadata
+            conversion = convert_table(content, header_map=header_map)
+            if conversion is None or not conversion.complete:
+                return None
+        for warning in conversion.warnings:
+            logger.info(f"Table conversion: {warning}")
+        return AIMessage(
+            content=conversion.to_yaml(),
+            usage_metadata=usage or {
+                "input_tokens": 0, "output_tokens": 0, "total_tokens": 0},
+            response_metadata={
+                "fast_path": True,
+                "converter": "local",
+                "mapped_by_llm": bool(usage),
+            }
+        )
+
+    async def _has_history(self, config: Optional[RunnableConfig]) -> bool:
+        '''
+        Check whether the thread of the run already has messages.
+        '''
+        if getattr(self.agent, "checkpointer", None) is None or not config:
+            return False
+        if not (config.get("configurable") or {}).get("thread_id"):
+            return False
+        state = await self.agent.aget_state(config)
+        return bool(state.values.get("messages"))
+
+    async def _save_turn(
+        self,
+        config: Optional[RunnableConfig],
+        message: HumanMessage,
+        answer: AIMessage
+    ) -> List[BaseMessage]:
+        '''
+        Write the turn to the thread and return the messages of the thread.
+        '''
+        if getattr(self.agent, "checkpointer", None) is None or not config:
+            return [message, answer]
+        # NOTE: as the last node of a model step, so the thread has no pending node
+        nodes = getattr(self.agent, "nodes", {})
+        await self.agent.aupdate_state(
+            config,
+            {"messages": [message, answer]},
+            as_node="post_model_hook" if "post_model_hook" in nodes else "agent"
+        )
+        state = await self.agent.aget_state(config)
+        return state.values.get("messages", [message, answer])
+
+    async def astream(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        *,
+        stream_mode: Optional[Union[str, List[str]]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        '''
+        Stream the run like the compiled agent, answering on the fast path when it can.
+        '''
+        message = self._user_message(input)
+        answer = await self.answer(message, config) if message else None
+        if answer is None:
+            async for item in self.agent.astream(
+                    input, config, stream_mode=stream_mode, **kwargs):
+                yield item
+            return
+
+        # SECTION: the items of the stream modes, as a one-node run
+        single = stream_mode is None or isinstance(stream_mode, str)
+        modes = [stream_mode or "values"] if single else stream_mode
+        task_id = str(uuid.uuid4())
+        items: List[tuple] = []
+        if "tasks" in modes:
+            items.append(("tasks", {
+                "id": task_id,
+                "name": FAST_PATH_NODE,
+                "input": {"messages": [message]},
+                "triggers": ("__start__",),
+            }))
+        if "messages" in modes:
+            items.append(("messages", (
+                AIMessageChunk(
+                    content=answer.content,
+                    usage_metadata=answer.usage_metadata,
+                    response_metadata=answer.response_metadata
+                ),
+                {"langgraph_node": FAST_PATH_NODE},
+            )))
+        if "updates" in modes:
+            items.append(("updates", {FAST_PATH_NODE: {"messages": [answer]}}))
+        if "tasks" in modes:
+            items.append(("tasks", {
+                "id": task_id,
+                "name": FAST_PATH_NODE,
+                "error": None,
+                "result": [("messages", [answer])],
+                "interrupts": [],
+            }))
+        messages = await self._save_turn(config, message, answer)
+        if "values" in modes:
+            items.append(("values", {"messages": messages}))
+
+        for mode, chunk in items:
+            yield chunk if single else (mode, chunk)
+
+    async def ainvoke(
+        self,
+        input: Any,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        '''
+        Run the agent and return the last state, answering on the fast path when it can.
+        '''
+        message = self._user_message(input)
+        answer = await self.answer(message, config) if message else None
+        if answer is None:
+            return await self.agent.ainvoke(input, config, **kwargs)
+        return {"messages": await self._save_turn(config, message, answer)}
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "calls": self.calls,
+            "local_answers": self.local_answers,
+            "fast_answers": self.fast_answers,
+            "fallbacks": self.fallbacks,
+        }
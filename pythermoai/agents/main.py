@@ -10,6 +10,7 @@ from pathlib import Path
 from langgraph.graph.state import CompiledStateGraph
 # local
 from .thermo_agent import ThermoAgent
+from .fast_path import FastPathAgent
 
 # NOTE: logger
 logger = logging.getLogger(__name__)
@@ -31,7 +32,7 @@ async def create_agent(
     ] = None,
     memory_mode: bool = False,
     **kwargs
-) -> CompiledStateGraph:
+) -> Union[CompiledStateGraph, FastPathAgent]:
     """
     Create and return a langgraph agent with the specified model name.
 
@@ -54,8 +55,9 @@ async def create_agent(
 
     Returns
     -------
-    agent: CompiledStateGraph
-        The compiled state graph of the agent.
+    agent: CompiledStateGraph | FastPathAgent
+        The compiled state graph of the agent, wrapped in its raw-data fast path for
+        the data and equations agents.
     """
     try:
         # SECTION: create ThermoAgent
@@ -1,5 +1,6 @@
 # import
 from .symbols import THERMODYNAMIC_SYMBOLS
+from ..tables.units import PROPERTY_DIMENSIONS, STANDARD_UNITS
 
 # SECTION: common
 # NOTE: shared PROMPT parts
@@ -184,3 +185,102 @@ GUARDRAILS (self-check before returning)
 - DESCRIPTION mentions result, units, variables, and validity.
 - All property names and symbols must follow the SYMBOLS dictionary.
 """
+
+
+# SECTION: fast path
+# NOTE: trimmed prompts of the single tool-less call made when the user supplies the
+# data or the equations, see `FastPathAgent`
+# NOTE: standard unit of each property, the units `convert_table` normalizes to
+PROPERTY_UNITS = {
+    property: STANDARD_UNITS[dimension]
+    for property, dimension in PROPERTY_DIMENSIONS.items()
+}
+
+DATA_FAST_PATH_PROMPT = f"""
+Role:
+  You are a precise data formatter. The user provides raw thermodynamic data in their prompt.
+  Use the input data as-is, normalize it into the standard units and convert it into the YAML structure below.
+  Do not add values that are not in the input.
+
+YAML Output Structure:
+  TABLE-ID: <table-id>
+  DESCRIPTION:
+    "<short one-line description of the table>"
+  DATA: []
+  STRUCTURE:
+    COLUMNS: [No., Name, Formula, State, <property-1>, <property-2>, ...]
+    SYMBOL:  [None, None, None, None, <symbol-1>, <symbol-2>, ...]
+    UNIT:    [None, None, None, None, <unit-1>, <unit-2>, ...]
+    CONVERSION: [None, None, None, None, <factor-1>, <factor-2>, ...]
+  VALUES:
+    - [1, "<name-1>", "<formula-1>", "<g|l|s>", <value-1>, <value-2>, ...]
+
+Rules:
+  • Always include the first 4 fixed columns: No., Name, Formula, State, then the properties of the input.
+  • SYMBOL must follow the SYMBOLS below; otherwise use a short CamelCase symbol (≤6 characters).
+  • Convert every value into the standard unit of its property (see STANDARD UNITS below, e.g. bar → MPa, °C → K).
+  • UNIT → the standard unit; CONVERSION → 1, as the values are already converted.
+  • A property without a standard unit keeps the unit of the input.
+  • Every VALUES row has as many entries as COLUMNS; write `null` for a missing value.
+  • State must be "g", "l", or "s" at 298 K and 1 bar.
+
+SYMBOLS:
+  {THERMODYNAMIC_SYMBOLS}
+
+STANDARD UNITS:
+  {PROPERTY_UNITS}
+
+Answer with the YAML only.
+"""
+
+EQUATIONS_FAST_PATH_PROMPT = f"""
+ROLE
+You are a scientific data wrangler. The user provides thermodynamic equations (and their
+parameters) in their prompt. Treat them as input data and reformat them into the YAML schema
+below. Do not add equations, parameters or values that are not in the input.
+
+YAML SCHEMA
+<Table-Name>:
+  TABLE-ID: <integer>
+  DESCRIPTION:
+    <1-3 sentences: what it returns, units, independent variables, validity ranges if known>
+  EQUATIONS:
+    EQ-1:
+      BODY:
+        - res['<Result-Desc | Result-Sym | Result-Unit>'] = <pythonic expression using args[...] and parms[...]>
+      BODY-INTEGRAL: None
+      BODY-FIRST-DERIVATIVE: None
+      BODY-SECOND-DERIVATIVE: None
+  STRUCTURE:
+    COLUMNS: [No., Name, Formula, State, <param_1>, …, <constant_1>, …, Eq]
+    SYMBOL:  [None, None, None, None, <p1_sym>, …, <const_sym>, …, <result_sym>]
+    UNIT:    [None, None, None, None, <p1_unit>, …, <const_unit>, …, <result_unit>]
+  VALUES:
+    - [<No>, '<Name>', '<Formula>', '<State>', <numeric_param_1>, …, <numeric_const>, …, <Eq_index>]
+
+BODY CONTRACT
+- Python operators only (+ - * / **) and math.*.
+- Inputs via args[…], parameters and constants via parms[…]; the final line assigns to res[…].
+- Parameters have UNIT = 1; constants keep their true units.
+- VALUES rows contain only numeric values (plus Name, Formula, State), in STRUCTURE.COLUMNS order.
+
+SYMBOLS
+  {THERMODYNAMIC_SYMBOLS}
+
+Answer with the YAML only.
+"""
+
+# NOTE: mapping of the pasted headers the local table converter cannot map
+HEADER_MAPPING_PROMPT = f"""
+You map the column headers of a pasted thermodynamic data table to the columns of a YAML table.
+For each header give:
+  • column → full descriptive name, hyphenated (e.g., Critical-Temperature)
+  • symbol → from the SYMBOLS below, or a short CamelCase symbol (≤6 characters) that does not conflict with them
+  • unit → the unit written in the header, or null if there is none
+
+SYMBOLS:
+  {THERMODYNAMIC_SYMBOLS}
+
+Answer with a JSON object only, keyed by the headers exactly as given:
+{{"<header>": {{"column": "<column>", "symbol": "<symbol>", "unit": "<unit or null>"}}}}
+"""
@@ -0,0 +1,222 @@
+# import libs
+import logging
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage
+)
+from langgraph.constants import TAG_NOSTREAM
+# local
+from ..models import RunLimits
+from ..utils import current_turn_messages
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: configurable keys read by the limits hook
+RUN_LIMITS_KEY = "run_limits"
+RUN_STARTED_AT_KEY = "run_started_at"
+
+# NOTE: langgraph's default recursion limit
+DEFAULT_RECURSION_LIMIT = 25
+
+# NOTE: model calls of a run without max_steps, as many as langgraph's default limit
+# allows without the post-model hook (two nodes per step)
+DEFAULT_MAX_STEPS = 12
+
+# NOTE: instruction for the final answer written when a limit is reached
+LIMIT_REACHED_PROMPT = (
+    "The {limit} limit of this request has been reached and no more tools can be "
+    "called. Using only the information gathered so far, give your best final answer "
+    "now, in the format that was requested. Write null for every value you could not "
+    "find instead of guessing it (for YAML tables, keep the row and set the cell to null)."
+)
+
+
+def recursion_limit(max_steps: Optional[int] = None) -> int:
+    '''
+    Return the recursion limit of a run of at most `max_steps` model calls, by default
+    `DEFAULT_MAX_STEPS`: a step runs the model, the post-model hook and the tools, and
+    the last one ends after the hook.
+    '''
+    return max(DEFAULT_RECURSION_LIMIT, 3 * (max_steps or DEFAULT_MAX_STEPS) + 2)
+
+
+def run_config(
+    thread_id: str,
+    limits: Optional[RunLimits] = None,
+    started_at: Optional[float] = None,
+    agent_limits: Optional[RunLimits] = None
+) -> RunnableConfig:
+    '''
+    Build the config of an agent run on a thread, with per-request limits.
+
+    Parameters
+    ----------
+    thread_id : str
+        Identifier for the chat thread.
+    limits : RunLimits, optional
+        Limits of this run, overriding the agent's limits.
+    started_at : float, optional
+        Start time of the run, used for the time limit, by default now.
+    agent_limits : RunLimits, optional
+        Limits of the agent, by default those of the agent's config (see
+        `ThermoAgent.build_agent`).
+
+    Returns
+    -------
+    RunnableConfig
+        The config to pass to the agent.
+    '''
+    configurable: Dict[str, Any] = {
+        "thread_id": thread_id,
+        RUN_STARTED_AT_KEY: started_at or time.time(),
+    }
+    config = RunnableConfig(configurable=configurable)
+
+    if limits is not None:
+        configurable[RUN_LIMITS_KEY] = limits.model_dump(exclude_none=True)
+    # NOTE: the recursion limit must let the limits hook end the run with an answer;
+    # without a max_steps the agent's config sets it
+    merged = (agent_limits or RunLimits()).merge(limits)
+    if merged.max_steps or agent_limits is not None:
+        config["recursion_limit"] = recursion_limit(merged.max_steps)
+    return config
+
+
+def unstreamed_config(config: RunnableConfig) -> RunnableConfig:
+    '''
+    Return the config of a model call made by a hook, whose tokens are not streamed:
+    the answer it writes replaces a message whose tokens already were, and reaches the
+    clients with the node updates.
+    '''
+    return merge_configs(config, {"tags": [TAG_NOSTREAM]})
+
+
+def turn_usage(messages: List[BaseMessage]) -> Tuple[int, int, int]:
+    '''
+    Count the LLM calls, tool calls and tokens of the current turn.
+
+    Returns
+    -------
+    Tuple[int, int, int]
+        steps, tool calls and tokens.
+    '''
+    steps = tool_calls = tokens = 0
+    for message in current_turn_messages(messages):
+        if isinstance(message, AIMessage):
+            steps += 1
+            tool_calls += len(message.tool_calls)
+            usage = message.usage_metadata or {}
+            tokens += usage.get("total_tokens") or (
+                usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+    return steps, tool_calls, tokens
+
+
+def reached_limit(
+    limits: RunLimits,
+    messages: List[BaseMessage],
+    started_at: Optional[float]
+) -> Optional[str]:
+    '''
+    Return the name of the limit the turn would exceed by running the tool calls of
+    its last message, or None.
+    '''
+    steps, tool_calls, tokens = turn_usage(messages)
+
+    if limits.max_steps is not None and steps >= limits.max_steps:
+        return "max_steps"
+    if limits.max_tool_calls is not None and tool_calls > limits.max_tool_calls:
+        return "max_tool_calls"
+    if limits.max_tokens is not None and tokens >= limits.max_tokens:
+        return "max_tokens"
+    if (
+        limits.max_seconds is not None and
+        started_at is not None and
+        time.time() - started_at >= limits.max_seconds
+    ):
+        return "max_seconds"
+    return None
+
+
+def create_limits_hook(
+    llm: BaseChatModel,
+    agent_prompt: Optional[str] = None,
+    default_limits: Optional[RunLimits] = None
+):
+    '''
+    Create a post-model hook for `create_react_agent` enforcing run limits.
+
+    After each LLM call that requests tools, the hook checks the agent's limits
+    overridden by the run's `run_limits` configurable. When one is reached, the tool
+    calls are dropped and replaced by a best-effort final answer of the LLM without
+    tools, so the loop ends with an answer instead of an error.
+
+    Parameters
+    ----------
+    llm : BaseChatModel
+        The agent's LLM, not bound to tools.
+    agent_prompt : str, optional
+        The agent's system prompt.
+    default_limits : RunLimits, optional
+        Limits of the agent, by default none.
+
+    Returns
+    -------
+    Callable
+        The async post-model hook.
+    '''
+    async def enforce_run_limits(
+        state: Dict[str, Any],
+        config: RunnableConfig
+    ) -> Dict[str, Any]:
+        messages: List[BaseMessage] = state["messages"]
+        last_message = messages[-1] if messages else None
+        # NOTE: a final answer ends the loop anyway
+        if not isinstance(last_message, AIMessage) or not last_message.tool_calls:
+            return {}
+
+        configurable = config.get("configurable", {})
+        request_limits = configurable.get(RUN_LIMITS_KEY)
+        limits = (default_limits or RunLimits()).merge(
+            RunLimits(**request_limits) if request_limits else None)
+
+        limit = reached_limit(
+            limits, messages, configurable.get(RUN_STARTED_AT_KEY))
+        if limit is None:
+            return {}
+
+        # SECTION: best-effort final answer
+        logger.info(f"Run limit {limit} reached, writing a final answer")
+        prompt: List[BaseMessage] = []
+        if agent_prompt:
+            prompt.append(SystemMessage(content=agent_prompt))
+        prompt.extend(messages[:-1])
+        prompt.append(HumanMessage(content=LIMIT_REACHED_PROMPT.format(limit=limit)))
+
+        answer = await llm.ainvoke(prompt, unstreamed_config(config))
+        # NOTE: same id, replaces the message with the tool calls
+        final_message = AIMessage(
+            content=answer.content,
+            id=last_message.id,
+            usage_metadata=getattr(answer, "usage_metadata", None),
+            response_metadata={
+                **getattr(answer, "response_metadata", {}),
+                "run_limit": limit,
+            }
+        )
+        return {"messages": [final_message]}
+
+    return enforce_run_limits
@@ -0,0 +1,168 @@
+# import libs
+import logging
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage
+)
+# local
+from ..tables import get_repair_stats, repair_prompt, repair_tables
+from .run_limits import unstreamed_config
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: re-prompts of the model per answer, by default
+DEFAULT_REPAIR_PROMPTS = 1
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else str(part.get("text", ""))
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return ""
+
+
+def _add_usage(usage: Optional[Dict[str, Any]], extra: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not extra:
+        return usage
+    if not usage:
+        return extra
+    return {
+        **usage,
+        **{
+            key: usage.get(key, 0) + extra.get(key, 0)
+            for key in ("input_tokens", "output_tokens", "total_tokens")
+        },
+    }
+
+
+def chain_post_model_hooks(*hooks: Callable) -> Callable:
+    '''
+    Combine post-model hooks of `create_react_agent` into one, each hook seeing the
+    messages replaced by the hooks before it.
+    '''
+    async def post_model_hook(
+        state: Dict[str, Any],
+        config: RunnableConfig
+    ) -> Dict[str, Any]:
+        messages: List[BaseMessage] = list(state["messages"])
+        updated: Dict[Any, BaseMessage] = {}
+        for hook in hooks:
+            update = await hook({**state, "messages": messages}, config) or {}
+            for message in update.get("messages", []):
+                updated[message.id] = message
+                # NOTE: same id, replaces the message
+                messages = [
+                    message if current.id == message.id else current
+                    for current in messages
+                ]
+        return {"messages": list(updated.values())} if updated else {}
+
+    return post_model_hook
+
+
+def create_repair_hook(
+    llm: BaseChatModel,
+    agent_prompt: Optional[str] = None,
+    max_prompts: int = DEFAULT_REPAIR_PROMPTS
+):
+    '''
+    Create a post-model hook for `create_react_agent` repairing the YAML tables of the
+    final answers.
+
+    The tables of a final answer are repaired locally (`repair_tables`). Only when
+    that fails is the model asked again, with a message listing the problems left and
+    the offending rows, up to `max_prompts` times. The answer is replaced by the
+    repaired one; answers that stay invalid are kept as they are.
+
+    Parameters
+    ----------
+    llm : BaseChatModel
+        The agent's LLM, not bound to tools.
+    agent_prompt : str, optional
+        The agent's system prompt.
+    max_prompts : int, optional
+        Re-prompts of the model per answer, by default 1; 0 repairs locally only.
+
+    Returns
+    -------
+    Callable
+        The async post-model hook.
+    '''
+    async def repair_answer(
+        state: Dict[str, Any],
+        config: RunnableConfig
+    ) -> Dict[str, Any]:
+        messages: List[BaseMessage] = state["messages"]
+        last_message = messages[-1] if messages else None
+        # NOTE: only final answers with a table
+        if not isinstance(last_message, AIMessage) or last_message.tool_calls:
+            return {}
+        content = _text(last_message.content)
+        if "STRUCTURE" not in content:
+            return {}
+
+        stats = get_repair_stats()
+        repair = repair_tables(content)
+        stats.record(repair)
+        if repair.valid and not repair.repaired:
+            return {}
+
+        # SECTION: targeted re-prompts
+        usage = None
+        attempts = 0
+        if not repair.valid:
+            prompt: List[BaseMessage] = []
+            if agent_prompt:
+                prompt.append(SystemMessage(content=agent_prompt))
+            prompt.extend(messages)
+            while attempts < max_prompts and not repair.valid:
+                attempts += 1
+                logger.info(
+                    f"Re-prompting for the YAML tables ({len(repair.problems())} problems left)")
+                prompt.append(HumanMessage(content=repair_prompt(repair)))
+                try:
+                    answer = await llm.ainvoke(prompt, unstreamed_config(config))
+                except Exception as e:
+                    logger.warning(f"Re-prompt for the YAML tables failed: {e}")
+                    break
+                usage = _add_usage(usage, getattr(answer, "usage_metadata", None))
+                prompt.append(answer)
+                repair = repair_tables(_text(answer.content))
+                stats.record(repair, reprompt=True)
+            if not repair.valid:
+                stats.fail()
+                logger.info("YAML tables of the answer left unrepaired")
+                return {}
+
+        # NOTE: same id, replaces the answer
+        repaired_message = AIMessage(
+            content=repair.text,
+            id=last_message.id,
+            usage_metadata=_add_usage(last_message.usage_metadata, usage),
+            response_metadata={
+                **last_message.response_metadata,
+                "yaml_repair": "llm" if attempts else "local",
+                "yaml_fixes": repair.fixes,
+                "yaml_reprompts": attempts,
+            }
+        )
+        return {"messages": [repaired_message]}
+
+    return repair_answer
@@ -8,14 +8,23 @@ from typing import (
     Optional
 )
 from pathlib import Path
-from langchain.chat_models import init_chat_model
 from langgraph.prebuilt import create_react_agent
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langchain_core.tools import tool
 # local
-from ..models import stdioMCP, streamableHttpMCP
+from ..models import stdioMCP, streamableHttpMCP, RunLimits
+from ..memory import CompactSerializer, CompactMemorySaver
+from ..llms import LlmManager
 from .mcp_manager import MCPManager
+from .run_limits import create_limits_hook, recursion_limit
+from .fast_path import FastPathAgent, FAST_PATHS
+from .table_repair import (
+    DEFAULT_REPAIR_PROMPTS,
+    chain_post_model_hooks,
+    create_repair_hook
+)
 
 # NOTE: logger
 logger = logging.getLogger(__name__)
@@ -92,6 +101,37 @@ class ThermoAgent:
             Whether to enable memory mode for the agent.
         kwargs : dict
             Additional keyword arguments for future extensions.
+            - checkpointer: BaseCheckpointSaver, optional
+                A checkpointer (e.g. a persistent one) used instead of the in-memory saver.
+                With `compact_checkpoints` its serializer is wrapped in a compressing
+                `CompactSerializer`; build it with `serde=CompactSerializer(blob_store=...)`
+                and a persistent blob store to also deduplicate messages.
+            - compact_checkpoints: bool, optional
+                Whether checkpoints are stored by the compact serializer, by default True.
+            - run_limits: RunLimits | dict, optional
+                Limits on steps, tool calls, tokens and seconds of each run of the agent.
+                A dict keyed by agent name sets the limits of each agent. Requests can
+                override them.
+            - retry_policy: RetryPolicy | dict, optional
+                Retries with jittered exponential backoff of the failed LLM calls.
+            - fallbacks: List[FallbackModel | dict], optional
+                Ordered provider/model pairs taking the LLM calls the model keeps failing.
+            - hedging: HedgingPolicy | dict, optional
+                Duplicate the slow LLM calls to the same or an alternate model, by default not.
+            - cascade: CascadePolicy | dict, optional
+                Send the LLM calls to a small/fast model first and escalate them to the
+                agent's model, by default not.
+            - fast_path: bool, optional
+                Whether requests carrying their raw data (data agent) or equations
+                (equations agent) are answered by a single tool-less LLM call with a
+                trimmed prompt before falling back to the ReAct agent, by default False.
+            - yaml_repair: bool, optional
+                Whether the YAML tables of the final answers are repaired locally, and
+                the model re-prompted with the problems left only when that fails, by
+                default True.
+            - repair_prompts: int, optional
+                Re-prompts of the model per answer when local repair fails, by default 1;
+                0 repairs locally only.
         '''
         # NOTE: set attributes
         self._model_provider = model_provider
@@ -106,6 +146,26 @@ class ThermoAgent:
         self._temperature = kwargs.get('temperature', 0.0)
         # max tokens
         self._max_tokens = kwargs.get('max_tokens', 2048)
+        # checkpointer
+        self._checkpointer: Optional[BaseCheckpointSaver] = kwargs.get(
+            'checkpointer', None)
+        # compact checkpoints
+        self._compact_checkpoints = kwargs.get('compact_checkpoints', True)
+        # run limits
+        self._run_limits = self.resolve_run_limits(
+            kwargs.get('run_limits', None))
+        # retries and fallback models
+        self._retry_policy = kwargs.get('retry_policy', None)
+        self._fallbacks = kwargs.get('fallbacks', None)
+        # hedging of the slow calls
+        self._hedging = kwargs.get('hedging', None)
+        # small/large model cascade
+        self._cascade = kwargs.get('cascade', None)
+        # raw-data fast path
+        self._fast_path = kwargs.get('fast_path', False)
+        # repair of the YAML tables of the answers
+        self._yaml_repair = kwargs.get('yaml_repair', True)
+        self._repair_prompts = kwargs.get('repair_prompts', DEFAULT_REPAIR_PROMPTS)
 
         # SECTION: initialize LLM
         try:
@@ -128,18 +188,38 @@ class ThermoAgent:
             logger.error(f"Failed to create MCP client: {e}")
             raise RuntimeError(f"Failed to create MCP client: {e}") from e
 
+    def resolve_run_limits(
+        self,
+        run_limits: Optional[Union[RunLimits, Dict[str, Any]]]
+    ) -> Optional[RunLimits]:
+        '''
+        Resolve the run limits of the agent from the `run_limits` keyword argument.
+        '''
+        if run_limits is None or isinstance(run_limits, RunLimits):
+            return run_limits
+        # NOTE: limits per agent name
+        if self._agent_name in run_limits:
+            return self.resolve_run_limits(run_limits[self._agent_name])
+        if set(run_limits).issubset(RunLimits.model_fields):
+            return RunLimits(**run_limits)
+        return None
+
     def init_llm(self):
         '''
         This method sets up the language model for the agent using the model name provided during initialization.
-        It uses the `init_chat_model` function from langchain to create the model instance.
+        It uses `LlmManager.initialize_model`, so the calls share the process-wide rate limiter.
         '''
         try:
             # SECTION: initialize the LLM
-            self.llm = init_chat_model(
-                self._model_name,
+            self.llm = LlmManager.initialize_model(
                 model_provider=self._model_provider,
+                model_name=self._model_name,
                 temperature=self._temperature,
-                max_tokens=self._max_tokens
+                max_tokens=self._max_tokens,
+                retry_policy=self._retry_policy,
+                fallbacks=self._fallbacks,
+                hedging=self._hedging,
+                cascade=self._cascade
             )
         except Exception as e:
             logger.error(f"Failed to initialize LLM: {e}")
@@ -220,6 +300,7 @@ class ThermoAgent:
     async def build_agent(self):
         '''
         build and return a langgraph agent using the initialized LLM and MCP client.
+        The data and equations agents are wrapped in their raw-data fast path.
         '''
         try:
             # SECTION: client tools retrieval
@@ -243,7 +324,18 @@ class ThermoAgent:
 
             # SECTION: memory saver
             try:
-                if self._memory_mode:
+                if self._checkpointer is not None:
+                    memory = self._checkpointer
+                    # NOTE: msgpack + zlib only, deduplicated messages need a blob
+                    # store as durable as the checkpointer
+                    if self._compact_checkpoints and not isinstance(
+                            memory.serde, CompactSerializer):
+                        memory.serde = CompactSerializer(serde=memory.serde)
+                elif self._memory_mode and self._compact_checkpoints:
+                    # NOTE: msgpack + zlib with per-message deduplication, blobs
+                    # removed with their threads
+                    memory = CompactMemorySaver()
+                elif self._memory_mode:
                     memory = MemorySaver()
                 else:
                     memory = None
@@ -251,18 +343,45 @@ class ThermoAgent:
                 logger.error(f"Failed to initialize memory saver: {e}")
                 memory = None
 
+            # SECTION: post-model hooks
+            # NOTE: ends the loop with a best-effort answer on run limits
+            hooks = [
+                create_limits_hook(
+                    self.llm,
+                    agent_prompt=self._agent_prompt,
+                    default_limits=self._run_limits
+                )
+            ]
+            # NOTE: repairs the YAML tables of the final answer
+            if self._yaml_repair:
+                hooks.append(create_repair_hook(
+                    self.llm,
+                    agent_prompt=self._agent_prompt,
+                    max_prompts=self._repair_prompts
+                ))
+
             # SECTION: create agent
             try:
                 agent = create_react_agent(
                     model=self.llm,
                     tools=tools,
                     prompt=self._agent_prompt,
+                    post_model_hook=chain_post_model_hooks(*hooks),
                     checkpointer=memory
+                ).with_config(
+                    # NOTE: room for the agent's max_steps, with the post-model hook
+                    recursion_limit=recursion_limit(
+                        self._run_limits.max_steps if self._run_limits else None)
                 )
             except Exception as e:
                 logger.error(f"Failed to create agent: {e}")
                 raise RuntimeError(f"Failed to create agent: {e}") from e
 
+            # SECTION: raw-data fast path
+            if self._fast_path and self._agent_name in FAST_PATHS:
+                kind, prompt = FAST_PATHS[self._agent_name]
+                agent = FastPathAgent(agent, self.llm, kind=kind, prompt=prompt)
+
             # return agent
             return agent
         except Exception as e:
@@ -0,0 +1,287 @@
+# import libs
+import logging
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional
+)
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+# set logging level
+logger.setLevel(logging.INFO)
+
+# SECTION: api router
+admission_router = APIRouter(prefix="/admission")
+
+
+class AdmissionRejected(Exception):
+    '''
+    Raised when a run is not admitted: 429 when the wait queue is full, 503 when the
+    wait for a slot timed out.
+    '''
+
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+class ConcurrencySlot:
+    '''
+    Concurrency limit of one agent or provider.
+    '''
+
+    def __init__(self, key: str, limit: Optional[int]):
+        # NOTE: set attributes
+        self.key = key
+        self.limit = limit
+        # None for unlimited
+        self.semaphore = asyncio.Semaphore(limit) if limit else None
+        self.active = 0
+        self.waiting = 0
+        # counters
+        self.admitted = 0
+
+    @property
+    def free(self) -> bool:
+        return self.semaphore is None or not self.semaphore.locked()
+
+    async def acquire(self):
+        if self.semaphore is not None:
+            await self.semaphore.acquire()
+        self.active += 1
+        self.admitted += 1
+
+    def release(self):
+        self.active -= 1
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+        }
+
+
+class AdmissionTicket:
+    '''
+    Slots held by an admitted run, released once when the run ends.
+    '''
+
+    def __init__(self, controller: "AdmissionController", slots: List[ConcurrencySlot]):
+        self.controller = controller
+        self.slots = slots
+        self.admitted_at = time.monotonic()
+        self.released = False
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        for slot in self.slots:
+            slot.release()
+        self.controller._record_service_time(time.monotonic() - self.admitted_at)
+
+
+class AdmissionController:
+    '''
+    Admission control in front of agent execution.
+
+    A run needs a slot of its agent and a slot of its LLM provider. When none is free
+    it waits in a bounded queue: once the queue is full new runs are rejected at once
+    with 429, and runs waiting longer than `queue_timeout` are rejected with 503. Both
+    carry a Retry-After estimated from the recent run durations.
+    '''
+
+    def __init__(
+        self,
+        max_concurrency_per_agent: Optional[int] = 8,
+        max_concurrency_per_provider: Optional[int] = 16,
+        max_queue_size: Optional[int] = 64,
+        queue_timeout: Optional[float] = 30.0
+    ):
+        '''
+        Initialize the admission controller.
+
+        Parameters
+        ----------
+        max_concurrency_per_agent : int, optional
+            Maximum number of concurrent runs per agent, by default 8. None for no limit.
+        max_concurrency_per_provider : int, optional
+            Maximum number of concurrent runs per LLM provider, by default 16. None for
+            no limit.
+        max_queue_size : int, optional
+            Maximum number of runs waiting for a slot, by default 64. None for no limit.
+        queue_timeout : float, optional
+            Seconds a run may wait for a slot, by default 30.0. None to wait forever.
+        '''
+        # NOTE: set attributes
+        self.max_concurrency_per_agent = max_concurrency_per_agent
+        self.max_concurrency_per_provider = max_concurrency_per_provider
+        self.max_queue_size = max_queue_size
+        self.queue_timeout = queue_timeout
+        self.agents: Dict[str, ConcurrencySlot] = {}
+        self.providers: Dict[str, ConcurrencySlot] = {}
+        self.waiting = 0
+        # NOTE: moving average of run durations, for Retry-After
+        self.avg_service_time: Optional[float] = None
+        # counters
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def _slots(self, agent_name: str, provider: str) -> List[ConcurrencySlot]:
+        """Return the agent and provider slots of a run, in acquisition order."""
+        agent_slot = self.agents.get(agent_name)
+        if agent_slot is None:
+            agent_slot = ConcurrencySlot(agent_name, self.max_concurrency_per_agent)
+            self.agents[agent_name] = agent_slot
+        provider_slot = self.providers.get(provider)
+        if provider_slot is None:
+            provider_slot = ConcurrencySlot(provider, self.max_concurrency_per_provider)
+            self.providers[provider] = provider_slot
+        return [agent_slot, provider_slot]
+
+    def _record_service_time(self, seconds: float):
+        if self.avg_service_time is None:
+            self.avg_service_time = seconds
+        else:
+            self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * seconds
+
+    def retry_after(self, slots: List[ConcurrencySlot]) -> int:
+        '''
+        Estimate the seconds until a new run could be admitted.
+        '''
+        limits = [slot.limit for slot in slots if slot.limit]
+        concurrency = min(limits) if limits else 1
+        service_time = self.avg_service_time or 1.0
+        return max(1, math.ceil(service_time * (self.waiting + 1) / concurrency))
+
+    async def acquire(self, agent_name: str, provider: str) -> AdmissionTicket:
+        '''
+        Wait for the slots of a run.
+
+        Raises
+        ------
+        AdmissionRejected
+            If the wait queue is full (429) or the wait timed out (503).
+        '''
+        slots = self._slots(agent_name or "default", provider or "default")
+
+        # NOTE: fast rejection when the queue is full
+        if (
+            self.max_queue_size is not None and
+            self.waiting >= self.max_queue_size and
+            not all(slot.free for slot in slots)
+        ):
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(
+                429,
+                f"Too many requests: {self.waiting} runs are waiting, try again later.",
+                self.retry_after(slots)
+            )
+
+        # SECTION: wait for the slots, in a fixed order
+        start = time.monotonic()
+        acquired: List[ConcurrencySlot] = []
+        self.waiting += 1
+        for slot in slots:
+            slot.waiting += 1
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                for slot in slots:
+                    await slot.acquire()
+                    acquired.append(slot)
+        except TimeoutError:
+            for slot in acquired:
+                slot.release()
+            self.rejected_timeout += 1
+            raise AdmissionRejected(
+                503,
+                f"Server busy: no slot for {agent_name} ({provider}) within {self.queue_timeout} seconds.",
+                self.retry_after(slots)
+            )
+        except BaseException:
+            for slot in acquired:
+                slot.release()
+            raise
+        finally:
+            self.waiting -= 1
+            for slot in slots:
+                slot.waiting -= 1
+
+        # NOTE: admitted
+        wait_time = time.monotonic() - start
+        self.admitted += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        return AdmissionTicket(self, slots)
+
+    @asynccontextmanager
+    async def admit(self, agent_name: str, provider: str) -> AsyncIterator[AdmissionTicket]:
+        '''
+        Hold the slots of a run for the duration of the block.
+
+        Raises
+        ------
+        AdmissionRejected
+            If the run is not admitted.
+        '''
+        ticket = await self.acquire(agent_name, provider)
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        '''
+        Return the queue and concurrency metrics.
+        '''
+        return {
+            "waiting": self.waiting,
+            "max_queue_size": self.max_queue_size,
+            "queue_timeout": self.queue_timeout,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_time": self.total_wait_time / self.admitted if self.admitted else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "avg_service_time": self.avg_service_time,
+            "agents": {key: slot.metrics() for key, slot in self.agents.items()},
+            "providers": {key: slot.metrics() for key, slot in self.providers.items()},
+        }
+
+
+# SECTION: routes
+@admission_router.get("/metrics")
+async def get_admission_metrics(request: Request):
+    """
+    Get the admission queue and concurrency metrics.
+    """
+    return JSONResponse(
+        content={
+            "message": "Admission metrics retrieved successfully",
+            "success": True,
+            "data": request.app.state.admission.metrics(),
+        },
+        status_code=200
+    )
@@ -1,6 +1,6 @@
 # deps.py
 from fastapi import Depends, Request
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 # local
 from ..models import LlmConfig
 
@@ -24,10 +24,22 @@ def get_llm_config_dep(state=Depends(get_state)):
         model_provider=state.model_provider,
         model_name=state.model_name,
         temperature=state.temperature,
-        max_tokens=state.max_tokens
+        max_tokens=state.max_tokens,
+        retry=getattr(state, "retry_policy", None),
+        fallbacks=getattr(state, "fallbacks", None),
+        hedging=getattr(state, "hedging", None),
+        cascade=getattr(state, "cascade", None)
     )
 
 
 def get_mcp_source_dep(state=Depends(get_state)):
     """Retrieve the MCP source from the application state."""
     return state.mcp_source
+
+
+def select_agent(state: Any, agent_selection: Optional[str]) -> Any:
+    """Return the selected agent from the application state, or None if it does not exist."""
+    agents = getattr(state, "agents", {})
+    if agent_selection and agent_selection in agents and agents[agent_selection]:
+        return agents[agent_selection]
+    return getattr(state, "agent", None)
@@ -3,7 +3,14 @@ import logging
 from fastapi import HTTPException, APIRouter, Request
 from fastapi.responses import JSONResponse
 # local imports
-from ..llms import LlmManager
+from ..llms import (
+    LlmManager,
+    get_rate_limiter,
+    get_concurrency_limiter,
+    get_retry_stats,
+    get_hedging_metrics,
+    get_cascade_stats
+)
 from ..config import llm_providers, default_model_settings
 from ..models import LlmConfig
 
@@ -159,3 +166,82 @@ async def ping_llm(
     except Exception as e:
         logger.error(f"Error initializing LLM: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@llm_router.get("/rate-limits")
+async def get_rate_limits():
+    """
+    Get the client-side rate limits (requests and tokens per minute) of the LLM
+    providers and the budgets of the models used so far.
+    """
+    return JSONResponse(
+        content={
+            "message": "Rate limits retrieved successfully",
+            "success": True,
+            "data": get_rate_limiter().metrics(),
+        },
+        status_code=200
+    )
+
+
+@llm_router.get("/concurrency")
+async def get_concurrency():
+    """
+    Get the adaptive concurrency windows of the LLM calls, per provider model.
+    """
+    return JSONResponse(
+        content={
+            "message": "Concurrency windows retrieved successfully",
+            "success": True,
+            "data": get_concurrency_limiter().metrics(),
+        },
+        status_code=200
+    )
+
+
+@llm_router.get("/retries")
+async def get_retries():
+    """
+    Get the counters of calls, retries, failures and failovers of the LLM calls, per
+    provider model.
+    """
+    return JSONResponse(
+        content={
+            "message": "Retry metrics retrieved successfully",
+            "success": True,
+            "data": get_retry_stats().metrics(),
+        },
+        status_code=200
+    )
+
+
+@llm_router.get("/hedging")
+async def get_hedging():
+    """
+    Get the hedging counters of the LLM calls (hedges sent, won by the hedge or by the
+    primary, denied by the budget) and the current hedge thresholds, per model.
+    """
+    return JSONResponse(
+        content={
+            "message": "Hedging metrics retrieved successfully",
+            "success": True,
+            "data": get_hedging_metrics(),
+        },
+        status_code=200
+    )
+
+
+@llm_router.get("/cascade")
+async def get_cascade():
+    """
+    Get the usage of the small and large model tiers (calls, answers, tokens and
+    seconds per model), the routing reasons and the escalation reasons.
+    """
+    return JSONResponse(
+        content={
+            "message": "Cascade metrics retrieved successfully",
+            "success": True,
+            "data": get_cascade_stats().metrics(),
+        },
+        status_code=200
+    )
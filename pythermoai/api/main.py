@@ -1,7 +1,7 @@
 # import libs
 import logging
 import time
-import json
+import asyncio
 from typing import (
     Dict,
     Union,
@@ -12,9 +12,10 @@ from fastapi import (
     FastAPI,
     HTTPException,
     WebSocket,
+    Request,
     Depends
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pathlib import Path
 # langchain
 from langchain_core.runnables import RunnableConfig
@@ -24,8 +25,30 @@ from langchain_core.messages import (
 # locals
 from .ai_api import ThermoAIAPI
 from . import data_agent, equations_agent
+from .threads import threads_router
+from .tables import tables_router
+from .ws_chat import ws_chat_router
+from .runs import (
+    runs_router,
+    RunManager,
+    RunCancelledError,
+    cancellable_turn,
+    generate_run_id
+)
+from .thread_locks import ThreadLockManager
+from .admission import admission_router, AdmissionController, AdmissionRejected
+from .streaming import (
+    TurnMessages,
+    stream_agent_events,
+    encode_sse,
+    encode_ndjson,
+    message_text
+)
+from .websocket_hub import WebSocketHub
+from ..llms import get_rate_limiter, get_concurrency_limiter
 from ..agents import (
     create_agent,
+    run_config,
     DATA_AGENT_PROMPT,
     EQUATIONS_AGENT_PROMPT,
     DATA_AGENT_NAME,
@@ -33,6 +56,7 @@ from ..agents import (
 )
 from ..models import (
     ChatMessage,
+    StreamEvent,
     LlmConfig,
     ApiConfigSummary,
     OverallSettings,
@@ -44,14 +68,20 @@ from ..models import (
     streamableHttpMCP
 )
 from ..memory import generate_thread
-from ..utils import agent_message_analyzer, message_token_counter
+from ..tables import read_tables
+from ..utils import (
+    agent_message_analyzer,
+    message_token_counter,
+    current_turn_messages,
+    ChatMessageResponse
+)
 from ..config import default_token_metadata, default_model_settings, default_api_config
 # dependencies
 from .deps import (
     get_state,
-    get_agents,
     get_llm_config_dep,
-    get_mcp_source_dep
+    get_mcp_source_dep,
+    select_agent
 )
 
 # NOTE: logger
@@ -122,6 +152,63 @@ async def create_api(
             The version of the API, by default "No version set".
         - description: str, optional
             A description of the API, by default "No description set".
+        - ws_max_queue_size: int, optional
+            Maximum number of frames queued per websocket client, by default 256.
+        - ws_slow_consumer_policy: str, optional
+            "drop_oldest", "drop_newest" or "disconnect" when a client's queue is full, by default "drop_oldest".
+        - ws_heartbeat_interval: float, optional
+            Seconds between two sweeps for dead websocket clients, by default 15.0.
+        - ws_send_timeout: float, optional
+            Seconds a websocket send may take before the client is dropped, by default 30.0.
+        - ws_require_subscription: bool, optional
+            Whether /ws clients only receive events of the thread_ids/agents they subscribed to,
+            by default True. Clients subscribe with the `thread_id`/`agent` query parameters
+            of /ws or by sending `{"action": "subscribe", "thread_ids": [...], "agents": [...]}`.
+            Set it to False for clients that listen without subscribing (such as the
+            bundled web UI): they then receive the events of every user.
+        - ws_blob_cache_size: int, optional
+            Maximum bytes of large tool contents kept for /ws clients that receive them by
+            reference, by default 32 MiB.
+        - max_concurrency_per_agent: int, optional
+            Maximum number of concurrent chat runs per agent, by default 8 (None for no limit).
+        - max_concurrency_per_provider: int, optional
+            Maximum number of concurrent chat runs per LLM provider, by default 16 (None for no limit).
+        - admission_queue_size: int, optional
+            Maximum number of chat runs waiting for a slot before new ones get 429, by default 64.
+        - admission_timeout: float, optional
+            Seconds a chat run may wait for a slot before it gets 503, by default 30.0.
+        - rate_limits: Dict[str, Dict[str, int]], optional
+            Client-side requests (`rpm`) and tokens (`tpm`) per minute keyed by provider or
+            `provider/model`, by default none (calls are only counted); `default_rate_limits`
+            holds entry-tier values. The limiter is shared by every agent and LlmManager of
+            the process.
+        - retry_policy: RetryPolicy | dict, optional
+            Retries with jittered exponential backoff of the failed LLM calls of the agents,
+            by default 2 retries.
+        - fallbacks: List[FallbackModel | dict], optional
+            Ordered provider/model pairs taking the LLM calls the model keeps failing. Runs
+            continue on the fallback model with the tool results already in their thread.
+        - hedging: HedgingPolicy | dict, optional
+            Duplicate the LLM calls slower than a percentile of the recent latencies to the
+            same or an alternate model, within a hedge budget, by default disabled.
+        - cascade: CascadePolicy | dict, optional
+            Small/fast model answering the requests first (e.g. raw data to reformat);
+            requests needing tools, large tables or complex equations, and answers that
+            are not a valid YAML table, go to the configured model, by default disabled.
+        - fast_path: bool, optional
+            Answer the requests carrying their raw data or equations with a single
+            tool-less LLM call and a trimmed prompt, running the full agent only when the
+            answer is not a valid YAML table, by default False.
+        - yaml_repair: bool, optional
+            Repair the YAML tables of the final answers locally (indentation, empty cells,
+            short rows, symbols in VALUES, ...) and re-prompt the model with the problems
+            left only when that fails, by default True.
+        - repair_prompts: int, optional
+            Re-prompts of the model per answer when local repair fails, by default 1.
+        - adaptive_concurrency: Dict[str, float], optional
+            Settings of the AIMD concurrency windows of the LLM calls (initial_limit,
+            min_limit, max_limit, decrease_factor, latency_tolerance), shared by every
+            agent and LlmManager of the process.
 
     Returns
     -------
@@ -184,47 +271,108 @@ async def create_api(
     app.state.mcp_source = mcp_source
     # memory mode
     app.state.memory_mode = memory_mode
+    # NOTE: retries and fallback models of the LLM calls
+    app.state.retry_policy = kwargs.get('retry_policy', None)
+    app.state.fallbacks = kwargs.get('fallbacks', None)
+    app.state.hedging = kwargs.get('hedging', None)
+    app.state.cascade = kwargs.get('cascade', None)
 
     # SECTION: agent initialization if app.state.agents does not exist
     # initialize app.state.agents
     app.state.agents = {}
 
+    # SECTION: per-thread serialization
+    # same-thread turns run in order, different threads run in parallel
+    app.state.thread_locks = ThreadLockManager()
+
+    # SECTION: cancellable runs
+    # NOTE: chat turns run as tasks, cancelled on request or client disconnect
+    app.state.runs = RunManager()
+
+    # SECTION: admission control
+    # NOTE: bounded concurrency per agent and provider, with a bounded wait queue
+    app.state.admission = AdmissionController(
+        max_concurrency_per_agent=kwargs.get('max_concurrency_per_agent', 8),
+        max_concurrency_per_provider=kwargs.get(
+            'max_concurrency_per_provider', 16),
+        max_queue_size=kwargs.get('admission_queue_size', 64),
+        queue_timeout=kwargs.get('admission_timeout', 30.0)
+    )
+
+    # SECTION: provider rate limits
+    # NOTE: process-wide, LLM calls are paced before they are sent
+    app.state.rate_limiter = get_rate_limiter()
+    if kwargs.get('rate_limits'):
+        app.state.rate_limiter.configure(kwargs['rate_limits'])
+    # NOTE: adaptive concurrency window per provider model
+    app.state.concurrency_limiter = get_concurrency_limiter()
+    if kwargs.get('adaptive_concurrency'):
+        app.state.concurrency_limiter.configure(**kwargs['adaptive_concurrency'])
+
     # SECTION: websockets configurations
-    # set client
-    websocket_clients = set()
+    # NOTE: fan-out hub, each client has a bounded queue and a writer task
+    websocket_hub = WebSocketHub(
+        max_queue_size=kwargs.get('ws_max_queue_size', 256),
+        slow_consumer_policy=kwargs.get(
+            'ws_slow_consumer_policy', "drop_oldest"),
+        heartbeat_interval=kwargs.get('ws_heartbeat_interval', 15.0),
+        send_timeout=kwargs.get('ws_send_timeout', 30.0),
+        require_subscription=kwargs.get('ws_require_subscription', True),
+        blob_cache_size=kwargs.get('ws_blob_cache_size', 32 * 1024 * 1024)
+    )
+    app.state.websocket_hub = websocket_hub
+    app.router.add_event_handler("shutdown", websocket_hub.close)
 
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket):
-        await websocket.accept()
-        websocket_clients.add(websocket)
-        try:
-            while True:
-                await websocket.receive_text()  # Ignore incoming messages
-        except Exception:
-            pass
-        finally:
-            websocket_clients.remove(websocket)
-
-    async def broadcast_log(log: str):
-        for ws in list(websocket_clients):
-            try:
-                # not empty log
-                if log and len(log.strip()) > 0:
-                    # send log to websocket
-                    await ws.send_text(log)
-            except Exception:
-                websocket_clients.remove(ws)
-
-    async def broadcast_agent_log(log: AgentMessage):
-        for ws in list(websocket_clients):
-            try:
-                await ws.send_text(json.dumps(log.model_dump()))
-            except Exception:
-                websocket_clients.remove(ws)
+        await websocket_hub.serve(websocket)
+
+    def broadcast_agent_log(
+        log: AgentMessage,
+        thread_id: Optional[str] = None,
+        agent_name: Optional[str] = None
+    ):
+        # NOTE: encode once, route to subscribers, never wait for clients
+        websocket_hub.publish_agent_message(
+            log,
+            thread_id=thread_id,
+            agent_name=agent_name
+        )
+
+    @app.get("/ws/metrics")
+    async def get_websocket_metrics():
+        """
+        Endpoint to get the websocket fan-out metrics.
+        """
+        return JSONResponse(
+            content={
+                "message": "Websocket metrics retrieved successfully",
+                "success": True,
+                "data": websocket_hub.metrics()
+            },
+            status_code=200
+        )
+
+    @app.get("/ws/blobs/{digest}")
+    async def get_websocket_blob(digest: str):
+        """
+        Endpoint to fetch a large tool content sent by reference over /ws.
+        """
+        data = websocket_hub.blob_cache.get(digest)
+        if data is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Blob {digest} not found or expired.")
+        return Response(content=data, media_type="text/plain; charset=utf-8")
 
     # SECTION: Register the API routes
     app.include_router(data_agent.config_router)
     app.include_router(equations_agent.config_router)
+    app.include_router(threads_router)
+    app.include_router(tables_router)
+    app.include_router(ws_chat_router)
+    app.include_router(runs_router)
+    app.include_router(admission_router)
 
     # SECTION: API routes
     async def agent_initialization():
@@ -464,6 +612,20 @@ async def create_api(
                 # app state
                 app.state.max_tokens = max_tokens_
 
+            # NOTE: update the retry policy, the fallback models, the hedging and the cascade
+            if llm_config.retry is not None:
+                kwargs['retry_policy'] = llm_config.retry
+                app.state.retry_policy = llm_config.retry
+            if llm_config.fallbacks is not None:
+                kwargs['fallbacks'] = llm_config.fallbacks
+                app.state.fallbacks = llm_config.fallbacks
+            if llm_config.hedging is not None:
+                kwargs['hedging'] = llm_config.hedging
+                app.state.hedging = llm_config.hedging
+            if llm_config.cascade is not None:
+                kwargs['cascade'] = llm_config.cascade
+                app.state.cascade = llm_config.cascade
+
             # SECTION: reinitialize agents with the new LLM configuration
             result = await agent_initialization()
             if result:
@@ -487,13 +649,119 @@ async def create_api(
             raise HTTPException(
                 status_code=500, detail=f"Failed to configure LLM: {e}")
 
-    @app.post("/chat", response_model=ChatMessage)
+    @app.post(
+        "/chat",
+        response_model=ChatMessage,
+        response_class=ChatMessageResponse
+    )
     async def user_agent_chat(
-        user_message: ChatMessage
+        user_message: ChatMessage,
+        request: Request
     ):
         """
         Handle user-agent chat interaction.
 
+        Parameters
+        ----------
+        user_message : ChatMessage
+            The message from the user to the agent.
+
+        Returns
+        -------
+        ChatMessage
+            The response from the agent to the user.
+        """
+        return ChatMessageResponse(
+            await run_chat(agent_chat, user_message, request))
+
+    @app.post(
+        "/chat-stream",
+        response_model=ChatMessage,
+        response_class=ChatMessageResponse
+    )
+    async def user_agent_chat_stream(
+        user_message: ChatMessage,
+        request: Request
+    ):
+        """
+        Handle user-agent chat interaction, broadcasting agent messages to
+        websocket clients as they arrive.
+
+        Parameters
+        ----------
+        user_message : ChatMessage
+            The message from the user to the agent.
+
+        Returns
+        -------
+        ChatMessage
+            The response from the agent to the user.
+        """
+        return ChatMessageResponse(
+            await run_chat(agent_chat_stream, user_message, request))
+
+    async def run_chat(
+        handler,
+        user_message: ChatMessage,
+        request: Request
+    ) -> ChatMessage:
+        """
+        Run a chat handler as a cancellable run.
+
+        The run is cancelled by `POST /runs/{run_id}/cancel` or when the client
+        disconnects; pass `run_id` in the request to be able to cancel it.
+        """
+        # NOTE: thread_id and timestamp are set before the run starts
+        if not user_message.thread_id:
+            user_message.thread_id = generate_thread()[1]
+        if not user_message.timestamp:
+            user_message.timestamp = time.time()
+        # NOTE: handlers find their run by id to report progress
+        user_message.run_id = user_message.run_id or generate_run_id()
+        if app.state.runs.get(user_message.run_id):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Run {user_message.run_id} is already running.")
+
+        try:
+            run = app.state.runs.start(
+                handler(user_message),
+                thread_id=user_message.thread_id,
+                agent_selection=user_message.agent_selection,
+                run_id=user_message.run_id
+            )
+        except ValueError as e:
+            # NOTE: a run with the same run_id started meanwhile
+            raise HTTPException(status_code=409, detail=str(e))
+
+        try:
+            # NOTE: the handler waits for its thread, then for an agent and provider slot
+            response = await app.state.runs.wait(run, request)
+        except AdmissionRejected as e:
+            raise HTTPException(
+                status_code=e.status_code, detail=e.detail, headers=e.headers)
+        except RunCancelledError as e:
+            logger.info(str(e))
+            response = ChatMessage(
+                role="assistant",
+                content="Run cancelled.",
+                thread_id=user_message.thread_id,
+                response_time=None,
+                timestamp=user_message.timestamp,
+                messages=[],
+                input_tokens=DEFAULT_INPUT_TOKENS,
+                output_tokens=DEFAULT_OUTPUT_TOKENS,
+                agent_selection=user_message.agent_selection
+            )
+        response.run_id = user_message.run_id
+        return response
+
+    async def agent_chat(
+        user_message: ChatMessage
+    ) -> ChatMessage:
+        """
+        Handle user-agent chat interaction.
+
         Parameters
         ----------
         user_message : ChatMessage
@@ -553,20 +821,34 @@ async def create_api(
                     agent_selection=agent_selection
                 )
 
-            # NOTE: Measure computation time
-            start_time = time.time()
-
-            # NOTE: Invoke the agent with the user message
-            response = await agent.ainvoke(
-                {
-                    "messages": user_content
-                },
-                config=RunnableConfig(
-                    configurable={
-                        "thread_id": thread_id,
-                    }
-                )
-            )
+            # NOTE: wait for previous turns on the same thread, then for a slot
+            async with app.state.thread_locks.acquire(thread_id), \
+                    app.state.admission.admit(
+                        agent_selection, app.state.model_provider), \
+                    cancellable_turn(agent, thread_id):
+                # NOTE: Measure computation time
+                start_time = time.time()
+                # registered run, for progress reporting
+                run = app.state.runs.get(user_message.run_id)
+
+                # NOTE: Invoke the agent with the user message
+                # the last state equals the ainvoke result, tasks and updates feed the run
+                response = None
+                async for mode, chunk in agent.astream(
+                    {
+                        "messages": user_content
+                    },
+                    config=run_config(
+                        thread_id,
+                        limits=user_message.limits,
+                        started_at=start_time
+                    ),
+                    stream_mode=["values", "updates", "tasks"]
+                ):
+                    if mode == "values":
+                        response = chunk
+                    elif run is not None:
+                        run.observe(mode, chunk)
 
             # NOTE: Measure end time and calculate response time
             end_time = time.time()
@@ -598,10 +880,15 @@ async def create_api(
                         thread_id=thread_id,
                         response_time=response_time,
                         timestamp=timestamp,
-                        messages=messages,
+                        messages=(
+                            messages if user_message.include_history
+                            else current_turn_messages(messages)
+                        ),
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
-                        agent_selection=agent_selection
+                        agent_selection=agent_selection,
+                        tables=read_tables(message_text(
+                            getattr(response_message, "content", "")))
                     )
                 else:
                     logger.error("Agent did not return any messages.")
@@ -629,6 +916,9 @@ async def create_api(
                     output_tokens=DEFAULT_OUTPUT_TOKENS,
                     agent_selection=agent_selection
                 )
+        except AdmissionRejected:
+            # NOTE: answered with its status code by run_chat
+            raise
         except Exception as e:
             logger.error(f"Error in user_agent_chat: {e}")
             return ChatMessage(
@@ -643,10 +933,9 @@ async def create_api(
                 agent_selection=agent_selection
             )
 
-    @app.post("/chat-stream", response_model=ChatMessage)
-    async def user_agent_chat_stream(
+    async def agent_chat_stream(
         user_message: ChatMessage
-    ):
+    ) -> ChatMessage:
         """
         Handle user-agent chat interaction.
 
@@ -706,49 +995,87 @@ async def create_api(
                     agent_selection=agent_selection
                 )
 
-            # NOTE: Measure computation time
-            start_time = time.time()
-
-            # SECTION: Invoke the agent with the user message
-            async for chunk in agent.astream(
-                {"messages": [
-                    HumanMessage(content=user_content),
-                ]},
-                config=RunnableConfig(
-                    configurable={
-                        "thread_id": thread_id
-                    }
-                ),
-                stream_mode="updates"
-            ):
-                # NOTE: Process each chunk
-                if not isinstance(chunk, dict):
-                    logger.error(f"Received non-dictionary chunk: {chunk}")
-                    return ChatMessage(
-                        role="assistant",
-                        content="Agent response is not a valid dictionary.",
-                        thread_id=thread_id,
-                        response_time=None,
-                        timestamp=timestamp,
-                        messages=[],
-                        input_tokens=DEFAULT_INPUT_TOKENS,
-                        output_tokens=DEFAULT_OUTPUT_TOKENS,
-                        agent_selection=agent_selection
-                    )
+            # NOTE: messages produced by the current turn
+            turn = TurnMessages()
 
-                # NOTE: iterate through the messages in the chunk
-                for value in chunk.values():
-                    # get the messages
-                    messages = value['messages']
+            def broadcast_message(message):
+                # agent message analyzer
+                agent_message = agent_message_analyzer(message)
 
-                    # iterate through messages
-                    for message in messages:
-                        # agent message analyzer
-                        agent_message = agent_message_analyzer(message)
+                # LINK: broadcast the log to all websocket clients
+                if agent_message:
+                    broadcast_agent_log(
+                        agent_message,
+                        thread_id=thread_id,
+                        agent_name=agent_selection
+                    )
 
-                        # LINK: broadcast the log to all websocket clients
-                        if agent_message:
-                            await broadcast_agent_log(agent_message)
+            # NOTE: wait for previous turns on the same thread, then for a slot
+            async with app.state.thread_locks.acquire(thread_id), \
+                    app.state.admission.admit(
+                        agent_selection, app.state.model_provider), \
+                    cancellable_turn(agent, thread_id):
+                # NOTE: Measure computation time
+                start_time = time.time()
+                # registered run, for progress reporting
+                run = app.state.runs.get(user_message.run_id)
+
+                # SECTION: Invoke the agent with the user message
+                async for mode, chunk in agent.astream(
+                    {"messages": [
+                        HumanMessage(content=user_content),
+                    ]},
+                    config=run_config(
+                        thread_id,
+                        limits=user_message.limits,
+                        started_at=start_time
+                    ),
+                    stream_mode=["updates", "tasks"]
+                ):
+                    if run is not None:
+                        run.observe(mode, chunk)
+                    if mode != "updates":
+                        continue
+
+                    # NOTE: Process each chunk
+                    if not isinstance(chunk, dict):
+                        logger.error(f"Received non-dictionary chunk: {chunk}")
+                        return ChatMessage(
+                            role="assistant",
+                            content="Agent response is not a valid dictionary.",
+                            thread_id=thread_id,
+                            response_time=None,
+                            timestamp=timestamp,
+                            messages=[],
+                            input_tokens=DEFAULT_INPUT_TOKENS,
+                            output_tokens=DEFAULT_OUTPUT_TOKENS,
+                            agent_selection=agent_selection
+                        )
+
+                    # NOTE: iterate through the messages in the chunk, replaced
+                    # messages and tool calls dropped by the hooks excluded
+                    for node, value in chunk.items():
+                        for _, message in turn.update(node, value):
+                            broadcast_message(message)
+
+                for _, message in turn.finish():
+                    broadcast_message(message)
+                messages = turn.messages
+
+                # NOTE: full thread history on request
+                history = None
+                if (
+                    user_message.include_history and
+                    getattr(agent, "checkpointer", None) is not None
+                ):
+                    state = await agent.aget_state(
+                        RunnableConfig(
+                            configurable={
+                                "thread_id": thread_id
+                            }
+                        )
+                    )
+                    history = state.values.get("messages")
 
             # NOTE: Measure end time and calculate response time
             end_time = time.time()
@@ -776,10 +1103,12 @@ async def create_api(
                     thread_id=thread_id,
                     response_time=response_time,
                     timestamp=timestamp,
-                    messages=messages,
+                    messages=history or messages,
                     input_tokens=input_tokens,
                     output_tokens=output_tokens,
-                    agent_selection=agent_selection
+                    agent_selection=agent_selection,
+                    tables=read_tables(message_text(
+                        getattr(response_message, "content", "")))
                 )
             else:
                 # NOTE: no messages returned
@@ -795,6 +1124,9 @@ async def create_api(
                     output_tokens=DEFAULT_OUTPUT_TOKENS,
                     agent_selection=agent_selection
                 )
+        except AdmissionRejected:
+            # NOTE: answered with its status code by run_chat
+            raise
         except Exception as e:
             logger.error(f"Error in user_agent_chat_stream: {e}")
             return ChatMessage(
@@ -809,6 +1141,134 @@ async def create_api(
                 agent_selection=agent_selection
             )
 
+    @app.post("/chat-sse")
+    async def user_agent_chat_sse(
+        user_message: ChatMessage,
+        format: str = "sse"
+    ):
+        """
+        Handle user-agent chat interaction, streaming LLM tokens and tool events to
+        the requesting client as they arrive.
+
+        Parameters
+        ----------
+        user_message : ChatMessage
+            The message from the user to the agent.
+        format : str, optional
+            The wire format, "sse" (Server-Sent Events) or "ndjson", by default "sse".
+
+        Returns
+        -------
+        StreamingResponse
+            A stream of start, token, tool_call, tool_result and final (or error, or
+            cancelled) events. A run that is not admitted ends with an error event
+            carrying its status_code and retry_after.
+        """
+        # SECTION: validate inputs
+        if format not in ("sse", "ndjson"):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported stream format: {format}. Supported formats are: sse, ndjson."
+            )
+        encode = encode_sse if format == "sse" else encode_ndjson
+        media_type = "text/event-stream" if format == "sse" \
+            else "application/x-ndjson"
+
+        # NOTE: thread_id and timestamp
+        thread_id = user_message.thread_id or generate_thread()[1]
+        timestamp = user_message.timestamp or time.time()
+        agent_selection = user_message.agent_selection
+
+        # NOTE: select agent
+        agent = select_agent(app.state, agent_selection)
+
+        # NOTE: run id, sent in the start event
+        run_id = user_message.run_id or generate_run_id()
+        if app.state.runs.get(run_id):
+            raise HTTPException(
+                status_code=409, detail=f"Run {run_id} is already running.")
+
+        async def produce(events: asyncio.Queue):
+            # NOTE: wait for previous turns on the same thread, then for a slot
+            async with app.state.thread_locks.acquire(thread_id), \
+                    app.state.admission.admit(
+                        agent_selection, app.state.model_provider), \
+                    cancellable_turn(agent, thread_id):
+                async for event in stream_agent_events(
+                    agent,
+                    user_message.content,
+                    thread_id=thread_id,
+                    agent_selection=agent_selection,
+                    timestamp=timestamp,
+                    run=app.state.runs.get(run_id),
+                    limits=user_message.limits,
+                    run_id=run_id
+                ):
+                    await events.put(event)
+
+        async def event_stream():
+            # NOTE: first byte goes out before the agent starts
+            yield encode(StreamEvent(
+                event="start",
+                data={
+                    "thread_id": thread_id,
+                    "run_id": run_id,
+                    "agent_selection": agent_selection,
+                    "timestamp": timestamp,
+                }
+            ))
+
+            if not agent:
+                logger.error("ThermoAI agent is not created yet.")
+                yield encode(StreamEvent(
+                    event="error",
+                    data={"detail": "ThermoAI agent is not created yet."}
+                ))
+                return
+
+            try:
+                # NOTE: the run is cancelled if the client goes away
+                events: asyncio.Queue = asyncio.Queue()
+                run = app.state.runs.start(
+                    produce(events),
+                    thread_id=thread_id,
+                    agent_selection=agent_selection,
+                    run_id=run_id
+                )
+                async for event in app.state.runs.stream(run, events):
+                    data = encode(event)
+                    run.bytes_streamed += len(data)
+                    yield data
+            except RunCancelledError as e:
+                yield encode(StreamEvent(
+                    event="cancelled",
+                    data={"run_id": run_id, "reason": e.reason}
+                ))
+            except AdmissionRejected as e:
+                yield encode(StreamEvent(
+                    event="error",
+                    data={
+                        "detail": e.detail,
+                        "status_code": e.status_code,
+                        "retry_after": e.retry_after,
+                    }
+                ))
+            except Exception as e:
+                logger.error(f"Error in user_agent_chat_sse: {e}")
+                yield encode(StreamEvent(
+                    event="error",
+                    data={"detail": f"Failed to process user message: {e}"}
+                ))
+
+        return StreamingResponse(
+            event_stream(),
+            media_type=media_type,
+            headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no",
+            }
+        )
+
     # SECTION: Return the FastAPI application instance
     @app.get("/info", response_model=ApiConfigSummary)
     async def get_app_info():
@@ -0,0 +1,504 @@
+# import libs
+import logging
+import time
+import uuid
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional
+)
+from fastapi import HTTPException, APIRouter, Request, Query
+from fastapi.responses import JSONResponse
+from langchain_core.runnables import RunnableConfig
+from langchain_core.messages import AIMessage, ToolMessage
+# local
+from ..utils import FastJSONResponse
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+# set logging level
+logger.setLevel(logging.INFO)
+
+# SECTION: api router
+runs_router = APIRouter(prefix="/runs")
+
+RunStatus = Literal["running", "completed", "cancelled", "failed"]
+
+# NOTE: content of the tool results recorded for interrupted tool calls
+CANCELLED_TOOL_CONTENT = "Tool call cancelled: the run was stopped before the tool returned."
+
+
+class RunCancelledError(Exception):
+    '''
+    Raised to the waiter of a run that was cancelled.
+    '''
+
+    def __init__(self, run_id: str, reason: Optional[str] = None):
+        super().__init__(f"Run {run_id} was cancelled ({reason or 'unknown'}).")
+        self.run_id = run_id
+        self.reason = reason
+
+
+def generate_run_id() -> str:
+    """Generate a unique run id."""
+    return str(uuid.uuid4())
+
+
+# SECTION: checkpoint repair
+async def close_cancelled_turn(agent: Any, thread_id: str) -> int:
+    '''
+    Record a cancelled turn in the thread's checkpoint.
+
+    Steps completed before the cancellation are already checkpointed by LangGraph.
+    If the run was stopped while tools were running, the last AI message has tool
+    calls without results, which LLM providers reject on the next turn, so a
+    cancelled tool result is added for each of them.
+
+    Parameters
+    ----------
+    agent : CompiledStateGraph
+        The agent of the cancelled run.
+    thread_id : str
+        Identifier for the chat thread.
+
+    Returns
+    -------
+    int
+        The number of tool calls closed.
+    '''
+    if getattr(agent, "checkpointer", None) is None:
+        return 0
+
+    config = RunnableConfig(configurable={"thread_id": thread_id})
+    state = await agent.aget_state(config)
+    messages = state.values.get("messages", []) if state.values else []
+
+    # NOTE: tool calls of the last AI message without a result
+    answered = {
+        m.tool_call_id for m in messages if isinstance(m, ToolMessage)
+    }
+    pending = []
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            pending = [
+                tool_call for tool_call in message.tool_calls
+                if tool_call.get("id") not in answered
+            ]
+            break
+    if not pending:
+        return 0
+
+    await agent.aupdate_state(
+        config,
+        {"messages": [
+            ToolMessage(
+                content=CANCELLED_TOOL_CONTENT,
+                tool_call_id=tool_call["id"],
+                name=tool_call.get("name"),
+                status="error"
+            )
+            for tool_call in pending
+        ]},
+        # NOTE: the tool node of create_react_agent
+        as_node="tools" if "tools" in getattr(agent, "nodes", {}) else None
+    )
+    logger.info(
+        f"Closed {len(pending)} cancelled tool call(s) on thread {thread_id}")
+    return len(pending)
+
+
+@asynccontextmanager
+async def cancellable_turn(agent: Any, thread_id: str):
+    '''
+    Repair the thread's checkpoint if the block is cancelled.
+
+    Use it inside the thread lock, so the next turn sees the repaired thread.
+    '''
+    try:
+        yield
+    except (asyncio.CancelledError, GeneratorExit):
+        try:
+            await asyncio.shield(close_cancelled_turn(agent, thread_id))
+        except Exception as e:
+            logger.error(
+                f"Failed to record cancelled turn on thread {thread_id}: {e}")
+        raise
+
+
+# SECTION: run manager
+class Run:
+    '''
+    A running agent turn that can be cancelled, with its live progress.
+
+    The chat handlers feed the items of `agent.astream` to `observe`, which tracks the
+    graph node being executed, the tool calls waiting for a result and the tokens
+    reported by the LLM; streaming endpoints add the bytes they send.
+    '''
+
+    def __init__(
+        self,
+        run_id: str,
+        thread_id: str,
+        agent_selection: Optional[str],
+        task: asyncio.Task
+    ):
+        # NOTE: set attributes
+        self.run_id = run_id
+        self.thread_id = thread_id
+        self.agent_selection = agent_selection
+        self.task = task
+        self.created_at = time.time()
+        self.status: RunStatus = "running"
+        self.cancel_reason: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        # NOTE: progress
+        self.node: Optional[str] = None
+        self.steps = 0
+        # tool call id -> tool call waiting for its result
+        self.pending_tool_calls: Dict[str, Dict[str, Any]] = {}
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.bytes_streamed = 0
+        self.updated_at = self.created_at
+
+    # SECTION: progress
+    def observe(self, mode: str, chunk: Any):
+        '''
+        Update the progress from an item of `agent.astream`.
+
+        Parameters
+        ----------
+        mode : str
+            The stream mode of the item: "tasks" gives the node being executed,
+            "updates" the messages produced; other modes are ignored.
+        chunk : Any
+            The streamed item.
+        '''
+        self.updated_at = time.time()
+        if not isinstance(chunk, dict):
+            return
+
+        if mode == "tasks":
+            # NOTE: task start events carry the input, task results do not
+            if "input" in chunk:
+                self.node = chunk.get("name")
+                self.steps += 1
+        elif mode == "updates":
+            for value in chunk.values():
+                if isinstance(value, dict):
+                    self.observe_messages(value.get("messages") or [])
+
+    def observe_messages(self, messages: Iterable[Any]):
+        '''
+        Update tokens and pending tool calls from the messages produced by a node.
+        '''
+        for message in messages:
+            if isinstance(message, AIMessage):
+                usage = message.usage_metadata or {}
+                self.input_tokens += usage.get("input_tokens", 0)
+                self.output_tokens += usage.get("output_tokens", 0)
+                for tool_call in message.tool_calls:
+                    self.pending_tool_calls[tool_call.get("id") or ""] = {
+                        "id": tool_call.get("id"),
+                        "name": tool_call.get("name"),
+                        "args": tool_call.get("args"),
+                        "requested_at": self.updated_at,
+                    }
+            elif isinstance(message, ToolMessage):
+                self.pending_tool_calls.pop(message.tool_call_id, None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = self.finished_at or time.time()
+        return {
+            "run_id": self.run_id,
+            "thread_id": self.thread_id,
+            "agent_selection": self.agent_selection,
+            "status": self.status,
+            "cancel_reason": self.cancel_reason,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "elapsed": now - self.created_at,
+            "node": self.node,
+            "steps": self.steps,
+            "pending_tool_calls": [
+                {**tool_call, "waiting": now - tool_call["requested_at"]}
+                for tool_call in self.pending_tool_calls.values()
+            ],
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "bytes_streamed": self.bytes_streamed,
+            "updated_at": self.updated_at,
+        }
+
+
+class RunManager:
+    '''
+    Registry of running agent turns.
+
+    Every chat endpoint runs its agent turn as a task registered here, so it can be
+    cancelled with `POST /runs/{run_id}/cancel` or when its client goes away.
+    Cancelling the task cancels the LangGraph run and the tool calls in flight,
+    including MCP requests.
+    '''
+
+    def __init__(
+        self,
+        disconnect_poll_interval: float = 0.5,
+        history_size: int = 100
+    ):
+        '''
+        Initialize the run manager.
+
+        Parameters
+        ----------
+        disconnect_poll_interval : float, optional
+            Seconds between two checks for a disconnected HTTP client, by default 0.5.
+        history_size : int, optional
+            Number of finished runs kept for inspection, by default 100.
+        '''
+        # NOTE: set attributes
+        self.disconnect_poll_interval = disconnect_poll_interval
+        self.runs: Dict[str, Run] = {}
+        # recently finished runs
+        self.history: Deque[Run] = deque(maxlen=history_size)
+        # counters
+        self.started = 0
+        self.cancelled = 0
+
+    def start(
+        self,
+        coro: Awaitable[Any],
+        thread_id: str,
+        agent_selection: Optional[str] = None,
+        run_id: Optional[str] = None
+    ) -> Run:
+        '''
+        Run a coroutine as a cancellable task.
+
+        Raises
+        ------
+        ValueError
+            If a run with the same run_id is running.
+        '''
+        run_id = run_id or generate_run_id()
+        if run_id in self.runs:
+            coro.close()  # type: ignore[attr-defined]
+            raise ValueError(f"Run {run_id} is already running.")
+
+        task = asyncio.ensure_future(coro)
+        run = Run(run_id, thread_id, agent_selection, task)
+        self.runs[run_id] = run
+        self.started += 1
+        task.add_done_callback(lambda _: self._finish(run))
+        return run
+
+    def _finish(self, run: Run):
+        """Set the final status of a run and forget it."""
+        if run.task.cancelled():
+            run.status = "cancelled"
+        elif run.task.exception() is not None:
+            run.status = "failed"
+        else:
+            run.status = "completed"
+        run.finished_at = time.time()
+        run.pending_tool_calls.clear()
+        self.runs.pop(run.run_id, None)
+        self.history.append(run)
+
+    def get(self, run_id: str) -> Optional[Run]:
+        """Return a running run."""
+        return self.runs.get(run_id)
+
+    def find(self, run_id: str) -> Optional[Run]:
+        """Return a running or recently finished run."""
+        run = self.runs.get(run_id)
+        if run is not None:
+            return run
+        for run in self.history:
+            if run.run_id == run_id:
+                return run
+        return None
+
+    def list_runs(
+        self,
+        thread_id: Optional[str] = None,
+        agent_selection: Optional[str] = None,
+        include_finished: bool = False
+    ) -> List[Run]:
+        '''
+        Return the runs, longest running first, optionally filtered.
+        '''
+        runs: Iterable[Run] = list(self.runs.values())
+        if include_finished:
+            runs = [*runs, *self.history]
+        return sorted(
+            (
+                run for run in runs
+                if (thread_id is None or run.thread_id == thread_id) and
+                (agent_selection is None or run.agent_selection == agent_selection)
+            ),
+            key=lambda run: run.created_at
+        )
+
+    def cancel(self, run_id: str, reason: str = "user") -> bool:
+        '''
+        Cancel a running run.
+
+        Returns
+        -------
+        bool
+            True if the run was running and is being cancelled.
+        '''
+        run = self.runs.get(run_id)
+        if run is None or run.task.done():
+            return False
+        if run.cancel_reason is None:
+            run.cancel_reason = reason
+            self.cancelled += 1
+            logger.info(f"Cancelling run {run_id} ({reason})")
+        run.task.cancel()
+        return True
+
+    async def wait(self, run: Run, request: Optional[Request] = None) -> Any:
+        '''
+        Wait for a run, cancelling it if the HTTP client disconnects.
+
+        Raises
+        ------
+        RunCancelledError
+            If the run was cancelled.
+        '''
+        while not run.task.done():
+            done, _ = await asyncio.wait(
+                {run.task}, timeout=self.disconnect_poll_interval)
+            if done:
+                break
+            if request is not None and await request.is_disconnected():
+                self.cancel(run.run_id, reason="disconnect")
+                break
+        # NOTE: let the cancelled run record its partial state
+        try:
+            return await asyncio.shield(run.task)
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if current is not None and current.cancelling():
+                # the waiting request itself was cancelled
+                self.cancel(run.run_id, reason="disconnect")
+                raise
+            raise RunCancelledError(run.run_id, run.cancel_reason)
+
+    async def stream(self, run: Run, events: "asyncio.Queue[Any]") -> AsyncIterator[Any]:
+        '''
+        Yield the items a run puts on a queue until the run finishes.
+
+        If the consumer stops (client disconnected), the run is cancelled.
+
+        Raises
+        ------
+        RunCancelledError
+            If the run was cancelled.
+        '''
+        try:
+            while True:
+                getter = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait(
+                    {getter, run.task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                    continue
+                getter.cancel()
+                # NOTE: the run finished, flush what it queued
+                while not events.empty():
+                    yield events.get_nowait()
+                if run.task.cancelled():
+                    raise RunCancelledError(run.run_id, run.cancel_reason)
+                # raises the run's error
+                run.task.result()
+                return
+        finally:
+            if not run.task.done():
+                self.cancel(run.run_id, reason="disconnect")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": len(self.runs),
+            "started": self.started,
+            "cancelled": self.cancelled,
+        }
+
+
+# SECTION: routes
+@runs_router.get("")
+async def get_runs(
+    request: Request,
+    thread_id: Optional[str] = Query(None, description="Only runs of this thread"),
+    agent_selection: Optional[str] = Query(None, description="Only runs of this agent"),
+    include_finished: bool = Query(False, description="Include recently finished runs"),
+):
+    """
+    List the agent runs in progress, longest running first.
+    """
+    runs: RunManager = request.app.state.runs
+
+    return FastJSONResponse(
+        content={
+            "message": "Runs retrieved successfully",
+            "success": True,
+            "summary": runs.metrics(),
+            "data": [
+                run.to_dict()
+                for run in runs.list_runs(thread_id, agent_selection, include_finished)
+            ],
+        },
+        status_code=200
+    )
+
+
+@runs_router.get("/{run_id}")
+async def get_run(run_id: str, request: Request):
+    """
+    Get the progress of a running or recently finished agent run.
+    """
+    run = request.app.state.runs.find(run_id)
+    if run is None:
+        raise HTTPException(
+            status_code=404, detail=f"Run {run_id} not found.")
+
+    return FastJSONResponse(
+        content={
+            "message": "Run retrieved successfully",
+            "success": True,
+            "data": run.to_dict(),
+        },
+        status_code=200
+    )
+
+
+@runs_router.post("/{run_id}/cancel")
+async def cancel_run(run_id: str, request: Request):
+    """
+    Cancel a running agent turn and the tool calls it has in flight.
+    """
+    runs: RunManager = request.app.state.runs
+    run = runs.get(run_id)
+    if run is None or not runs.cancel(run_id, reason="user"):
+        raise HTTPException(
+            status_code=404, detail=f"Run {run_id} not found or already finished.")
+
+    return JSONResponse(
+        content={
+            "message": f"Run {run_id} cancelled",
+            "success": True,
+            "data": run.to_dict(),
+        },
+        status_code=200
+    )
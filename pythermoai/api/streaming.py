@@ -0,0 +1,310 @@
+# import libs
+import logging
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    ToolMessage,
+    BaseMessage
+)
+# local
+from ..models import ChatMessage, StreamEvent, RunLimits
+from ..utils import (
+    message_token_counter,
+    chat_message_to_dict,
+    json_dumps
+)
+from ..config import default_token_metadata
+from ..agents import run_config
+from ..tables import read_tables
+from .runs import Run
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: constants
+DEFAULT_INPUT_TOKENS = default_token_metadata['input_tokens']
+DEFAULT_OUTPUT_TOKENS = default_token_metadata['output_tokens']
+
+
+def message_text(content: Any) -> str:
+    """
+    Extract the text of a message content, which can be a string or a list of blocks.
+    """
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str) else str(block.get("text", ""))
+            for block in content
+            if isinstance(block, str) or (
+                isinstance(block, dict) and block.get("type") == "text"
+            )
+        )
+    return ""
+
+
+def build_chat_response(
+    messages: List[BaseMessage],
+    thread_id: str,
+    timestamp: float,
+    response_time: Optional[float],
+    agent_selection: Optional[str],
+    run_id: Optional[str] = None
+) -> ChatMessage:
+    """
+    Build the assistant ChatMessage of a turn from the messages it produced.
+    """
+    # NOTE: no messages returned
+    if not messages:
+        return ChatMessage(
+            role="assistant",
+            content="Agent response is not a list of messages.",
+            thread_id=thread_id,
+            response_time=response_time,
+            timestamp=timestamp,
+            messages=[],
+            input_tokens=DEFAULT_INPUT_TOKENS,
+            output_tokens=DEFAULT_OUTPUT_TOKENS,
+            agent_selection=agent_selection,
+            run_id=run_id
+        )
+
+    # NOTE: last message is the agent's response
+    response_message = messages[-1]
+    token_metadata = message_token_counter(response_message)
+    content = message_text(getattr(
+        response_message, "content", str(response_message)))
+
+    return ChatMessage(
+        role="assistant",
+        content=content,
+        thread_id=thread_id,
+        response_time=response_time,
+        timestamp=timestamp,
+        messages=messages,
+        input_tokens=token_metadata.input_tokens,
+        output_tokens=token_metadata.output_tokens,
+        agent_selection=agent_selection,
+        run_id=run_id,
+        tables=read_tables(content)
+    )
+
+
+class TurnMessages:
+    '''
+    The messages of a turn, collected from the node updates of langgraph's `updates`
+    stream mode.
+
+    A message with the id of an earlier one (e.g. the tool calls replaced by the limits
+    hook, or the answer repaired by the repair hook) replaces it in place. Model
+    messages are held back until the update of another node confirms them, so their
+    tool calls are reported only once the post-model hook kept them.
+    '''
+
+    def __init__(self):
+        # NOTE: set attributes
+        self._messages: Dict[str, BaseMessage] = {}
+        # held model messages, with their node
+        self._pending: Dict[str, str] = {}
+        self._anonymous = 0
+
+    def _new_key(self) -> str:
+        self._anonymous += 1
+        return f"#{self._anonymous}"
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return list(self._messages.values())
+
+    def update(self, node: str, value: Any) -> List[Tuple[str, BaseMessage]]:
+        '''
+        Apply the update of a node and return the (node, message) pairs it confirms:
+        the held model messages of other nodes, as last replaced, and the new messages
+        that are not model messages.
+        '''
+        updates = (value.get("messages") or []) if isinstance(value, dict) else []
+        # NOTE: messages without an id are new
+        keys = [message.id or self._new_key() for message in updates]
+        # NOTE: replacements first, so held messages are confirmed as replaced
+        for key, message in zip(keys, updates):
+            if key in self._messages:
+                self._messages[key] = message
+        confirmed: List[Tuple[str, BaseMessage]] = []
+        for key, held_node in list(self._pending.items()):
+            if held_node != node:
+                del self._pending[key]
+                confirmed.append((held_node, self._messages[key]))
+        for key, message in zip(keys, updates):
+            if key in self._messages:
+                continue
+            self._messages[key] = message
+            if isinstance(message, AIMessage):
+                self._pending[key] = node
+            else:
+                confirmed.append((node, message))
+        return confirmed
+
+    def finish(self) -> List[Tuple[str, BaseMessage]]:
+        '''
+        Return the (node, message) pairs still held at the end of the run.
+        '''
+        confirmed = [(node, self._messages[key]) for key, node in self._pending.items()]
+        self._pending.clear()
+        return confirmed
+
+
+def message_events(node: str, message: BaseMessage) -> List[StreamEvent]:
+    '''
+    Return the tool_call or tool_result events of a confirmed message.
+    '''
+    if isinstance(message, AIMessage):
+        return [
+            StreamEvent(
+                event="tool_call",
+                data={
+                    "id": tool_call.get("id"),
+                    "name": tool_call.get("name"),
+                    "args": tool_call.get("args"),
+                    "node": node,
+                }
+            )
+            for tool_call in message.tool_calls
+        ]
+    if isinstance(message, ToolMessage):
+        return [StreamEvent(
+            event="tool_result",
+            data={
+                "tool_call_id": message.tool_call_id,
+                "name": message.name,
+                "status": getattr(message, "status", None),
+                "content": message_text(message.content),
+                "node": node,
+            }
+        )]
+    return []
+
+
+async def stream_agent_events(
+    agent: Any,
+    user_content: str,
+    thread_id: str,
+    agent_selection: Optional[str] = None,
+    timestamp: Optional[float] = None,
+    run: Optional[Run] = None,
+    limits: Optional[RunLimits] = None,
+    run_id: Optional[str] = None
+) -> AsyncIterator[StreamEvent]:
+    """
+    Run the agent on a user message and yield events as they happen.
+
+    LLM tokens are streamed with langgraph's `messages` stream mode, tool calls and
+    tool results with the `updates` stream mode. The last event is `final` and holds
+    the assistant ChatMessage of the turn.
+
+    Parameters
+    ----------
+    agent : CompiledStateGraph
+        The agent to run.
+    user_content : str
+        The message from the user to the agent.
+    thread_id : str
+        Identifier for the chat thread.
+    agent_selection : str, optional
+        Selected agent for the chat.
+    timestamp : float, optional
+        Timestamp of the user message.
+    run : Run, optional
+        Registered run whose progress is updated as the agent runs.
+    limits : RunLimits, optional
+        Limits of this run, overriding the agent's limits.
+    run_id : str, optional
+        Identifier of the run, set on the final ChatMessage, by default the id of `run`.
+
+    Yields
+    ------
+    StreamEvent
+        token, tool_call, tool_result and final events.
+    """
+    timestamp = timestamp or time.time()
+    start_time = time.time()
+    # NOTE: messages produced by the current turn
+    turn = TurnMessages()
+
+    # NOTE: task events give the current node of the run
+    stream_mode = ["messages", "updates"]
+    if run is not None:
+        stream_mode.append("tasks")
+
+    # SECTION: run the agent
+    async for mode, chunk in agent.astream(
+        {"messages": [
+            HumanMessage(content=user_content),
+        ]},
+        config=run_config(thread_id, limits=limits, started_at=start_time),
+        stream_mode=stream_mode
+    ):
+        if run is not None:
+            run.observe(mode, chunk)
+
+        # NOTE: llm tokens
+        if mode == "messages":
+            message_chunk, metadata = chunk
+            if not isinstance(message_chunk, AIMessageChunk):
+                continue
+            text = message_text(message_chunk.content)
+            if text:
+                yield StreamEvent(
+                    event="token",
+                    data={
+                        "content": text,
+                        "node": metadata.get("langgraph_node"),
+                    }
+                )
+            continue
+
+        # NOTE: completed node updates
+        if mode != "updates" or not isinstance(chunk, dict):
+            continue
+        for node, value in chunk.items():
+            for confirmed_node, message in turn.update(node, value):
+                for event in message_events(confirmed_node, message):
+                    yield event
+
+    for confirmed_node, message in turn.finish():
+        for event in message_events(confirmed_node, message):
+            yield event
+
+    # SECTION: final answer
+    response = build_chat_response(
+        turn.messages,
+        thread_id=thread_id,
+        timestamp=timestamp,
+        response_time=time.time() - start_time,
+        agent_selection=agent_selection,
+        run_id=run_id or (run.run_id if run is not None else None)
+    )
+    yield StreamEvent(event="final", data=chat_message_to_dict(response))
+
+
+# SECTION: wire formats
+def encode_sse(event: StreamEvent) -> bytes:
+    """Encode an event as a Server-Sent Events frame."""
+    return (
+        b"event: " + event.event.encode() +
+        b"\ndata: " + json_dumps(event.data) + b"\n\n"
+    )
+
+
+def encode_ndjson(event: StreamEvent) -> bytes:
+    """Encode an event as a newline-delimited JSON line."""
+    return json_dumps({"event": event.event, "data": event.data}) + b"\n"
@@ -0,0 +1,31 @@
+# import libs
+import logging
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+# local
+from ..tables import get_repair_stats
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+# set logging level
+logger.setLevel(logging.INFO)
+
+# SECTION: api router
+tables_router = APIRouter(prefix="/tables")
+
+
+@tables_router.get("/repairs")
+async def get_repairs():
+    """
+    Get the repair rates of the YAML tables of the answers: answers valid as returned,
+    repaired locally, repaired by a re-prompt of the model or left invalid, and the
+    count of each fix.
+    """
+    return JSONResponse(
+        content={
+            "message": "Table repair metrics retrieved successfully",
+            "success": True,
+            "data": get_repair_stats().metrics(),
+        },
+        status_code=200
+    )
@@ -0,0 +1,157 @@
+# import libs
+import logging
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from typing import (
+    AsyncIterator,
+    Dict,
+    List,
+    Optional
+)
+# local
+from ..models import ThreadMetrics
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+
+class _ThreadEntry:
+    '''
+    Lock and metrics of a single chat thread.
+    '''
+
+    def __init__(self, thread_id: str):
+        self.lock = asyncio.Lock()
+        self.metrics = ThreadMetrics(thread_id=thread_id)
+
+    @property
+    def idle(self) -> bool:
+        return not self.lock.locked() and self.metrics.queue_depth == 0
+
+
+class ThreadLockManager:
+    '''
+    Serializes agent turns per thread while letting different threads run in parallel.
+
+    Each thread_id owns an asyncio lock, so two turns on the same thread are executed
+    in arrival order and never read/write the same checkpoint concurrently. Turns on
+    different threads never wait on each other.
+    '''
+
+    def __init__(self, max_idle_threads: int = 1024):
+        '''
+        Initialize the thread lock manager.
+
+        Parameters
+        ----------
+        max_idle_threads : int, optional
+            Number of idle threads whose lock and metrics are kept, by default 1024.
+            The least recently used idle threads are dropped beyond this number.
+        '''
+        # NOTE: set attributes
+        self.max_idle_threads = max_idle_threads
+        self._entries: OrderedDict[str, _ThreadEntry] = OrderedDict()
+
+    def _get_entry(self, thread_id: str) -> _ThreadEntry:
+        """Return the entry of a thread, creating it if needed."""
+        entry = self._entries.get(thread_id)
+        if entry is None:
+            entry = _ThreadEntry(thread_id)
+            self._entries[thread_id] = entry
+        self._entries.move_to_end(thread_id)
+        return entry
+
+    def _prune(self):
+        """Drop the least recently used idle threads beyond the limit."""
+        excess = len(self._entries) - self.max_idle_threads
+        if excess <= 0:
+            return
+        for thread_id in list(self._entries.keys()):
+            if excess <= 0:
+                break
+            if self._entries[thread_id].idle:
+                del self._entries[thread_id]
+                excess -= 1
+
+    @asynccontextmanager
+    async def acquire(self, thread_id: str) -> AsyncIterator[float]:
+        '''
+        Wait for the thread to be free and hold it for the duration of the block.
+
+        Parameters
+        ----------
+        thread_id : str
+            Identifier for the chat thread.
+
+        Yields
+        ------
+        float
+            The time (in seconds) spent waiting for the thread.
+        '''
+        entry = self._get_entry(thread_id)
+        metrics = entry.metrics
+
+        # SECTION: wait for the thread
+        start = time.perf_counter()
+        metrics.queue_depth += 1
+        try:
+            await entry.lock.acquire()
+        finally:
+            metrics.queue_depth -= 1
+        wait_time = time.perf_counter() - start
+
+        # NOTE: record wait metrics
+        metrics.running = True
+        metrics.last_wait_time = wait_time
+        metrics.max_wait_time = max(metrics.max_wait_time, wait_time)
+        metrics.total_wait_time += wait_time
+        metrics.last_activity = time.time()
+        if wait_time > 0.0 and metrics.queue_depth > 0:
+            logger.info(
+                f"Thread {thread_id} acquired after {wait_time:.3f}s, "
+                f"{metrics.queue_depth} turn(s) still waiting")
+
+        # SECTION: run the turn
+        try:
+            yield wait_time
+        finally:
+            metrics.running = False
+            metrics.completed_turns += 1
+            metrics.last_activity = time.time()
+            entry.lock.release()
+            self._prune()
+
+    def is_busy(self, thread_id: str) -> bool:
+        """Returns True if a turn is running or waiting on the thread."""
+        entry = self._entries.get(thread_id)
+        return entry is not None and not entry.idle
+
+    def metrics(self, thread_id: Optional[str] = None) -> List[ThreadMetrics]:
+        '''
+        Return the queueing metrics of one or all threads.
+
+        Parameters
+        ----------
+        thread_id : str, optional
+            Identifier for the chat thread. If None, metrics of all tracked threads are returned.
+
+        Returns
+        -------
+        List[ThreadMetrics]
+            The metrics of the requested threads.
+        '''
+        if thread_id is not None:
+            entry = self._entries.get(thread_id)
+            return [entry.metrics.model_copy()] if entry else []
+        return [entry.metrics.model_copy() for entry in self._entries.values()]
+
+    def summary(self) -> Dict[str, int]:
+        """Return aggregate counts over all tracked threads."""
+        entries = list(self._entries.values())
+        return {
+            "threads": len(entries),
+            "running": sum(1 for e in entries if e.metrics.running),
+            "waiting": sum(e.metrics.queue_depth for e in entries),
+        }
@@ -0,0 +1,226 @@
+# import libs
+import logging
+from typing import Optional
+from fastapi import HTTPException, APIRouter, Request, Query
+from fastapi.responses import JSONResponse
+# local
+from ..memory import fork_thread, generate_thread_id
+from ..models import ThreadForkRequest
+from ..utils import message_to_dict, FastJSONResponse
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+# set logging level
+logger.setLevel(logging.INFO)
+
+# SECTION: api router
+threads_router = APIRouter(prefix="/threads")
+
+# NOTE: message types accepted by the type filter
+MESSAGE_TYPES = ("human", "ai", "tool", "system")
+
+
+# SECTION: helpers
+def get_agent_checkpointer(request: Request, agent_selection: str):
+    """
+    Return the checkpointer of the selected agent or raise an HTTP error.
+    """
+    agents = getattr(request.app.state, "agents", {})
+    agent = agents.get(agent_selection)
+    if not agent:
+        raise HTTPException(
+            status_code=404, detail=f"{agent_selection} not found.")
+
+    checkpointer = getattr(agent, "checkpointer", None)
+    if checkpointer is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{agent_selection} has no memory, enable memory_mode to keep threads.")
+    return checkpointer
+
+
+# SECTION: routes
+@threads_router.get("/metrics")
+async def get_threads_metrics(request: Request):
+    """
+    Get the queue depth and wait-time metrics of all tracked threads.
+    """
+    try:
+        thread_locks = request.app.state.thread_locks
+
+        return JSONResponse(
+            content={
+                "message": "Thread metrics retrieved successfully",
+                "success": True,
+                "summary": thread_locks.summary(),
+                "data": [m.model_dump() for m in thread_locks.metrics()],
+            },
+            status_code=200
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving thread metrics: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to retrieve thread metrics: {e}"
+        )
+
+
+@threads_router.get("/{thread_id}/metrics")
+async def get_thread_metrics(thread_id: str, request: Request):
+    """
+    Get the queue depth and wait-time metrics of a thread.
+    """
+    metrics = request.app.state.thread_locks.metrics(thread_id)
+    if not metrics:
+        raise HTTPException(
+            status_code=404, detail=f"Thread {thread_id} not found.")
+
+    return JSONResponse(
+        content={
+            "message": "Thread metrics retrieved successfully",
+            "success": True,
+            "data": metrics[0].model_dump(),
+        },
+        status_code=200
+    )
+
+
+@threads_router.post("/{thread_id}/fork")
+async def fork_thread_endpoint(
+    thread_id: str,
+    fork_request: ThreadForkRequest,
+    request: Request
+):
+    """
+    Fork a thread at a checkpoint into a new thread_id.
+
+    The new thread starts from the parent's messages and tool results, so follow-up
+    questions (different units, a subset of components, ...) branch without repeating
+    tool calls.
+    """
+    checkpointer = get_agent_checkpointer(
+        request, fork_request.agent_selection)
+    thread_locks = request.app.state.thread_locks
+
+    # SECTION: validate inputs
+    new_thread_id = fork_request.new_thread_id or generate_thread_id()
+    if new_thread_id == thread_id:
+        raise HTTPException(
+            status_code=400,
+            detail="The new thread_id must differ from the parent thread_id.")
+
+    try:
+        # NOTE: wait for running turns so the snapshot is consistent, and hold the new
+        # thread until it is written; locked in a fixed order so forks cannot deadlock
+        first, second = sorted((thread_id, new_thread_id))
+        async with thread_locks.acquire(first), thread_locks.acquire(second):
+            # NOTE: the new thread must not exist yet
+            if await checkpointer.aget_tuple(
+                    {"configurable": {"thread_id": new_thread_id, "checkpoint_ns": ""}}):
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Thread {new_thread_id} already exists.")
+            new_thread_id, checkpoint_id = await fork_thread(
+                checkpointer,
+                thread_id=thread_id,
+                checkpoint_id=fork_request.checkpoint_id,
+                new_thread_id=new_thread_id
+            )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error forking thread {thread_id}: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fork thread: {e}"
+        )
+
+    return JSONResponse(
+        content={
+            "message": f"Thread {thread_id} forked successfully",
+            "success": True,
+            "data": {
+                "thread_id": new_thread_id,
+                "parent_thread_id": thread_id,
+                "checkpoint_id": checkpoint_id,
+                "agent_selection": fork_request.agent_selection,
+            },
+        },
+        status_code=200
+    )
+
+
+@threads_router.get("/{thread_id}/messages")
+async def get_thread_messages(
+    thread_id: str,
+    request: Request,
+    agent_selection: str = Query(..., description="Agent that owns the thread"),
+    cursor: Optional[str] = Query(
+        None, description="Position to continue from, as returned in next_cursor"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of messages"),
+    types: Optional[str] = Query(
+        None, description="Comma-separated message types: human, ai, tool, system"),
+):
+    """
+    Get the messages of a thread, one page at a time.
+
+    Messages are returned oldest first together with their position in the thread.
+    Pass `next_cursor` back as `cursor` to get the next page; it is null on the last page.
+    """
+    checkpointer = get_agent_checkpointer(request, agent_selection)
+
+    # SECTION: validate inputs
+    try:
+        start = int(cursor) if cursor else 0
+        if start < 0:
+            raise ValueError
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+
+    type_filter = None
+    if types:
+        type_filter = {t.strip() for t in types.split(",") if t.strip()}
+        unknown = type_filter.difference(MESSAGE_TYPES)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown message types: {', '.join(sorted(unknown))}. "
+                f"Supported types are: {', '.join(MESSAGE_TYPES)}.")
+
+    # SECTION: load the thread
+    try:
+        checkpoint_tuple = await checkpointer.aget_tuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        )
+    except Exception as e:
+        logger.error(f"Error loading thread {thread_id}: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Failed to load thread: {e}")
+
+    if checkpoint_tuple is None:
+        raise HTTPException(
+            status_code=404, detail=f"Thread {thread_id} not found.")
+
+    messages = checkpoint_tuple.checkpoint["channel_values"].get("messages", [])
+
+    # SECTION: collect the page
+    page = []
+    position = start
+    while position < len(messages) and len(page) < limit:
+        message = messages[position]
+        if type_filter is None or message.type in type_filter:
+            page.append({"index": position, **message_to_dict(message)})
+        position += 1
+
+    return FastJSONResponse(
+        content={
+            "message": "Thread messages retrieved successfully",
+            "success": True,
+            "data": page,
+            "total": len(messages),
+            "next_cursor": str(position) if position < len(messages) else None,
+        },
+        status_code=200
+    )
@@ -0,0 +1,499 @@
+# import libs
+import logging
+import time
+import json
+import asyncio
+from typing import (
+    Dict,
+    Iterable,
+    Literal,
+    Optional,
+    Set,
+    Union,
+    Any
+)
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+# local
+from ..models import AgentMessage
+from ..utils import agent_message_to_dict, json_dumps
+from .ws_framing import BlobCache, FrameEncoder, MSGPACK_SUBPROTOCOL
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: slow consumer policies
+SlowConsumerPolicy = Literal["drop_oldest", "drop_newest", "disconnect"]
+
+# NOTE: a queued frame is either encoded text or an agent message payload that the
+# client's encoder encodes when it is sent
+Frame = Union[str, Dict[str, Any]]
+
+
+def thread_topic(thread_id: str) -> str:
+    """Topic of the events of a chat thread."""
+    return f"thread:{thread_id}"
+
+
+def agent_topic(agent_name: str) -> str:
+    """Topic of the events of an agent."""
+    return f"agent:{agent_name}"
+
+
+class WebSocketClient:
+    '''
+    A connected websocket client with its own bounded send queue and writer task.
+    '''
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue_size: int,
+        encoder: Optional[FrameEncoder] = None
+    ):
+        # NOTE: set attributes
+        self.websocket = websocket
+        # None for the default JSON text framing
+        self.encoder = encoder
+        self.queue: asyncio.Queue[Frame] = asyncio.Queue(maxsize=max_queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.connected_at = time.time()
+        # last inbound message or completed send
+        self.last_seen = time.monotonic()
+        # start time of the send in progress, None when idle
+        self.send_started: Optional[float] = None
+        # subscribed topics
+        self.topics: Set[str] = set()
+        # counters
+        self.sent = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.closed = False
+
+    @property
+    def alive(self) -> bool:
+        return (
+            not self.closed and
+            self.websocket.client_state == WebSocketState.CONNECTED and
+            self.websocket.application_state == WebSocketState.CONNECTED and
+            (self.writer is None or not self.writer.done())
+        )
+
+
+class WebSocketHub:
+    '''
+    Fan-out hub for websocket clients.
+
+    Producers call `publish`, which only puts the frame on each client's bounded queue
+    and never waits for a client. Every client has a dedicated writer task draining its
+    queue, so a slow browser tab only delays itself. When a queue is full the slow
+    consumer policy applies: drop the oldest frame, drop the new frame, or disconnect
+    the client. A heartbeat task prunes closed sockets and clients stuck on a send.
+
+    Clients subscribe to `thread_id`s and/or agents, and events are routed only to the
+    subscribers of their topics through a topic -> clients index, so fan-out cost scales
+    with interested clients. Clients without subscriptions receive no events, unless
+    `require_subscription` is turned off for clients that predate subscriptions.
+
+    Clients can negotiate a compact framing for agent messages (see `FrameEncoder`):
+    msgpack binary frames, delta-encoded fields and large tool contents by reference.
+    '''
+
+    def __init__(
+        self,
+        max_queue_size: int = 256,
+        slow_consumer_policy: SlowConsumerPolicy = "drop_oldest",
+        heartbeat_interval: float = 15.0,
+        send_timeout: float = 30.0,
+        require_subscription: bool = True,
+        blob_cache_size: int = 32 * 1024 * 1024
+    ):
+        '''
+        Initialize the websocket hub.
+
+        Parameters
+        ----------
+        max_queue_size : int, optional
+            Maximum number of frames waiting to be sent to a client, by default 256.
+        slow_consumer_policy : str, optional
+            What to do when a client's queue is full: "drop_oldest", "drop_newest" or
+            "disconnect", by default "drop_oldest".
+        heartbeat_interval : float, optional
+            Seconds between two sweeps for dead clients, by default 15.0.
+        send_timeout : float, optional
+            Seconds a single send may take before the client is considered dead, by default 30.0.
+        require_subscription : bool, optional
+            If True, clients without subscriptions receive no events, by default True.
+            False sends every event to unsubscribed clients, as before subscriptions
+            existed (`thermo_chat` does so for the bundled web UI).
+        blob_cache_size : int, optional
+            Maximum bytes of large tool contents kept for clients in reference mode,
+            by default 32 MiB.
+        '''
+        # SECTION: validate inputs
+        if slow_consumer_policy not in ("drop_oldest", "drop_newest", "disconnect"):
+            raise ValueError(
+                f"Unsupported slow consumer policy: {slow_consumer_policy}")
+
+        # NOTE: set attributes
+        self.max_queue_size = max_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.heartbeat_interval = heartbeat_interval
+        self.send_timeout = send_timeout
+        self.require_subscription = require_subscription
+        self.clients: Set[WebSocketClient] = set()
+        # NOTE: topic -> subscribed clients
+        self.topics: Dict[str, Set[WebSocketClient]] = {}
+        # clients without any subscription
+        self.unsubscribed: Set[WebSocketClient] = set()
+        # large tool contents sent by reference
+        self.blob_cache = BlobCache(blob_cache_size)
+        self._heartbeat: Optional[asyncio.Task] = None
+        # counters
+        self.published = 0
+        self.dropped = 0
+        self.disconnected_slow = 0
+
+    # SECTION: connections
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Iterable[str] = (),
+        encoder: Optional[FrameEncoder] = None,
+        subprotocol: Optional[str] = None
+    ) -> WebSocketClient:
+        '''
+        Accept a websocket, subscribe it to the initial topics and start its writer task.
+        '''
+        await websocket.accept(subprotocol=subprotocol)
+        client = WebSocketClient(websocket, self.max_queue_size, encoder)
+        client.writer = asyncio.create_task(self._writer(client))
+        self.clients.add(client)
+        self.unsubscribed.add(client)
+        self.subscribe(client, topics)
+        self._ensure_heartbeat()
+        logger.info(f"Websocket client connected, {len(self.clients)} client(s)")
+        return client
+
+    async def disconnect(self, client: WebSocketClient):
+        '''
+        Remove a client, stop its writer and close the socket.
+        '''
+        if client.closed:
+            return
+        client.closed = True
+        self.clients.discard(client)
+        self.unsubscribe(client, list(client.topics))
+        self.unsubscribed.discard(client)
+
+        # NOTE: stop the writer unless we are running inside it
+        if client.writer and client.writer is not asyncio.current_task():
+            client.writer.cancel()
+
+        try:
+            if client.websocket.application_state == WebSocketState.CONNECTED:
+                await client.websocket.close()
+        except Exception:
+            pass
+        logger.info(
+            f"Websocket client disconnected, {len(self.clients)} client(s)")
+
+    async def serve(self, websocket: WebSocket):
+        '''
+        Serve a websocket connection until the client goes away.
+
+        Initial subscriptions can be given as `thread_id` and `agent` query parameters
+        (repeatable). Afterwards the client can send
+        `{"action": "subscribe" | "unsubscribe", "thread_ids": [...], "agents": [...]}`.
+
+        The framing of agent messages is negotiated with the `format` (json | msgpack),
+        `delta` and `refs` (minimum tool content size sent by reference) query parameters,
+        or the `thermoai.msgpack` subprotocol. Clients that negotiate a framing first
+        receive a `{"type": "framing", ...}` text frame; control frames stay text.
+        '''
+        params = websocket.query_params
+        topics = [thread_topic(t) for t in params.getlist("thread_id")] + \
+            [agent_topic(a) for a in params.getlist("agent")]
+
+        # NOTE: framing negotiation
+        subprotocols = websocket.scope.get("subprotocols") or []
+        try:
+            encoder = FrameEncoder.from_request(
+                params, subprotocols, self.blob_cache)
+        except ValueError as e:
+            await websocket.close(code=1003, reason=str(e))
+            return
+        subprotocol = MSGPACK_SUBPROTOCOL if MSGPACK_SUBPROTOCOL in subprotocols else None
+
+        client = await self.connect(websocket, topics, encoder, subprotocol)
+        if encoder is not None:
+            self.send(client, json_dumps(
+                {"type": "framing", **encoder.describe()}).decode("utf-8"))
+        try:
+            while True:
+                text = await websocket.receive_text()
+                client.last_seen = time.monotonic()
+                # NOTE: application-level heartbeat
+                if text == "ping":
+                    self.send(client, "pong")
+                    continue
+                self._handle_control(client, text)
+        except Exception:
+            pass
+        finally:
+            await self.disconnect(client)
+
+    def _handle_control(self, client: WebSocketClient, text: str):
+        """Apply a subscribe/unsubscribe frame sent by a client."""
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(payload, dict):
+            return
+
+        action = payload.get("action")
+        if action not in ("subscribe", "unsubscribe"):
+            return
+        topics = [thread_topic(str(t)) for t in payload.get("thread_ids") or []] + \
+            [agent_topic(str(a)) for a in payload.get("agents") or []]
+
+        if action == "subscribe":
+            self.subscribe(client, topics)
+        else:
+            self.unsubscribe(client, topics)
+
+        # NOTE: acknowledge with the current subscriptions
+        self.send(client, json.dumps({
+            "type": "subscriptions",
+            "topics": sorted(client.topics),
+        }))
+
+    # SECTION: subscriptions
+    def subscribe(self, client: WebSocketClient, topics: Iterable[str]):
+        '''
+        Subscribe a client to topics.
+        '''
+        for topic in topics:
+            self.topics.setdefault(topic, set()).add(client)
+            client.topics.add(topic)
+        if client.topics:
+            self.unsubscribed.discard(client)
+
+    def unsubscribe(self, client: WebSocketClient, topics: Iterable[str]):
+        '''
+        Unsubscribe a client from topics.
+        '''
+        for topic in topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(client)
+                if not subscribers:
+                    del self.topics[topic]
+            client.topics.discard(topic)
+        if not client.topics and not client.closed:
+            self.unsubscribed.add(client)
+
+    # SECTION: publishing
+    def send(self, client: WebSocketClient, frame: Frame) -> bool:
+        '''
+        Queue a frame for one client without waiting.
+
+        Returns
+        -------
+        bool
+            True if the frame was queued.
+        '''
+        if client.closed:
+            return False
+        try:
+            client.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        # NOTE: slow consumer
+        if self.slow_consumer_policy == "drop_oldest":
+            try:
+                client.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            client.queue.put_nowait(frame)
+            client.dropped += 1
+            self.dropped += 1
+            return True
+        elif self.slow_consumer_policy == "drop_newest":
+            client.dropped += 1
+            self.dropped += 1
+            return False
+        else:
+            self.disconnected_slow += 1
+            asyncio.create_task(self.disconnect(client))
+            return False
+
+    def recipients(
+        self,
+        thread_id: Optional[str] = None,
+        agent_name: Optional[str] = None
+    ) -> Set[WebSocketClient]:
+        '''
+        Return the clients interested in an event of a thread and agent.
+        '''
+        recipients: Set[WebSocketClient] = set()
+        if thread_id:
+            recipients |= self.topics.get(thread_topic(thread_id), set())
+        if agent_name:
+            recipients |= self.topics.get(agent_topic(agent_name), set())
+        if not self.require_subscription:
+            recipients |= self.unsubscribed
+        return recipients
+
+    def publish(
+        self,
+        frame: str,
+        thread_id: Optional[str] = None,
+        agent_name: Optional[str] = None
+    ) -> int:
+        '''
+        Queue a text frame for the clients subscribed to its thread or agent.
+
+        Parameters
+        ----------
+        frame : str
+            The text frame to send.
+        thread_id : str, optional
+            Identifier for the chat thread the event belongs to.
+        agent_name : str, optional
+            Name of the agent the event belongs to.
+
+        Returns
+        -------
+        int
+            The number of clients the frame was queued for.
+        '''
+        # NOTE: not empty frame
+        if not frame or not frame.strip():
+            return 0
+        self.published += 1
+        return sum(
+            self.send(client, frame)
+            for client in self.recipients(thread_id, agent_name)
+        )
+
+    def publish_agent_message(
+        self,
+        agent_message: AgentMessage,
+        thread_id: Optional[str] = None,
+        agent_name: Optional[str] = None
+    ) -> int:
+        '''
+        Queue an agent message for the interested clients.
+
+        The JSON text frame is encoded once and shared by the clients with the default
+        framing; clients with a negotiated framing encode the payload in their writer.
+        '''
+        # NOTE: skip encoding when nobody listens
+        recipients = self.recipients(thread_id, agent_name)
+        if not recipients:
+            return 0
+        self.published += 1
+
+        payload = agent_message_to_dict(agent_message)
+        text: Optional[str] = None
+        queued = 0
+        for client in recipients:
+            if client.encoder is None:
+                if text is None:
+                    text = json_dumps(payload).decode("utf-8")
+                queued += self.send(client, text)
+            else:
+                queued += self.send(client, payload)
+        return queued
+
+    # SECTION: tasks
+    async def _writer(self, client: WebSocketClient):
+        """Drain the client's queue onto its socket."""
+        try:
+            while True:
+                frame = await client.queue.get()
+                if not isinstance(frame, str):
+                    frame = client.encoder.encode(frame)  # type: ignore[union-attr]
+                client.send_started = time.monotonic()
+                if isinstance(frame, bytes):
+                    await client.websocket.send_bytes(frame)
+                else:
+                    await client.websocket.send_text(frame)
+                client.send_started = None
+                client.last_seen = time.monotonic()
+                client.sent += 1
+                client.bytes_sent += len(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Websocket send failed, dropping client: {e}")
+            await self.disconnect(client)
+
+    def _ensure_heartbeat(self):
+        """Start the heartbeat task if it is not running."""
+        if self._heartbeat is None or self._heartbeat.done():
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self):
+        """Periodically prune dead and stuck clients."""
+        while self.clients:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.monotonic()
+            for client in list(self.clients):
+                stuck = (
+                    client.send_started is not None and
+                    now - client.send_started > self.send_timeout
+                )
+                if stuck or not client.alive:
+                    logger.info("Pruning dead websocket client")
+                    await self.disconnect(client)
+
+    async def close(self):
+        '''
+        Disconnect every client and stop the heartbeat task.
+        '''
+        for client in list(self.clients):
+            await self.disconnect(client)
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    # SECTION: metrics
+    def metrics(self) -> Dict[str, Any]:
+        '''
+        Return fan-out metrics of the hub and its clients.
+        '''
+        return {
+            "clients": len(self.clients),
+            "published": self.published,
+            "dropped": self.dropped,
+            "disconnected_slow": self.disconnected_slow,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "max_queue_size": self.max_queue_size,
+            "require_subscription": self.require_subscription,
+            "blobs": {
+                "count": len(self.blob_cache),
+                "bytes": self.blob_cache.size,
+                "max_bytes": self.blob_cache.max_bytes,
+            },
+            "topics": {
+                topic: len(subscribers)
+                for topic, subscribers in self.topics.items()
+            },
+            "queues": [
+                {
+                    "topics": sorted(client.topics),
+                    "queued": client.queue.qsize(),
+                    "sent": client.sent,
+                    "bytes_sent": client.bytes_sent,
+                    "framing": client.encoder.describe() if client.encoder else None,
+                    "dropped": client.dropped,
+                    "connected_at": client.connected_at,
+                }
+                for client in self.clients
+            ],
+        }
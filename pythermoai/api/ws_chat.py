@@ -0,0 +1,236 @@
+# import libs
+import logging
+import time
+import asyncio
+from typing import (
+    Any,
+    Dict,
+    Optional
+)
+from fastapi import APIRouter, WebSocket
+from pydantic import ValidationError
+# local
+from .deps import select_agent
+from .runs import Run, cancellable_turn
+from .admission import AdmissionRejected
+from .streaming import stream_agent_events
+from ..memory import generate_thread_id
+from ..models import RunLimits
+from ..utils import json_dumps
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+# set logging level
+logger.setLevel(logging.INFO)
+
+# SECTION: api router
+ws_chat_router = APIRouter()
+
+# NOTE: limits per connection
+MAX_RUNS_PER_CONNECTION = 8
+MAX_QUEUED_FRAMES = 1024
+
+
+class ChatSocketSession:
+    '''
+    One websocket chat connection carrying several concurrent chat runs.
+
+    Client frames:
+        {"type": "chat", "id": <correlation id>, "content": str,
+         "thread_id": str | null, "agent_selection": str, "limits": {...} | null}
+        {"type": "cancel", "id": <correlation id>}
+        {"type": "ping"}
+
+    Server frames carry the correlation id of the run they belong to:
+        {"type": "start" | "token" | "tool_call" | "tool_result" | "final" | "error" |
+         "cancelled", "id": <correlation id>, "thread_id": str, "data": {...}}
+
+    The start frame holds the run_id, which can also be cancelled with
+    POST /runs/{run_id}/cancel.
+    '''
+
+    def __init__(self, websocket: WebSocket):
+        # NOTE: set attributes
+        self.websocket = websocket
+        self.state = websocket.app.state
+        # correlation id -> running run
+        self.runs: Dict[str, Run] = {}
+        # NOTE: a single writer serializes frames of all runs
+        self.outbox: asyncio.Queue[bytes] = asyncio.Queue(
+            maxsize=MAX_QUEUED_FRAMES)
+        self.writer: Optional[asyncio.Task] = None
+
+    async def send(self, frame: Dict[str, Any]) -> int:
+        """Queue a frame, waiting if this connection's outbox is full. Returns its size."""
+        data = json_dumps(frame)
+        await self.outbox.put(data)
+        return len(data)
+
+    async def _writer(self):
+        """Drain the outbox onto the socket."""
+        while True:
+            frame = await self.outbox.get()
+            await self.websocket.send_text(frame.decode("utf-8"))
+
+    async def serve(self):
+        '''
+        Serve the connection until the client goes away, then cancel its runs.
+        '''
+        await self.websocket.accept()
+        self.writer = asyncio.create_task(self._writer())
+        try:
+            while True:
+                frame = await self.websocket.receive_json()
+                await self.handle(frame)
+        except Exception:
+            pass
+        finally:
+            runs = list(self.runs.values())
+            for run in runs:
+                self.state.runs.cancel(run.run_id, reason="disconnect")
+            if runs:
+                await asyncio.gather(
+                    *(run.task for run in runs), return_exceptions=True)
+            self.writer.cancel()
+
+    async def handle(self, frame: Any):
+        """Dispatch a client frame."""
+        if not isinstance(frame, dict):
+            await self.send({"type": "error", "data": {"detail": "Frames must be JSON objects."}})
+            return
+
+        frame_type = frame.get("type")
+        run_id = str(frame.get("id") or "")
+
+        if frame_type == "ping":
+            await self.send({"type": "pong"})
+        elif frame_type == "chat":
+            await self.start_run(run_id or generate_thread_id(), frame)
+        elif frame_type == "cancel":
+            run = self.runs.get(run_id)
+            if run is None:
+                await self.send({"type": "error", "id": run_id, "data": {"detail": f"Unknown run: {run_id}"}})
+            else:
+                self.state.runs.cancel(run.run_id, reason="user")
+        else:
+            await self.send({"type": "error", "id": run_id, "data": {"detail": f"Unknown frame type: {frame_type}"}})
+
+    async def start_run(self, run_id: str, frame: Dict[str, Any]):
+        """Start a chat run for a chat frame."""
+        # SECTION: validate inputs
+        if run_id in self.runs:
+            await self.send({"type": "error", "id": run_id, "data": {"detail": f"Run {run_id} is already running."}})
+            return
+        if len(self.runs) >= MAX_RUNS_PER_CONNECTION:
+            await self.send({"type": "error", "id": run_id, "data": {"detail": "Too many concurrent runs on this connection."}})
+            return
+        content = frame.get("content")
+        if not isinstance(content, str) or not content.strip():
+            await self.send({"type": "error", "id": run_id, "data": {"detail": "content must be a non-empty string."}})
+            return
+        try:
+            limits = RunLimits(**frame["limits"]) if frame.get("limits") else None
+        except (TypeError, ValidationError) as e:
+            await self.send({"type": "error", "id": run_id, "data": {"detail": f"Invalid limits: {e}"}})
+            return
+
+        # NOTE: start the run
+        thread_id = frame.get("thread_id") or generate_thread_id()
+        agent_selection = frame.get("agent_selection")
+        run = self.state.runs.start(
+            self.run(run_id, thread_id, frame, limits),
+            thread_id=thread_id,
+            agent_selection=agent_selection
+        )
+        self.runs[run_id] = run
+        run.task.add_done_callback(lambda _: self.runs.pop(run_id, None))
+
+    async def run(
+        self,
+        run_id: str,
+        thread_id: str,
+        frame: Dict[str, Any],
+        limits: Optional[RunLimits] = None
+    ):
+        """Run the agent and forward its events with the correlation id."""
+        agent_selection = frame.get("agent_selection")
+        timestamp = time.time()
+        run = self.runs[run_id]
+
+        await self.send({
+            "type": "start",
+            "id": run_id,
+            "thread_id": thread_id,
+            "data": {
+                "run_id": run.run_id,
+                "agent_selection": agent_selection,
+                "timestamp": timestamp,
+            },
+        })
+
+        agent = select_agent(self.state, agent_selection)
+        if not agent:
+            await self.send({
+                "type": "error", "id": run_id, "thread_id": thread_id,
+                "data": {"detail": "ThermoAI agent is not created yet."},
+            })
+            return
+
+        try:
+            # NOTE: wait for previous turns on the same thread, then for a slot
+            async with self.state.thread_locks.acquire(thread_id), \
+                    self.state.admission.admit(
+                        agent_selection, self.state.model_provider), \
+                    cancellable_turn(agent, thread_id):
+                async for event in stream_agent_events(
+                    agent,
+                    frame["content"],
+                    thread_id=thread_id,
+                    agent_selection=agent_selection,
+                    timestamp=timestamp,
+                    run=run,
+                    limits=limits,
+                    run_id=run.run_id
+                ):
+                    run.bytes_streamed += await self.send({
+                        "type": event.event,
+                        "id": run_id,
+                        "thread_id": thread_id,
+                        "data": event.data,
+                    })
+        except asyncio.CancelledError:
+            logger.info(f"Chat run {run_id} on thread {thread_id} cancelled")
+            # NOTE: best effort, the connection may be gone
+            try:
+                self.outbox.put_nowait(json_dumps({
+                    "type": "cancelled", "id": run_id, "thread_id": thread_id,
+                }))
+            except asyncio.QueueFull:
+                pass
+            raise
+        except AdmissionRejected as e:
+            await self.send({
+                "type": "error", "id": run_id, "thread_id": thread_id,
+                "data": {
+                    "detail": e.detail,
+                    "status_code": e.status_code,
+                    "retry_after": e.retry_after,
+                },
+            })
+        except Exception as e:
+            logger.error(f"Error in websocket chat run {run_id}: {e}")
+            await self.send({
+                "type": "error", "id": run_id, "thread_id": thread_id,
+                "data": {"detail": f"Failed to process user message: {e}"},
+            })
+
+
+# SECTION: routes
+@ws_chat_router.websocket("/ws/chat")
+async def websocket_chat(websocket: WebSocket):
+    """
+    Persistent chat connection: send prompts with a thread_id and receive token, tool
+    and final-answer frames with correlation ids. Several threads can be multiplexed on
+    one connection and runs can be cancelled.
+    """
+    await ChatSocketSession(websocket).serve()
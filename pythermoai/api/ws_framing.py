@@ -0,0 +1,220 @@
+# import libs
+import logging
+import hashlib
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Literal,
+    Optional,
+    Union
+)
+from starlette.datastructures import QueryParams
+# local
+from ..utils import json_dumps
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# SECTION: msgpack backend
+# NOTE: ormsgpack is installed with langgraph's checkpointer
+try:
+    import ormsgpack
+
+    def _msgpack_dumps(obj: Any) -> bytes:
+        return ormsgpack.packb(
+            obj,
+            default=str,
+            option=ormsgpack.OPT_NON_STR_KEYS
+        )
+
+    MSGPACK_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    MSGPACK_AVAILABLE = False
+
+# NOTE: websocket subprotocol selecting msgpack frames
+MSGPACK_SUBPROTOCOL = "thermoai.msgpack"
+
+Framing = Literal["json", "msgpack"]
+
+
+class BlobCache:
+    '''
+    Bounded LRU store of large tool contents, keyed by their sha256 hex digest.
+
+    Clients in reference mode receive only the size and digest of large tool
+    contents and fetch the ones they want to display from `/ws/blobs/{digest}`.
+    '''
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        # NOTE: set attributes
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def put(self, content: str) -> Dict[str, Any]:
+        '''
+        Store a content and return its reference.
+
+        Returns
+        -------
+        Dict[str, Any]
+            `{"$ref": <sha256 hex digest>, "size": <size in bytes>}`.
+        '''
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        if digest in self._blobs:
+            self._blobs.move_to_end(digest)
+        elif len(data) <= self.max_bytes:
+            self._blobs[digest] = data
+            self.size += len(data)
+            # NOTE: evict least recently used blobs
+            while self.size > self.max_bytes:
+                _, evicted = self._blobs.popitem(last=False)
+                self.size -= len(evicted)
+
+        return {"$ref": digest, "size": len(data)}
+
+    def get(self, digest: str) -> Optional[bytes]:
+        '''
+        Return a stored content, or None if it is unknown or was evicted.
+        '''
+        data = self._blobs.get(digest)
+        if data is not None:
+            self._blobs.move_to_end(digest)
+        return data
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+
+class FrameEncoder:
+    '''
+    Per-connection encoder of agent message frames.
+
+    Frames are encoded when they are sent, so the delta state always matches what the
+    client actually received, even when the hub drops queued frames.
+
+    - framing "msgpack" sends binary msgpack frames instead of JSON text frames.
+    - delta omits the fields that are equal to the previous frame of the connection
+      (`type`, `name`, `tool_calls`, token counts, ...) and lists them under `"="`;
+      the client copies them from the previous frame it decoded.
+    - ref_threshold replaces tool contents larger than this many characters by
+      `{"$ref": <sha256>, "size": <bytes>}`, fetchable from `/ws/blobs/{sha256}`.
+
+    Compression is left to the websocket layer: uvicorn negotiates permessage-deflate
+    with clients that offer it.
+    '''
+
+    def __init__(
+        self,
+        framing: Framing = "json",
+        delta: bool = False,
+        ref_threshold: Optional[int] = None,
+        blob_cache: Optional[BlobCache] = None
+    ):
+        # SECTION: validate inputs
+        if framing not in ("json", "msgpack"):
+            raise ValueError(f"Unsupported websocket framing: {framing}")
+        if framing == "msgpack" and not MSGPACK_AVAILABLE:
+            raise ValueError("msgpack framing requires the ormsgpack package.")
+        if ref_threshold is not None and blob_cache is None:
+            raise ValueError("ref_threshold requires a blob cache.")
+
+        # NOTE: set attributes
+        self.framing = framing
+        self.delta = delta
+        self.ref_threshold = ref_threshold
+        self.blob_cache = blob_cache
+        # last frame sent, base of the next delta
+        self._previous: Dict[str, Any] = {}
+
+    @classmethod
+    def from_request(
+        cls,
+        params: QueryParams,
+        subprotocols: list,
+        blob_cache: BlobCache
+    ) -> Optional["FrameEncoder"]:
+        '''
+        Negotiate an encoder from the `format`, `delta` and `refs` query parameters
+        and the requested subprotocols. Returns None for the default JSON framing.
+
+        Raises
+        ------
+        ValueError
+            If the requested options are invalid.
+        '''
+        framing = params.get("format", "json").lower()
+        if MSGPACK_SUBPROTOCOL in subprotocols:
+            framing = "msgpack"
+        delta = params.get("delta", "false").lower() in ("1", "true", "yes")
+        refs = params.get("refs")
+        try:
+            ref_threshold = int(refs) if refs else None
+        except ValueError:
+            raise ValueError(f"Invalid refs threshold: {refs}")
+        if ref_threshold is not None and ref_threshold < 0:
+            raise ValueError(f"Invalid refs threshold: {refs}")
+
+        if framing == "json" and not delta and ref_threshold is None:
+            return None
+        return cls(
+            framing=framing,  # type: ignore[arg-type]
+            delta=delta,
+            ref_threshold=ref_threshold,
+            blob_cache=blob_cache
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        """Return the negotiated options."""
+        return {
+            "format": self.framing,
+            "delta": self.delta,
+            "refs": self.ref_threshold,
+        }
+
+    def encode(self, payload: Dict[str, Any]) -> Union[str, bytes]:
+        '''
+        Encode an agent message payload for this connection.
+
+        Parameters
+        ----------
+        payload : Dict[str, Any]
+            The agent message fields; it is not modified.
+
+        Returns
+        -------
+        str | bytes
+            A text frame for JSON framing, a binary frame for msgpack framing.
+        '''
+        frame = dict(payload)
+
+        # NOTE: large tool contents by reference
+        content = frame.get("content")
+        if (
+            self.ref_threshold is not None and
+            frame.get("type") == "tool" and
+            isinstance(content, str) and
+            len(content) > self.ref_threshold
+        ):
+            frame["content"] = self.blob_cache.put(content)  # type: ignore[union-attr]
+
+        # NOTE: fields repeated from the previous frame
+        if self.delta:
+            previous = self._previous
+            self._previous = frame
+            same = [
+                name for name, value in frame.items()
+                if name != "content" and name in previous and previous[name] == value
+            ]
+            if same:
+                frame = {
+                    name: value for name, value in frame.items() if name not in same
+                }
+                frame["="] = same
+
+        if self.framing == "msgpack":
+            return _msgpack_dumps(frame)
+        return json_dumps(frame).decode("utf-8")
@@ -78,6 +78,9 @@ def thermo_chat(
             A description of the API, by default "No description set".
         - open_browser: bool, optional
             Whether to open the web UI in a browser, by default True.
+        - ws_require_subscription: bool, optional
+            Whether /ws clients only receive the events they subscribed to, by default
+            False: the bundled web UI listens on /ws without subscribing.
 
     Returns
     -------
@@ -97,6 +100,8 @@ def thermo_chat(
         }
         # add to kwargs
         kwargs['api_config'] = api_config
+        # NOTE: the bundled web UI does not subscribe to its threads
+        kwargs.setdefault('ws_require_subscription', False)
 
         # SECTION: Create the FastAPI application instance
         app_instance: FastAPI = asyncio.run(create_api(
@@ -8,6 +8,7 @@ from .settings import (
 # constants
 from .constants import (
     llm_providers,
+    default_rate_limits,
     default_token_metadata,
     default_model_settings,
     default_api_config
@@ -20,6 +21,7 @@ __all__ = [
     "__description__",
     "get_config",
     "llm_providers",
+    "default_rate_limits",
     "default_token_metadata",
     "default_model_settings",
     "default_api_config"
@@ -5,6 +5,17 @@
 # SECTION: available llm providers
 llm_providers = ["openai", "google", "anthropic", "grok"]
 
+# SECTION: client-side rate limits
+# requests (rpm) and tokens (tpm) per minute, keyed by provider or provider/model
+# NOTE: entry-tier values, not applied by default: pass them (raised to the limits of
+# your account) as `rate_limits`
+default_rate_limits = {
+    "openai": {"rpm": 500, "tpm": 200000},
+    "google": {"rpm": 300, "tpm": 1000000},
+    "anthropic": {"rpm": 50, "tpm": 50000},
+    "grok": {"rpm": 60, "tpm": 100000},
+}
+
 # SECTION: token metadata
 # set default values for input and output tokens
 default_token_metadata = {
@@ -1,5 +1,41 @@
 from .llm_models import LlmManager
+from .fake_llm import FakeChatModel, FakeProviderError
+from .model_wrapper import ChatModelWrapper, RoutingChatModel
+from .rate_limited_model import RateLimitedChatModel
+from .adaptive_model import AdaptiveConcurrencyChatModel
+from .resilient_model import ResilientChatModel, get_retry_stats
+from .hedged_model import HedgedChatModel, get_hedging_metrics
+from .cascade_model import CascadeChatModel, get_cascade_stats
+from .rate_limiter import (
+    ProviderRateLimiter,
+    TokenBucket,
+    get_rate_limiter
+)
+from .adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+    get_concurrency_limiter
+)
+from .provider_errors import ProviderErrorInfo, classify_provider_error
 
 __all__ = [
     "LlmManager",
+    "FakeChatModel",
+    "FakeProviderError",
+    "ChatModelWrapper",
+    "RoutingChatModel",
+    "RateLimitedChatModel",
+    "AdaptiveConcurrencyChatModel",
+    "ResilientChatModel",
+    "get_retry_stats",
+    "HedgedChatModel",
+    "get_hedging_metrics",
+    "CascadeChatModel",
+    "get_cascade_stats",
+    "ProviderRateLimiter",
+    "TokenBucket",
+    "get_rate_limiter",
+    "AdaptiveConcurrencyLimiter",
+    "get_concurrency_limiter",
+    "ProviderErrorInfo",
+    "classify_provider_error",
 ]
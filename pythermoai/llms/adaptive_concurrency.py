@@ -0,0 +1,274 @@
+# import libs
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Optional
+)
+# local
+from .provider_errors import ProviderErrorInfo, SERVER
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+
+class _Waiter:
+    '''
+    A call waiting for a slot, woken from any thread or event loop.
+    '''
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.granted = False
+
+    def wake(self):
+        self.granted = True
+        if self.future is not None:
+            self.loop.call_soon_threadsafe(
+                lambda: self.future.done() or self.future.set_result(True))
+        else:
+            self.event.set()
+
+
+class AdaptiveConcurrencyLimit:
+    '''
+    AIMD concurrency window of one provider model.
+
+    The window grows by one call per window of healthy calls (additive increase) and
+    is cut by `decrease_factor` on throttling signals — 429, overloaded, timeouts and
+    server errors — at most once per round trip (multiplicative decrease). A call
+    slower than `latency_tolerance` times the baseline latency does not grow the
+    window. A Retry-After sent by the provider pauses new calls until it expires.
+    '''
+
+    def __init__(
+        self,
+        key: str,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0
+    ):
+        # NOTE: set attributes
+        self.key = key
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.inflight = 0
+        self.waiters: Deque[_Waiter] = deque()
+        self.lock = threading.Lock()
+        # NOTE: latency of healthy calls, fast and slow moving averages
+        self.latency: Optional[float] = None
+        self.baseline_latency: Optional[float] = None
+        self.decreased_at = 0.0
+        self.paused_until = 0.0
+        # counters
+        self.calls = 0
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self.decreases = 0
+        self.max_inflight = 0
+
+    @property
+    def window(self) -> int:
+        return max(1, math.floor(self.limit))
+
+    def _grant(self) -> bool:
+        if self.inflight < self.window:
+            self.inflight += 1
+            self.calls += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+            return True
+        return False
+
+    def _wake_waiters(self):
+        while self.waiters and self._grant():
+            self.waiters.popleft().wake()
+
+    def _pause(self) -> float:
+        return max(0.0, self.paused_until - time.monotonic())
+
+    async def acquire(self):
+        '''
+        Wait for a slot in the window.
+        '''
+        # NOTE: honor the provider's Retry-After
+        while self._pause() > 0:
+            await asyncio.sleep(self._pause())
+
+        with self.lock:
+            if not self.waiters and self._grant():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self.waiters.append(waiter)
+        try:
+            await waiter.future
+        except BaseException:
+            with self.lock:
+                if waiter.granted:
+                    self.inflight -= 1
+                    self._wake_waiters()
+                else:
+                    self.waiters.remove(waiter)
+            raise
+
+    def acquire_sync(self):
+        '''
+        Wait for a slot in the window, blocking the thread.
+        '''
+        while self._pause() > 0:
+            time.sleep(self._pause())
+
+        with self.lock:
+            if not self.waiters and self._grant():
+                return
+            waiter = _Waiter()
+            self.waiters.append(waiter)
+        waiter.event.wait()
+
+    def release(
+        self,
+        latency: Optional[float] = None,
+        error: Optional[ProviderErrorInfo] = None
+    ):
+        '''
+        Release a slot and adapt the window to the outcome of the call.
+
+        Parameters
+        ----------
+        latency : float, optional
+            Duration of a successful call, None if the call did not complete.
+        error : ProviderErrorInfo, optional
+            The provider error of a failed call.
+        '''
+        with self.lock:
+            self.inflight -= 1
+            now = time.monotonic()
+
+            if error is not None:
+                if error.retry_after:
+                    self.paused_until = max(self.paused_until, now + error.retry_after)
+                if error.throttled or error.kind == SERVER:
+                    if error.throttled:
+                        self.throttled += 1
+                    else:
+                        self.errors += 1
+                    # NOTE: one cut per round trip, calls failing together count once
+                    if (
+                        self.limit > self.min_limit and
+                        now - self.decreased_at >= (self.baseline_latency or 1.0)
+                    ):
+                        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                        self.decreased_at = now
+                        self.decreases += 1
+                        logger.info(
+                            f"Concurrency of {self.key} cut to {self.window} after {error.kind}")
+            elif latency is not None:
+                self.successes += 1
+                healthy = (
+                    self.baseline_latency is None or
+                    latency <= self.latency_tolerance * self.baseline_latency
+                )
+                self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+                self.baseline_latency = (
+                    latency if self.baseline_latency is None
+                    else 0.95 * self.baseline_latency + 0.05 * latency)
+                if healthy:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+            self._wake_waiters()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "limit": round(self.limit, 3),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "inflight": self.inflight,
+            "max_inflight": self.max_inflight,
+            "waiting": len(self.waiters),
+            "calls": self.calls,
+            "successes": self.successes,
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "decreases": self.decreases,
+            "latency": self.latency,
+            "baseline_latency": self.baseline_latency,
+            "paused_for": round(self._pause(), 3),
+        }
+
+
+class AdaptiveConcurrencyLimiter:
+    '''
+    Adaptive concurrency windows of the LLM calls, per provider and model.
+    '''
+
+    def __init__(self, **settings: Any):
+        '''
+        Initialize the limiter.
+
+        Parameters
+        ----------
+        settings : dict
+            Settings of each window, see `AdaptiveConcurrencyLimit`:
+            - initial_limit: float, by default 4
+            - min_limit: float, by default 1
+            - max_limit: float, by default 32
+            - decrease_factor: float, by default 0.5
+            - latency_tolerance: float, by default 2.0
+        '''
+        self.settings = settings
+        self.models: Dict[str, AdaptiveConcurrencyLimit] = {}
+        self.lock = threading.Lock()
+
+    def configure(self, **settings: Any):
+        '''
+        Update the settings; windows restart from the initial limit.
+        '''
+        with self.lock:
+            self.settings.update(settings)
+            self.models.clear()
+
+    def get(self, provider: str, model: str) -> AdaptiveConcurrencyLimit:
+        '''
+        Return the window of a provider model, creating it on first use.
+        '''
+        key = f"{provider}/{model}"
+        with self.lock:
+            limit = self.models.get(key)
+            if limit is None:
+                limit = AdaptiveConcurrencyLimit(key, **self.settings)
+                self.models[key] = limit
+            return limit
+
+    def metrics(self) -> Dict[str, Any]:
+        '''
+        Return the settings and the windows of the models used so far.
+        '''
+        return {
+            "settings": self.settings,
+            "models": {key: limit.metrics() for key, limit in self.models.items()},
+        }
+
+
+# SECTION: process-wide limiter shared by all agents and LlmManager instances
+_concurrency_limiter = AdaptiveConcurrencyLimiter()
+
+
+def get_concurrency_limiter() -> AdaptiveConcurrencyLimiter:
+    '''
+    Return the process-wide adaptive concurrency limiter.
+    '''
+    return _concurrency_limiter
@@ -0,0 +1,63 @@
+# import libs
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    AsyncIterator,
+    Iterator
+)
+from pydantic import Field
+# local
+from .model_wrapper import ChatModelWrapper, ModelCall
+from .provider_errors import classify_provider_error
+from .adaptive_concurrency import (
+    AdaptiveConcurrencyLimiter,
+    AdaptiveConcurrencyLimit,
+    get_concurrency_limiter
+)
+
+
+class AdaptiveConcurrencyChatModel(ChatModelWrapper):
+    '''
+    Chat model wrapper holding each call of a provider model in the model's AIMD
+    concurrency window of the shared `AdaptiveConcurrencyLimiter`.
+
+    Calls completing with a healthy latency grow the window, throttling errors
+    (429, overloaded, timeouts, 5xx) cut it, and a Retry-After pauses new calls.
+    '''
+    limiter: AdaptiveConcurrencyLimiter = Field(
+        default_factory=get_concurrency_limiter, exclude=True)
+
+    @property
+    def window(self) -> AdaptiveConcurrencyLimit:
+        return self.limiter.get(self.model_provider, self.model_name)
+
+    @contextmanager
+    def guard(self, call: ModelCall) -> Iterator[ModelCall]:
+        window = self.window
+        window.acquire_sync()
+        start = time.monotonic()
+        try:
+            yield call
+        except Exception as e:
+            window.release(error=classify_provider_error(e))
+            raise
+        except BaseException:
+            window.release()
+            raise
+        window.release(latency=time.monotonic() - start)
+
+    @asynccontextmanager
+    async def aguard(self, call: ModelCall) -> AsyncIterator[ModelCall]:
+        window = self.window
+        await window.acquire()
+        start = time.monotonic()
+        try:
+            yield call
+        except Exception as e:
+            window.release(error=classify_provider_error(e))
+            raise
+        except BaseException:
+            # NOTE: cancelled or abandoned stream, says nothing about the provider
+            window.release()
+            raise
+        window.release(latency=time.monotonic() - start)
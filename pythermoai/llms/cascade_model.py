@@ -0,0 +1,422 @@
+# import libs
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from functools import reduce
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple
+)
+import yaml
+from pydantic import Field
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain_core.messages import (
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage
+)
+from langchain_core.outputs import (
+    ChatGeneration,
+    ChatGenerationChunk,
+    ChatResult
+)
+from langchain_core.runnables import Runnable
+# local
+from ..models import CascadePolicy
+from .model_wrapper import RoutingChatModel
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: tiers
+SMALL = "small"
+LARGE = "large"
+
+# NOTE: delimiters of the tables pasted in a request
+TABLE_DELIMITERS = ("\t", "|", ";", ",")
+
+# NOTE: operators and function calls of an equation
+_EQUATION_TERM = re.compile(r"\*\*|[-+*/^]|\b[A-Za-z_][\w.]*\s*\(")
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_YAML_FENCE = re.compile(r"```(?:ya?ml)?\s*\n(.*?)```", re.DOTALL)
+
+
+def _text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(
+            part if isinstance(part, str) else str(part.get("text", ""))
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return str(content or "")
+
+
+def measure_table(text: str) -> Tuple[int, int]:
+    '''
+    Return the number of rows and columns of the largest table in a text.
+
+    A table is a run of at least two consecutive lines splitting into the same number
+    (two or more) of fields on the same delimiter, with numbers in at least one line.
+    '''
+    best = (0, 0)
+    lines = [line.strip() for line in text.splitlines()]
+    for delimiter in TABLE_DELIMITERS:
+        run: List[str] = []
+        run_columns = 0
+        for line in lines + [""]:
+            # NOTE: markdown separator rows belong to the table
+            if run and delimiter == "|" and line and set(line) <= set("|-: "):
+                continue
+            columns = len(line.strip(delimiter).split(delimiter)) if delimiter in line else 0
+            if columns >= 2 and columns == run_columns:
+                run.append(line)
+                continue
+            if len(run) >= 2 and any(_NUMBER.search(row) for row in run):
+                best = max(best, (len(run), run_columns))
+            run, run_columns = ([line], columns) if columns >= 2 else ([], 0)
+    return best
+
+
+def measure_equation(text: str) -> int:
+    '''
+    Return the number of operators and function calls of the most complex equation
+    (a line with an assignment or equality) in a text.
+    '''
+    terms = 0
+    for line in text.splitlines():
+        if "=" not in line:
+            continue
+        _, _, expression = line.partition("=")
+        terms = max(terms, len(_EQUATION_TERM.findall(expression)))
+    return terms
+
+
+def route_messages(
+    messages: List[BaseMessage],
+    policy: CascadePolicy,
+    tools_bound: bool = False
+) -> Tuple[str, str]:
+    '''
+    Choose the tier of a model call from the messages of the current turn.
+
+    Parameters
+    ----------
+    messages : List[BaseMessage]
+        The messages sent to the model.
+    policy : CascadePolicy
+        The thresholds of the heuristics.
+    tools_bound : bool, optional
+        Whether the model was given tools, by default False.
+
+    Returns
+    -------
+    tuple
+        The tier ("small" or "large") and the reason of the choice.
+    '''
+    # NOTE: the current turn starts at the last user message
+    turn: List[BaseMessage] = []
+    for message in reversed(messages):
+        turn.append(message)
+        if isinstance(message, HumanMessage):
+            break
+    if any(isinstance(message, ToolMessage) for message in turn):
+        return LARGE, "tool_loop"
+    request = _text(turn[-1].content) if turn and isinstance(turn[-1], HumanMessage) else ""
+
+    # SECTION: local heuristics
+    rows, columns = measure_table(request)
+    terms = measure_equation(request)
+    if rows > policy.max_table_rows or columns > policy.max_table_columns:
+        return LARGE, "table_size"
+    if terms > policy.max_equation_terms:
+        return LARGE, "equation_complexity"
+    # NOTE: without raw data in the request, the agent has to look it up
+    if tools_bound and not rows and not terms:
+        return LARGE, "tool_need"
+    return SMALL, "raw_data" if rows or terms else "simple"
+
+
+def _tables(data: Any) -> List[Dict[str, Any]]:
+    # NOTE: data tables at the top level, equation tables one level down
+    if not isinstance(data, dict):
+        return []
+    if "STRUCTURE" in data or "VALUES" in data:
+        return [data]
+    return [
+        value for value in data.values()
+        if isinstance(value, dict) and ("STRUCTURE" in value or "VALUES" in value)
+    ]
+
+
+def validate_answer(message: BaseMessage) -> Optional[str]:
+    '''
+    Check the answer of the small tier against the YAML table schema of the agents.
+
+    Returns
+    -------
+    str | None
+        The reason to escalate, or None if the answer is valid.
+    '''
+    if getattr(message, "tool_calls", None):
+        return "tool_call"
+    text = _text(message.content).strip()
+    if not text:
+        return "empty_answer"
+    fenced = _YAML_FENCE.search(text)
+    try:
+        data = yaml.safe_load(fenced.group(1) if fenced else text)
+    except yaml.YAMLError:
+        return "invalid_yaml"
+    tables = _tables(data)
+    if not tables:
+        return "no_table"
+    for table in tables:
+        structure = table.get("STRUCTURE")
+        columns = structure.get("COLUMNS") if isinstance(structure, dict) else None
+        values = table.get("VALUES")
+        if not isinstance(columns, list) or not isinstance(values, list):
+            return "schema"
+        if any(not isinstance(row, list) or len(row) != len(columns) for row in values):
+            return "schema"
+    return None
+
+
+class CascadeStats:
+    '''
+    Usage of the model tiers: calls, tokens and seconds per tier and model, the
+    reasons of the routing choices and of the escalations.
+    '''
+
+    def __init__(self):
+        self.tiers: Dict[str, Dict[str, Dict[str, float]]] = {
+            SMALL: defaultdict(self._counters),
+            LARGE: defaultdict(self._counters),
+        }
+        self.routes: Dict[str, int] = defaultdict(int)
+        self.escalations: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _counters() -> Dict[str, float]:
+        return {
+            "calls": 0,
+            "answers": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "seconds": 0.0,
+        }
+
+    def route(self, reason: str):
+        with self.lock:
+            self.routes[reason] += 1
+
+    def escalate(self, reason: str):
+        with self.lock:
+            self.escalations[reason] += 1
+
+    def record(
+        self,
+        tier: str,
+        label: str,
+        message: BaseMessage,
+        seconds: float,
+        answered: bool
+    ):
+        usage = getattr(message, "usage_metadata", None) or {}
+        with self.lock:
+            counters = self.tiers[tier][label]
+            counters["calls"] += 1
+            counters["answers"] += int(answered)
+            counters["input_tokens"] += usage.get("input_tokens", 0)
+            counters["output_tokens"] += usage.get("output_tokens", 0)
+            counters["seconds"] += seconds
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "tiers": {
+                    tier: {label: dict(counters) for label, counters in models.items()}
+                    for tier, models in self.tiers.items()
+                },
+                "routes": dict(self.routes),
+                "escalations": dict(self.escalations),
+            }
+
+
+# SECTION: process-wide counters
+_cascade_stats = CascadeStats()
+
+
+def get_cascade_stats() -> CascadeStats:
+    '''
+    Return the process-wide usage counters of the model tiers.
+    '''
+    return _cascade_stats
+
+
+class CascadeChatModel(RoutingChatModel):
+    '''
+    Chat model routing each call to a small/fast model and escalating to the large one.
+
+    A call goes to the large model when the turn is in a tool loop, when the request
+    needs the tools (no raw data in it), or when its table or equation is too large
+    for the small model. Otherwise the small model answers, and its answer is checked
+    against the YAML table schema; a tool call or an invalid table sends the same call
+    to the large model. Streams of the small model are buffered until checked.
+    '''
+    small: Runnable
+    large: Runnable
+    small_label: str
+    large_label: str
+    policy: CascadePolicy
+    tools_bound: bool = False
+    stats: CascadeStats = Field(default_factory=get_cascade_stats, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "cascade"
+
+    @property
+    def lead(self) -> Runnable:
+        # NOTE: stream only if the large model does
+        return self.large
+
+    def _route(self, messages: List[BaseMessage]) -> str:
+        tier, reason = route_messages(messages, self.policy, self.tools_bound)
+        self.stats.route(reason)
+        logger.debug(f"Routing call to the {tier} model ({reason})")
+        return tier
+
+    def _check(self, message: BaseMessage, started: float) -> bool:
+        '''
+        Record the answer of the small model and return whether it stands.
+        '''
+        reason = validate_answer(message) if self.policy.validate_output else None
+        self.stats.record(
+            SMALL, self.small_label, message, time.monotonic() - started,
+            answered=reason is None)
+        if reason is None:
+            return True
+        self.stats.escalate(reason)
+        logger.info(
+            f"Escalating call from {self.small_label} to {self.large_label} ({reason})")
+        return False
+
+    def _result(self, message: BaseMessage, tier: str) -> ChatResult:
+        message.response_metadata["model_tier"] = tier
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self._route(messages) == SMALL:
+            started = time.monotonic()
+            message = self._call(
+                self.small, messages, stop=stop, **kwargs)
+            if self._check(message, started):
+                return self._result(message, SMALL)
+        started = time.monotonic()
+        message = self._call(
+            self.large, messages, stop=stop, **kwargs)
+        self.stats.record(
+            LARGE, self.large_label, message, time.monotonic() - started, answered=True)
+        return self._result(message, LARGE)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self._route(messages) == SMALL:
+            started = time.monotonic()
+            message = await self._acall(
+                self.small, messages, stop=stop, **kwargs)
+            if self._check(message, started):
+                return self._result(message, SMALL)
+        started = time.monotonic()
+        message = await self._acall(
+            self.large, messages, stop=stop, **kwargs)
+        self.stats.record(
+            LARGE, self.large_label, message, time.monotonic() - started, answered=True)
+        return self._result(message, LARGE)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if self._route(messages) == SMALL:
+            started = time.monotonic()
+            chunks = list(self._call_stream(
+                self.small, messages, stop=stop, **kwargs))
+            if chunks and self._check(reduce(lambda a, b: a + b, chunks), started):
+                for chunk in chunks:
+                    yield ChatGenerationChunk(message=chunk)
+                return
+        started = time.monotonic()
+        chunks = []
+        for chunk in self._call_stream(
+                self.large, messages, stop=stop, **kwargs):
+            chunks.append(chunk)
+            yield ChatGenerationChunk(message=chunk)
+        if chunks:
+            self.stats.record(
+                LARGE, self.large_label, reduce(lambda a, b: a + b, chunks),
+                time.monotonic() - started, answered=True)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self._route(messages) == SMALL:
+            started = time.monotonic()
+            chunks: List[AIMessageChunk] = [
+                chunk async for chunk in self._acall_stream(
+                    self.small, messages, stop=stop, **kwargs)
+            ]
+            if chunks and self._check(reduce(lambda a, b: a + b, chunks), started):
+                for chunk in chunks:
+                    yield ChatGenerationChunk(message=chunk)
+                return
+        started = time.monotonic()
+        chunks = []
+        async for chunk in self._acall_stream(
+                self.large, messages, stop=stop, **kwargs):
+            chunks.append(chunk)
+            yield ChatGenerationChunk(message=chunk)
+        if chunks:
+            self.stats.record(
+                LARGE, self.large_label, reduce(lambda a, b: a + b, chunks),
+                time.monotonic() - started, answered=True)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "CascadeChatModel":
+        # NOTE: each tier formats the tools for its own provider
+        return self.model_copy(update={
+            "small": self._chat_model(self.small).bind_tools(tools, **kwargs),
+            "large": self._chat_model(self.large).bind_tools(tools, **kwargs),
+            "tools_bound": bool(tools),
+        })
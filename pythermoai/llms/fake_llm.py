@@ -0,0 +1,138 @@
+# import libs
+import asyncio
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterator,
+    List,
+    Optional
+)
+from pydantic import Field, PrivateAttr
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+# local
+from .rate_limiter import estimate_tokens, CHARS_PER_TOKEN
+
+
+class FakeProviderError(Exception):
+    '''
+    HTTP error raised by the fake provider.
+    '''
+
+    def __init__(self, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(f"Fake provider error {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class FakeChatModel(BaseChatModel):
+    '''
+    Offline stand-in for a provider chat model (provider "fake").
+
+    It replies with `responses` in turn after `latency` seconds and reports token usage
+    like a real provider, so rate limiting, streaming and the API can be exercised
+    without network access or API keys. Tools can be bound but are never called.
+    The next calls fail with the HTTP status codes queued in `failures`, carrying
+    `retry_after` when set.
+    '''
+    model_name: str = "fake"
+    responses: List[str] = Field(default_factory=lambda: ["pong"])
+    latency: float = 0.0
+    failures: List[int] = Field(default_factory=list)
+    retry_after: Optional[float] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    _index: int = PrivateAttr(default=0)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        if self.failures:
+            raise FakeProviderError(self.failures.pop(0), retry_after=self.retry_after)
+        reply = self.responses[self._index % len(self.responses)]
+        self._index += 1
+        input_tokens = estimate_tokens(messages)
+        output_tokens = len(reply) // CHARS_PER_TOKEN + 1
+        return AIMessage(
+            content=reply,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        words = message.content.split(" ")
+        for i, word in enumerate(words):
+            last = i == len(words) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word if last else word + " ",
+                    usage_metadata=message.usage_metadata if last else None,
+                    response_metadata=message.response_metadata if last else {},
+                )
+            )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        if self.latency:
+            time.sleep(self.latency)
+        for chunk in self._chunks(self._next_message(messages)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for chunk in self._chunks(self._next_message(messages)):
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        # NOTE: the tools are accepted for compatibility, never called
+        return self.bind(tools=tools, **kwargs)
@@ -0,0 +1,314 @@
+# import libs
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple
+)
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import (
+    ChatGeneration,
+    ChatGenerationChunk,
+    ChatResult
+)
+from langchain_core.runnables import Runnable
+# local
+from ..models import HedgingPolicy
+from .model_wrapper import RoutingChatModel
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: number of recent latencies kept per model and kind of call
+LATENCY_WINDOW = 200
+
+# NOTE: hedges that may be saved up while calls are fast
+MAX_HEDGE_CREDITS = 10.0
+
+# NOTE: end of an empty stream
+_END = object()
+
+
+class HedgeTracker:
+    '''
+    Recent latencies, hedge budget and counters of one hedged model.
+
+    Latencies are kept apart for complete calls ("invoke") and for the first chunk of
+    streams ("stream"). Each call earns `max_hedge_rate` of a hedge and each hedge
+    spends a whole one, so at most that fraction of the calls are hedged.
+    '''
+
+    def __init__(self, label: str, policy: HedgingPolicy):
+        # NOTE: set attributes
+        self.label = label
+        self.policy = policy
+        self.latencies: Dict[str, Deque[float]] = {
+            "invoke": deque(maxlen=LATENCY_WINDOW),
+            "stream": deque(maxlen=LATENCY_WINDOW),
+        }
+        self.credits = 0.0
+        self.lock = threading.Lock()
+        # counters
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.primary_wins = 0
+        self.budget_denied = 0
+
+    def threshold(self, kind: str) -> Optional[float]:
+        '''
+        Return the seconds after which a call of this kind is hedged, or None while
+        there are too few samples.
+        '''
+        with self.lock:
+            samples = sorted(self.latencies[kind])
+        if len(samples) < self.policy.min_samples:
+            return None
+        index = max(0, math.ceil(self.policy.percentile * len(samples)) - 1)
+        return max(self.policy.min_delay, samples[index])
+
+    def start_call(self):
+        with self.lock:
+            self.calls += 1
+            self.credits = min(
+                MAX_HEDGE_CREDITS, self.credits + self.policy.max_hedge_rate)
+
+    def try_hedge(self) -> bool:
+        '''
+        Spend a hedge from the budget, if one is left.
+        '''
+        with self.lock:
+            if self.credits >= 1.0:
+                self.credits -= 1.0
+                self.hedged += 1
+                return True
+            self.budget_denied += 1
+            return False
+
+    def record(self, kind: str, latency: float, hedged: bool, hedge_won: bool):
+        with self.lock:
+            self.latencies[kind].append(latency)
+            if hedged:
+                if hedge_won:
+                    self.hedge_wins += 1
+                else:
+                    self.primary_wins += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "primary_wins": self.primary_wins,
+            "budget_denied": self.budget_denied,
+            "invoke_threshold": self.threshold("invoke"),
+            "stream_threshold": self.threshold("stream"),
+            "policy": self.policy.model_dump(),
+        }
+
+
+# SECTION: process-wide trackers, shared by the copies of a hedged model
+_trackers: Dict[str, HedgeTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_hedge_tracker(label: str, policy: HedgingPolicy) -> HedgeTracker:
+    '''
+    Return the tracker of a hedged model, creating it on first use.
+    '''
+    with _trackers_lock:
+        tracker = _trackers.get(label)
+        if tracker is None or tracker.policy != policy:
+            tracker = HedgeTracker(label, policy)
+            _trackers[label] = tracker
+        return tracker
+
+
+def get_hedging_metrics() -> Dict[str, Any]:
+    '''
+    Return the hedging counters of the hedged models.
+    '''
+    with _trackers_lock:
+        return {label: tracker.metrics() for label, tracker in _trackers.items()}
+
+
+async def _first_chunk(iterator: AsyncIterator[Any]) -> Any:
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+class HedgedChatModel(RoutingChatModel):
+    '''
+    Chat model hedging slow calls.
+
+    A call still running after the policy's percentile of the recent latencies is
+    sent again to `hedge` (the same or an alternate model), within the hedge budget.
+    The first response wins and the other call is cancelled. Streams are hedged on
+    the time to their first chunk. Synchronous calls are not hedged.
+    '''
+    primary: Runnable
+    hedge: Runnable
+    label: str
+    hedge_label: str
+    policy: HedgingPolicy
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged"
+
+    @property
+    def tracker(self) -> HedgeTracker:
+        return get_hedge_tracker(self.label, self.policy)
+
+    @property
+    def lead(self) -> Runnable:
+        # NOTE: stream only if the primary model does
+        return self.primary
+
+    async def _race(
+        self,
+        kind: str,
+        start_primary: Callable[[], Awaitable[Any]],
+        start_hedge: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        '''
+        Run the primary call, hedge it when it is slow and return the first result and
+        whether it came from the hedge.
+        '''
+        tracker = self.tracker
+        tracker.start_call()
+        threshold = tracker.threshold(kind)
+
+        started_at = time.monotonic()
+        primary = asyncio.create_task(start_primary())
+        starts = {primary: started_at}
+        hedge: Optional[asyncio.Task] = None
+        try:
+            # SECTION: hedge after the threshold
+            if threshold is not None:
+                done, _ = await asyncio.wait({primary}, timeout=threshold)
+                if not done and tracker.try_hedge():
+                    logger.info(
+                        f"Hedging call to {self.label} on {self.hedge_label} after {threshold:.2f} seconds")
+                    hedge = asyncio.create_task(start_hedge())
+                    starts[hedge] = time.monotonic()
+
+            # SECTION: first successful result wins
+            pending = set(starts)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        tracker.record(
+                            kind,
+                            time.monotonic() - starts[task],
+                            hedged=hedge is not None,
+                            hedge_won=task is hedge
+                        )
+                        return task.result(), task is hedge
+            # NOTE: both failed, raise the primary's error
+            return primary.result(), False
+        finally:
+            # NOTE: cancel the loser and wait until it let go of its stream
+            losers = [task for task in starts if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        message = self._call(
+            self.primary, messages, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        message, hedge_won = await self._race(
+            "invoke",
+            lambda: self._acall(
+                self.primary, messages, stop=stop, **kwargs),
+            lambda: self._acall(
+                self.hedge, messages, stop=stop, **kwargs)
+        )
+        if hedge_won:
+            message.response_metadata["hedged_by"] = self.hedge_label
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        for chunk in self._call_stream(
+                self.primary, messages, stop=stop, **kwargs):
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        streams = {
+            False: self._acall_stream(
+                self.primary, messages, stop=stop, **kwargs),
+            True: self._acall_stream(
+                self.hedge, messages, stop=stop, **kwargs),
+        }
+        try:
+            first, hedge_won = await self._race(
+                "stream",
+                lambda: _first_chunk(streams[False]),
+                lambda: _first_chunk(streams[True])
+            )
+            # NOTE: close the losing stream
+            await streams[not hedge_won].aclose()
+            if first is _END:
+                return
+            yield ChatGenerationChunk(message=first)
+            async for chunk in streams[hedge_won]:
+                yield ChatGenerationChunk(message=chunk)
+        finally:
+            for stream in streams.values():
+                await stream.aclose()
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "HedgedChatModel":
+        primary = self._chat_model(self.primary).bind_tools(tools, **kwargs)
+        # NOTE: bound once when the hedge goes to the same model
+        hedge = primary if self.hedge is self.primary else \
+            self._chat_model(self.hedge).bind_tools(tools, **kwargs)
+        return self.model_copy(update={"primary": primary, "hedge": hedge})
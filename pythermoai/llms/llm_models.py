@@ -2,17 +2,31 @@
 import logging
 from langchain.chat_models import init_chat_model
 from typing import (
-    Optional
+    Dict,
+    List,
+    Optional,
+    Union
 )
 # langchain
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain.chat_models.base import BaseChatModel
 # local
 from ..config import llm_providers
+from ..models import RetryPolicy, FallbackModel, HedgingPolicy, CascadePolicy
+from .fake_llm import FakeChatModel
+from .rate_limited_model import RateLimitedChatModel
+from .adaptive_model import AdaptiveConcurrencyChatModel
+from .resilient_model import ResilientChatModel
+from .hedged_model import HedgedChatModel
+from .cascade_model import CascadeChatModel
 
 # NOTE: logger
 logger = logging.getLogger(__name__)
 
+# NOTE: "fake" is an offline stand-in for tests and benchmarks, accepted by the manager
+# but not by the API
+model_providers = [*llm_providers, "fake"]
+
 
 class LlmManager:
     """
@@ -89,6 +103,12 @@ class LlmManager:
     def initialize_model(
         model_provider: str,
         model_name: str,
+        rate_limited: bool = True,
+        adaptive_concurrency: bool = True,
+        retry_policy: Optional[Union[RetryPolicy, Dict]] = None,
+        fallbacks: Optional[List[Union[FallbackModel, Dict]]] = None,
+        hedging: Optional[Union[HedgingPolicy, Dict]] = None,
+        cascade: Optional[Union[CascadePolicy, Dict]] = None,
         **kwargs
     ) -> BaseChatModel:
         """
@@ -100,6 +120,23 @@ class LlmManager:
             The company or provider of the model (e.g., "openai", "google", "anthropic").
         model_name : str
             The name of the model to be initialized.
+        rate_limited : bool, optional
+            Pace the calls with the process-wide RPM/TPM limiter, by default True; it
+            only throttles the providers and models given limits (`rate_limits`).
+        adaptive_concurrency : bool, optional
+            Hold the calls in the process-wide AIMD concurrency window of the model,
+            by default True.
+        retry_policy : RetryPolicy | dict, optional
+            Retries of the transient errors of each call, by default `RetryPolicy()`.
+            They replace the retries of the provider SDK (`max_retries=0`), so each
+            failed call is seen by the concurrency window.
+        fallbacks : List[FallbackModel | dict], optional
+            Ordered provider/model pairs taking the calls the model keeps failing.
+        hedging : HedgingPolicy | dict, optional
+            Duplicate the slow calls to the same or an alternate model, by default not.
+        cascade : CascadePolicy | dict, optional
+            Send the calls to a small/fast model first and escalate them to this
+            model, by default not.
         kwargs : dict
             Additional keyword arguments for future extensions.
             - temperature: float
@@ -114,18 +151,183 @@ class LlmManager:
         """
         try:
             # SECTION: validate model provider
-            if model_provider not in llm_providers:
+            if model_provider not in model_providers:
                 raise ValueError(
                     f"Invalid model provider: {model_provider}. Supported providers are: {llm_providers}")
 
+            # SECTION: retry policy
+            if not isinstance(retry_policy, RetryPolicy):
+                retry_policy = RetryPolicy(**(retry_policy or {}))
+            fallbacks = [
+                fallback if isinstance(fallback, FallbackModel) else FallbackModel(**fallback)
+                for fallback in fallbacks or []
+            ]
+            resilient = retry_policy.max_retries > 0 or bool(fallbacks)
+            if resilient and model_provider != "fake":
+                kwargs.setdefault("max_retries", 0)
+
             # SECTION: initialize model
-            model: BaseChatModel = init_chat_model(
-                model=model_name,
-                model_provider=model_provider,
+            model = LlmManager._init_managed_model(
+                model_provider,
+                model_name,
+                rate_limited=rate_limited,
+                adaptive_concurrency=adaptive_concurrency,
                 **kwargs
             )
+            if resilient:
+                model = LlmManager._init_resilient_model(
+                    model,
+                    model_provider,
+                    model_name,
+                    retry_policy,
+                    fallbacks,
+                    rate_limited=rate_limited,
+                    adaptive_concurrency=adaptive_concurrency,
+                    **kwargs
+                )
+
+            # SECTION: hedging
+            if hedging is not None:
+                if not isinstance(hedging, HedgingPolicy):
+                    hedging = HedgingPolicy(**hedging)
+                label = f"{model_provider}/{model_name}"
+                hedge_model = model
+                hedge_label = label
+                # NOTE: alternate model, with the same settings and retries
+                if hedging.model_provider and hedging.model_name:
+                    hedge_label = f"{hedging.model_provider}/{hedging.model_name}"
+                    if hedge_label != label:
+                        hedge_model = LlmManager.initialize_model(
+                            hedging.model_provider,
+                            hedging.model_name,
+                            rate_limited=rate_limited,
+                            adaptive_concurrency=adaptive_concurrency,
+                            retry_policy=retry_policy,
+                            **{
+                                key: value for key, value in kwargs.items()
+                                if key != "max_retries"
+                            }
+                        )
+                model = HedgedChatModel(
+                    primary=model,
+                    hedge=hedge_model,
+                    label=label,
+                    hedge_label=hedge_label,
+                    policy=hedging
+                )
+
+            # SECTION: small/large cascade
+            # NOTE: outermost, so an escalated call gets the retries and hedging
+            if cascade is not None:
+                if not isinstance(cascade, CascadePolicy):
+                    cascade = CascadePolicy(**cascade)
+                small_kwargs = {
+                    **{key: value for key, value in kwargs.items() if key != "max_retries"},
+                    **cascade.model_dump(
+                        include={"temperature", "max_tokens"}, exclude_none=True),
+                }
+                model = CascadeChatModel(
+                    small=LlmManager.initialize_model(
+                        cascade.model_provider,
+                        cascade.model_name,
+                        rate_limited=rate_limited,
+                        adaptive_concurrency=adaptive_concurrency,
+                        retry_policy=retry_policy,
+                        **small_kwargs
+                    ),
+                    large=model,
+                    small_label=f"{cascade.model_provider}/{cascade.model_name}",
+                    large_label=f"{model_provider}/{model_name}",
+                    policy=cascade
+                )
             return model
         except Exception as e:
             logger.error(
                 f"Error initializing model {model_name} from {model_provider}: {e}")
             raise
+
+    @staticmethod
+    def _init_resilient_model(
+        model: BaseChatModel,
+        model_provider: str,
+        model_name: str,
+        retry_policy: RetryPolicy,
+        fallbacks: List[FallbackModel],
+        rate_limited: bool = True,
+        adaptive_concurrency: bool = True,
+        **kwargs
+    ) -> BaseChatModel:
+        """
+        Wrap a model with the retries of its calls and the fallback chain.
+        """
+        # SECTION: retries and fallback chain
+        candidates = [model]
+        labels = [f"{model_provider}/{model_name}"]
+        for fallback in fallbacks:
+            if fallback.model_provider not in model_providers:
+                raise ValueError(
+                    f"Invalid fallback model provider: {fallback.model_provider}. Supported providers are: {llm_providers}")
+            # NOTE: same settings as the primary unless set on the fallback
+            fallback_kwargs = {
+                **kwargs,
+                **fallback.model_dump(
+                    exclude={"model_provider", "model_name"}, exclude_none=True),
+            }
+            if fallback.model_provider == "fake":
+                fallback_kwargs.pop("max_retries", None)
+            else:
+                fallback_kwargs.setdefault("max_retries", 0)
+            candidates.append(LlmManager._init_managed_model(
+                fallback.model_provider,
+                fallback.model_name,
+                rate_limited=rate_limited,
+                adaptive_concurrency=adaptive_concurrency,
+                **fallback_kwargs
+            ))
+            labels.append(f"{fallback.model_provider}/{fallback.model_name}")
+
+        return ResilientChatModel(
+            candidates=candidates,
+            labels=labels,
+            retry_policy=retry_policy
+        )
+
+    @staticmethod
+    def _init_managed_model(
+        model_provider: str,
+        model_name: str,
+        rate_limited: bool = True,
+        adaptive_concurrency: bool = True,
+        **kwargs
+    ) -> BaseChatModel:
+        """
+        Initialize a provider model, wrapped in the adaptive concurrency window and the
+        rate limiter of the process.
+        """
+        # NOTE: offline stand-in
+        if model_provider == "fake":
+            model: BaseChatModel = FakeChatModel(model_name=model_name, **kwargs)
+        else:
+            model = init_chat_model(
+                model=model_name,
+                model_provider=model_provider,
+                **kwargs
+            )
+
+        # SECTION: adaptive concurrency
+        # NOTE: innermost, so the window only sees the provider's latency
+        if adaptive_concurrency:
+            model = AdaptiveConcurrencyChatModel(
+                model=model,
+                model_provider=model_provider,
+                model_name=model_name
+            )
+
+        # SECTION: client-side rate limiting
+        if rate_limited:
+            model = RateLimitedChatModel(
+                model=model,
+                model_provider=model_provider,
+                model_name=model_name
+            )
+        return model
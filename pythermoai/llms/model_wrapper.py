@@ -0,0 +1,229 @@
+# import libs
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple
+)
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage, BaseMessageChunk
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable, RunnableBinding
+
+
+class ModelCall:
+    '''
+    One call of a wrapped model, with the token usage reported by the provider.
+    '''
+
+    def __init__(self, messages: List[BaseMessage], kwargs: dict):
+        self.messages = messages
+        self.kwargs = kwargs
+        self.estimated_tokens = 0
+        self.tokens: Optional[int] = None
+
+    def observe(self, message: Any):
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            return
+        tokens = usage.get("total_tokens") or (
+            usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+        self.tokens = (self.tokens or 0) + tokens
+
+
+class ChatModelWrapper(BaseChatModel):
+    '''
+    Base of the chat models guarding the calls of a provider model.
+
+    Subclasses implement `guard` and `aguard`, context managers around each call
+    (generate or stream) of the wrapped model. Tools are bound through the wrapped
+    model and the bound kwargs are passed back on each call, so agents calling tools
+    stay guarded.
+    '''
+    model: BaseChatModel
+    model_provider: str
+    model_name: str
+
+    @property
+    def _llm_type(self) -> str:
+        return self.model._llm_type
+
+    @contextmanager
+    def guard(self, call: ModelCall) -> Iterator[ModelCall]:
+        yield call
+
+    @asynccontextmanager
+    async def aguard(self, call: ModelCall) -> AsyncIterator[ModelCall]:
+        yield call
+
+    def _should_stream(self, *, async_api: bool, **kwargs: Any) -> bool:
+        # NOTE: stream only if the wrapped model does
+        return self.model._should_stream(async_api=async_api, **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        with self.guard(ModelCall(messages, kwargs)) as call:
+            result = self.model._generate(
+                messages, stop=stop, run_manager=run_manager, **kwargs)
+            call.observe(result.generations[0].message)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        async with self.aguard(ModelCall(messages, kwargs)) as call:
+            result = await self.model._agenerate(
+                messages, stop=stop, run_manager=run_manager, **kwargs)
+            call.observe(result.generations[0].message)
+        return result
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        with self.guard(ModelCall(messages, kwargs)) as call:
+            for chunk in self.model._stream(
+                    messages, stop=stop, run_manager=run_manager, **kwargs):
+                call.observe(chunk.message)
+                yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async with self.aguard(ModelCall(messages, kwargs)) as call:
+            async for chunk in self.model._astream(
+                    messages, stop=stop, run_manager=run_manager, **kwargs):
+                call.observe(chunk.message)
+                yield chunk
+
+    def bind_tools(self, tools: Any, **kwargs: Any):
+        # NOTE: let the wrapped model format the tools, then bind them to the wrapper
+        bound = self.model.bind_tools(tools, **kwargs)
+        return self.bind(**getattr(bound, "kwargs", {}))
+
+
+def _message_chunk(message: BaseMessage) -> BaseMessageChunk:
+    """Return a whole answer as a single stream chunk."""
+    if isinstance(message, BaseMessageChunk):
+        return message
+    return AIMessageChunk(**message.model_dump(
+        exclude={"type", "invalid_tool_calls"}))
+
+
+class RoutingChatModel(BaseChatModel):
+    '''
+    Base of the chat models sending each call to one or more inner models (retries
+    and fallbacks, hedges, cascade tiers).
+
+    The inner models may have tools bound. They are called through `_call`,
+    `_acall`, `_call_stream` and `_acall_stream`, outside any callbacks: the router
+    reports the tokens and the result of the call itself, so each token is streamed
+    once. Subclasses return the model whose streaming the router follows from `lead`.
+    '''
+
+    @property
+    def lead(self) -> Runnable:
+        raise NotImplementedError
+
+    @staticmethod
+    def _chat_model(model: Runnable) -> BaseChatModel:
+        return model.bound if isinstance(model, RunnableBinding) else model
+
+    @staticmethod
+    def _inner(model: Runnable, kwargs: Dict[str, Any]) -> Tuple[BaseChatModel, Dict[str, Any]]:
+        '''
+        Return the chat model of an inner model and the kwargs of a call, with the
+        kwargs bound to the model (tools) merged in.
+        '''
+        if isinstance(model, RunnableBinding):
+            return model.bound, {**model.kwargs, **kwargs}
+        return model, kwargs
+
+    def _should_stream(self, *, async_api: bool, **kwargs: Any) -> bool:
+        # NOTE: stream only if the lead model does
+        return self._chat_model(self.lead)._should_stream(
+            async_api=async_api, **kwargs)
+
+    def _call(
+        self,
+        model: Runnable,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> BaseMessage:
+        chat_model, kwargs = self._inner(model, kwargs)
+        return chat_model._generate(
+            messages, stop=stop, **kwargs).generations[0].message
+
+    async def _acall(
+        self,
+        model: Runnable,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> BaseMessage:
+        chat_model, kwargs = self._inner(model, kwargs)
+        result = await chat_model._agenerate(messages, stop=stop, **kwargs)
+        return result.generations[0].message
+
+    def _call_stream(
+        self,
+        model: Runnable,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> Iterator[BaseMessageChunk]:
+        '''
+        Stream an inner model, or call it when it cannot stream.
+        '''
+        chat_model, kwargs = self._inner(model, kwargs)
+        # NOTE: the router streams, so the inner model streams unless it cannot
+        if not chat_model._should_stream(async_api=False, **{**kwargs, "stream": True}):
+            result = chat_model._generate(messages, stop=stop, **kwargs)
+            yield _message_chunk(result.generations[0].message)
+            return
+        for chunk in chat_model._stream(messages, stop=stop, **kwargs):
+            yield chunk.message
+
+    async def _acall_stream(
+        self,
+        model: Runnable,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[BaseMessageChunk]:
+        '''
+        Stream an inner model, or call it when it cannot stream.
+        '''
+        chat_model, kwargs = self._inner(model, kwargs)
+        # NOTE: the router streams, so the inner model streams unless it cannot
+        if not chat_model._should_stream(async_api=True, **{**kwargs, "stream": True}):
+            result = await chat_model._agenerate(messages, stop=stop, **kwargs)
+            yield _message_chunk(result.generations[0].message)
+            return
+        async for chunk in chat_model._astream(messages, stop=stop, **kwargs):
+            yield chunk.message
@@ -0,0 +1,121 @@
+# import libs
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+# NOTE: kinds of provider errors
+RATE_LIMIT = "rate_limit"
+OVERLOADED = "overloaded"
+TIMEOUT = "timeout"
+SERVER = "server"
+CONNECTION = "connection"
+OTHER = "other"
+
+
+class ProviderErrorInfo:
+    '''
+    What a failed LLM call tells about the provider.
+
+    Provider SDKs raise their own exception types; they are recognized by their
+    status code and class name, so no SDK has to be imported.
+    '''
+
+    def __init__(
+        self,
+        kind: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None
+    ):
+        self.kind = kind
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def throttled(self) -> bool:
+        '''
+        Whether the provider asked to slow down (429, overloaded or timed out).
+        '''
+        return self.kind in (RATE_LIMIT, OVERLOADED, TIMEOUT)
+
+    @property
+    def retryable(self) -> bool:
+        '''
+        Whether the same call may succeed if sent again later.
+        '''
+        return self.kind != OTHER
+
+    def __repr__(self) -> str:
+        return (
+            f"ProviderErrorInfo(kind={self.kind!r}, status_code={self.status_code}, "
+            f"retry_after={self.retry_after})")
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for value in (
+        getattr(exc, "status_code", None),
+        getattr(getattr(exc, "response", None), "status_code", None),
+        getattr(exc, "code", None),
+    ):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    if isinstance(getattr(exc, "retry_after", None), (int, float)):
+        return float(exc.retry_after)
+    headers: Any = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            # NOTE: HTTP date
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_provider_error(exc: BaseException) -> ProviderErrorInfo:
+    '''
+    Classify the exception raised by an LLM call.
+
+    Parameters
+    ----------
+    exc : BaseException
+        The exception raised by the provider SDK.
+
+    Returns
+    -------
+    ProviderErrorInfo
+        The error kind, the HTTP status code and the Retry-After delay (in seconds) if
+        the provider sent one.
+    '''
+    status_code = _status_code(exc)
+    name = type(exc).__name__
+    retry_after = _retry_after(exc)
+
+    if status_code == 429 or "RateLimit" in name or "ResourceExhausted" in name:
+        kind = RATE_LIMIT
+    elif status_code in (503, 529) or "Overloaded" in name or "ServiceUnavailable" in name:
+        kind = OVERLOADED
+    elif (
+        status_code in (408, 504) or
+        isinstance(exc, (TimeoutError, asyncio.TimeoutError)) or
+        "Timeout" in name or "DeadlineExceeded" in name
+    ):
+        kind = TIMEOUT
+    elif status_code is not None and status_code >= 500:
+        kind = SERVER
+    elif isinstance(exc, ConnectionError) or "Connection" in name:
+        kind = CONNECTION
+    else:
+        kind = OTHER
+    return ProviderErrorInfo(kind, status_code=status_code, retry_after=retry_after)
@@ -0,0 +1,63 @@
+# import libs
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import (
+    AsyncIterator,
+    Iterator
+)
+from pydantic import Field
+# local
+from .model_wrapper import ChatModelWrapper, ModelCall
+from .rate_limiter import (
+    ProviderRateLimiter,
+    ModelRateLimit,
+    estimate_tokens,
+    get_rate_limiter
+)
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+
+class RateLimitedChatModel(ChatModelWrapper):
+    '''
+    Chat model wrapper pacing the calls of a provider model with the shared
+    `ProviderRateLimiter`.
+
+    Before each call one request and the estimated tokens are reserved from the
+    model's RPM/TPM budgets, waiting if they are exhausted; afterwards the estimate is
+    corrected with the usage reported by the provider.
+    '''
+    limiter: ProviderRateLimiter = Field(
+        default_factory=get_rate_limiter, exclude=True)
+
+    @property
+    def budget(self) -> ModelRateLimit:
+        return self.limiter.get(self.model_provider, self.model_name)
+
+    def _reserve(self, call: ModelCall) -> float:
+        max_tokens = call.kwargs.get("max_tokens") or getattr(self.model, "max_tokens", None)
+        call.estimated_tokens = estimate_tokens(
+            call.messages,
+            max_tokens=max_tokens if isinstance(max_tokens, int) else None,
+            tools=call.kwargs.get("tools")
+        )
+        delay = self.budget.reserve(call.estimated_tokens)
+        if delay > 0:
+            logger.info(
+                f"Rate limit of {self.model_provider}/{self.model_name} reached, waiting {delay:.2f} seconds")
+        return delay
+
+    @contextmanager
+    def guard(self, call: ModelCall) -> Iterator[ModelCall]:
+        time.sleep(self._reserve(call))
+        yield call
+        self.budget.reconcile(call.estimated_tokens, call.tokens)
+
+    @asynccontextmanager
+    async def aguard(self, call: ModelCall) -> AsyncIterator[ModelCall]:
+        await asyncio.sleep(self._reserve(call))
+        yield call
+        self.budget.reconcile(call.estimated_tokens, call.tokens)
@@ -0,0 +1,248 @@
+# import libs
+import json
+import logging
+import threading
+import time
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: rough number of characters per token, used to estimate prompts
+CHARS_PER_TOKEN = 4
+
+# NOTE: seconds of budget that may be spent in a burst, providers enforce the
+# per-minute limits over shorter windows too
+BURST_SECONDS = 10.0
+
+
+class TokenBucket:
+    '''
+    Token bucket refilled continuously up to its capacity.
+
+    Acquiring reserves the amount at once, so the bucket may go negative: the caller
+    then sleeps until the debt is refilled. Reservations are served in call order
+    without holding a lock while waiting, so one bucket can be shared by threads and
+    event loops.
+    '''
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        # NOTE: set attributes
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.level = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated_at
+        self.level = min(self.capacity, self.level + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        '''
+        Take `amount` from the bucket and return the seconds to wait before using it.
+        '''
+        self._refill(now)
+        # NOTE: a request larger than the bucket waits for a full bucket only
+        self.level -= min(amount, self.capacity)
+        if self.level >= 0:
+            return 0.0
+        return -self.level / self.refill_per_second
+
+    def give_back(self, amount: float, now: float):
+        '''
+        Return (or, if negative, take) tokens after the actual usage is known.
+        '''
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ModelRateLimit:
+    '''
+    Requests-per-minute and tokens-per-minute budgets of one provider model.
+    '''
+
+    def __init__(self, key: str, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        # NOTE: set attributes
+        self.key = key
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(
+            max(1.0, rpm * BURST_SECONDS / 60.0), rpm / 60.0) if rpm else None
+        self.tokens = TokenBucket(
+            max(1.0, tpm * BURST_SECONDS / 60.0), tpm / 60.0) if tpm else None
+        self.lock = threading.Lock()
+        # counters
+        self.calls = 0
+        self.throttled = 0
+        self.estimated_tokens = 0
+        self.actual_tokens = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def reserve(self, estimated_tokens: int) -> float:
+        '''
+        Reserve one request and `estimated_tokens` tokens.
+
+        Returns
+        -------
+        float
+            Seconds to wait before sending the request.
+        '''
+        with self.lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self.requests is not None:
+                delay = max(delay, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                delay = max(delay, self.tokens.reserve(estimated_tokens, now))
+
+            # NOTE: counters
+            self.calls += 1
+            self.estimated_tokens += estimated_tokens
+            if delay > 0:
+                self.throttled += 1
+                self.total_wait_time += delay
+                self.max_wait_time = max(self.max_wait_time, delay)
+        return delay
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        '''
+        Correct the token budget with the usage reported by the provider.
+        '''
+        if actual_tokens is None:
+            return
+        with self.lock:
+            self.actual_tokens += actual_tokens
+            if self.tokens is not None:
+                # NOTE: the bucket took at most its capacity for the estimate
+                reserved = min(estimated_tokens, self.tokens.capacity)
+                self.tokens.give_back(reserved - actual_tokens, time.monotonic())
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "estimated_tokens": self.estimated_tokens,
+            "actual_tokens": self.actual_tokens,
+            "avg_wait_time": self.total_wait_time / self.calls if self.calls else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "available_requests": (
+                self.requests.level if self.requests is not None else None),
+            "available_tokens": (
+                self.tokens.level if self.tokens is not None else None),
+        }
+
+
+class ProviderRateLimiter:
+    '''
+    Client-side RPM/TPM limiter for LLM providers.
+
+    Budgets are kept per provider and model. Limits are looked up by
+    `provider/model` first and fall back to the provider's limits, so a provider-wide
+    default can be refined for single models.
+    '''
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, Optional[int]]]] = None):
+        '''
+        Initialize the rate limiter.
+
+        Parameters
+        ----------
+        limits : Dict[str, Dict[str, int]], optional
+            Limits keyed by provider or `provider/model`, each a dict with `rpm` and
+            `tpm` (None for no limit), by default none: calls are only counted until
+            limits are configured (e.g. the entry-tier `default_rate_limits`).
+        '''
+        self.limits: Dict[str, Dict[str, Optional[int]]] = {
+            key: dict(value) for key, value in (limits or {}).items()
+        }
+        self.models: Dict[str, ModelRateLimit] = {}
+        self.lock = threading.Lock()
+
+    def configure(self, limits: Dict[str, Dict[str, Optional[int]]]):
+        '''
+        Set the limits of providers or models, keyed by provider or `provider/model`.
+
+        Budgets of the affected models restart from a full bucket.
+        '''
+        with self.lock:
+            for key, value in limits.items():
+                self.limits[key] = {**self.limits.get(key, {}), **value}
+            # NOTE: rebuilt with the new limits on the next call
+            for key in list(self.models):
+                provider = key.split("/", 1)[0]
+                if key in limits or provider in limits:
+                    del self.models[key]
+
+    def resolve_limits(self, provider: str, model: str) -> Tuple[Optional[int], Optional[int]]:
+        '''
+        Return the RPM and TPM limits of a provider model.
+        '''
+        limits = {
+            **self.limits.get(provider, {}),
+            **self.limits.get(f"{provider}/{model}", {}),
+        }
+        return limits.get("rpm"), limits.get("tpm")
+
+    def get(self, provider: str, model: str) -> ModelRateLimit:
+        '''
+        Return the budgets of a provider model, creating them on first use.
+        '''
+        key = f"{provider}/{model}"
+        with self.lock:
+            limit = self.models.get(key)
+            if limit is None:
+                rpm, tpm = self.resolve_limits(provider, model)
+                limit = ModelRateLimit(key, rpm=rpm, tpm=tpm)
+                self.models[key] = limit
+            return limit
+
+    def metrics(self) -> Dict[str, Any]:
+        '''
+        Return the configured limits and the budgets of the models used so far.
+        '''
+        return {
+            "limits": self.limits,
+            "models": {key: limit.metrics() for key, limit in self.models.items()},
+        }
+
+
+def estimate_tokens(
+    messages: List[Any],
+    max_tokens: Optional[int] = None,
+    tools: Optional[List[Any]] = None
+) -> int:
+    '''
+    Estimate the tokens a call counts against the TPM budget: the prompt, the bound
+    tool schemas and the completion budget (`max_tokens`), as providers do.
+    '''
+    chars = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        chars += len(content if isinstance(content, str) else json.dumps(content, default=str))
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            chars += len(json.dumps(tool_calls, default=str))
+    if tools:
+        chars += len(json.dumps(tools, default=str))
+    return chars // CHARS_PER_TOKEN + 1 + (max_tokens or 0)
+
+
+# SECTION: process-wide limiter shared by all agents and LlmManager instances
+_rate_limiter = ProviderRateLimiter()
+
+
+def get_rate_limiter() -> ProviderRateLimiter:
+    '''
+    Return the process-wide rate limiter.
+    '''
+    return _rate_limiter
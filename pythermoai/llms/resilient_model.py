@@ -0,0 +1,236 @@
+# import libs
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional
+)
+from pydantic import Field
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun
+)
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import (
+    ChatGeneration,
+    ChatGenerationChunk,
+    ChatResult
+)
+from langchain_core.runnables import Runnable
+# local
+from ..models import RetryPolicy
+from .provider_errors import classify_provider_error
+from .model_wrapper import RoutingChatModel
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+
+class RetryStats:
+    '''
+    Counters of the retries and failovers of the LLM calls, per provider model.
+    '''
+
+    def __init__(self):
+        self.models: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "retries": 0, "failovers": 0, "failures": 0})
+        self.lock = threading.Lock()
+
+    def record(self, label: str, event: str):
+        with self.lock:
+            self.models[label][event] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            return {label: dict(counters) for label, counters in self.models.items()}
+
+
+# SECTION: process-wide counters
+_retry_stats = RetryStats()
+
+
+def get_retry_stats() -> RetryStats:
+    '''
+    Return the process-wide retry and failover counters.
+    '''
+    return _retry_stats
+
+
+class ResilientChatModel(RoutingChatModel):
+    '''
+    Chat model retrying failed calls with jittered exponential backoff and failing
+    over to an ordered chain of fallback models.
+
+    Transient provider errors are retried on the same model up to
+    `retry_policy.max_retries` times, then the next candidate takes the call. Since a
+    single model call is retried, an agent run keeps the tool results already in its
+    thread. A stream is only retried before its first chunk.
+    '''
+    candidates: List[Runnable]
+    labels: List[str]
+    retry_policy: RetryPolicy = Field(default_factory=RetryPolicy)
+    stats: RetryStats = Field(default_factory=get_retry_stats, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "resilient"
+
+    @property
+    def lead(self) -> Runnable:
+        # NOTE: stream only if the primary model does
+        return self.candidates[0]
+
+    def _chain(self):
+        '''
+        Yield the candidates and their labels, in failover order.
+        '''
+        for index, (candidate, label) in enumerate(zip(self.candidates, self.labels)):
+            if index > 0:
+                self.stats.record(self.labels[index - 1], "failovers")
+                logger.warning(f"Failing over from {self.labels[index - 1]} to {label}")
+            yield candidate, label
+
+    def _on_error(self, e: Exception, label: str, attempt: int) -> Optional[float]:
+        '''
+        Return the seconds to wait before the next attempt, or None to fail over.
+
+        Raises
+        ------
+        Exception
+            The error, if it is not transient.
+        '''
+        self.stats.record(label, "failures")
+        info = classify_provider_error(e)
+        if not info.retryable:
+            raise e
+        logger.warning(f"Call to {label} failed ({info.kind}): {e}")
+        if attempt >= self.retry_policy.max_retries:
+            return None
+        if info.retry_after and info.retry_after > self.retry_policy.max_retry_after:
+            return None
+        return self.retry_policy.delay(attempt, info.retry_after)
+
+    def _result(self, message: BaseMessage, label: str) -> ChatResult:
+        if label != self.labels[0]:
+            message.response_metadata["fallback_model"] = label
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        error: Optional[Exception] = None
+        for candidate, label in self._chain():
+            for attempt in range(self.retry_policy.max_retries + 1):
+                self.stats.record(label, "retries" if attempt else "calls")
+                try:
+                    message = self._call(
+                        candidate, messages, stop=stop, **kwargs)
+                    return self._result(message, label)
+                except Exception as e:
+                    error = e
+                    delay = self._on_error(e, label, attempt)
+                    if delay is None:
+                        break
+                    time.sleep(delay)
+        raise error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        error: Optional[Exception] = None
+        for candidate, label in self._chain():
+            for attempt in range(self.retry_policy.max_retries + 1):
+                self.stats.record(label, "retries" if attempt else "calls")
+                try:
+                    message = await self._acall(
+                        candidate, messages, stop=stop, **kwargs)
+                    return self._result(message, label)
+                except Exception as e:
+                    error = e
+                    delay = self._on_error(e, label, attempt)
+                    if delay is None:
+                        break
+                    await asyncio.sleep(delay)
+        raise error
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> Iterator[ChatGenerationChunk]:
+        error: Optional[Exception] = None
+        for candidate, label in self._chain():
+            for attempt in range(self.retry_policy.max_retries + 1):
+                self.stats.record(label, "retries" if attempt else "calls")
+                started = False
+                try:
+                    for chunk in self._call_stream(
+                            candidate, messages, stop=stop, **kwargs):
+                        started = True
+                        yield ChatGenerationChunk(message=chunk)
+                    return
+                except Exception as e:
+                    # NOTE: the chunks already sent cannot be taken back
+                    if started:
+                        raise
+                    error = e
+                    delay = self._on_error(e, label, attempt)
+                    if delay is None:
+                        break
+                    time.sleep(delay)
+        raise error
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        error: Optional[Exception] = None
+        for candidate, label in self._chain():
+            for attempt in range(self.retry_policy.max_retries + 1):
+                self.stats.record(label, "retries" if attempt else "calls")
+                started = False
+                try:
+                    async for chunk in self._acall_stream(
+                            candidate, messages, stop=stop, **kwargs):
+                        started = True
+                        yield ChatGenerationChunk(message=chunk)
+                    return
+                except Exception as e:
+                    # NOTE: the chunks already sent cannot be taken back
+                    if started:
+                        raise
+                    error = e
+                    delay = self._on_error(e, label, attempt)
+                    if delay is None:
+                        break
+                    await asyncio.sleep(delay)
+        raise error
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ResilientChatModel":
+        # NOTE: each candidate formats the tools for its own provider
+        return self.model_copy(update={
+            "candidates": [
+                self._chat_model(candidate).bind_tools(tools, **kwargs)
+                for candidate in self.candidates
+            ]
+        })
@@ -1,6 +1,12 @@
 from .config_memory import generate_thread, generate_thread_id
+from .checkpoint_serde import CompactSerializer
+from .compact_saver import CompactMemorySaver
+from .thread_fork import fork_thread
 
 __all__ = [
     'generate_thread',
-    'generate_thread_id'
+    'generate_thread_id',
+    'CompactSerializer',
+    'CompactMemorySaver',
+    'fork_thread'
 ]
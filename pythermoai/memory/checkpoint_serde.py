@@ -0,0 +1,257 @@
+# import libs
+import logging
+import zlib
+import hashlib
+from collections import OrderedDict
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    MutableMapping
+)
+import ormsgpack
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# SECTION: constants
+# suffix added to the type tag of zlib-compressed payloads
+ZLIB_SUFFIX = "+zlib"
+# type tag of a message list stored as content-addressed references
+MESSAGE_REFS_TYPE = "msgrefs+zlib"
+# separator between the type tag and the payload of a stored blob
+BLOB_SEPARATOR = b"\x00"
+
+
+class CompactSerializer(SerializerProtocol):
+    '''
+    Compact checkpoint serializer for langgraph checkpointers.
+
+    Values are encoded with the msgpack encoder of `JsonPlusSerializer` and
+    compressed with zlib once they exceed `min_compress_size` bytes. When a
+    `blob_store` is provided, message lists (the `messages` channel of the
+    agents) are stored as content-addressed references: every message is
+    serialized once, kept in the blob store under its hash, and each new
+    checkpoint of a thread only stores the list of hashes. Repeated message
+    history and large tool outputs are therefore written once per thread
+    instead of once per checkpoint.
+
+    Payloads written by the default serializer are still readable, so the
+    serializer can be swapped on an existing checkpointer.
+    '''
+
+    def __init__(
+        self,
+        serde: Optional[SerializerProtocol] = None,
+        blob_store: Optional[MutableMapping[str, bytes]] = None,
+        compression_level: int = 3,
+        min_compress_size: int = 256,
+        cache_size: int = 4096
+    ):
+        '''
+        Initialize the compact serializer.
+
+        Parameters
+        ----------
+        serde : SerializerProtocol, optional
+            The inner serializer used to encode values, by default `JsonPlusSerializer`.
+        blob_store : MutableMapping[str, bytes], optional
+            Content-addressed store for deduplicated messages. Use a plain dict for the
+            in-memory checkpointer and a persistent mapping (e.g. `shelve`) alongside a
+            persistent checkpointer. If None, message deduplication is disabled.
+        compression_level : int, optional
+            The zlib compression level, by default 3.
+        min_compress_size : int, optional
+            Payloads smaller than this number of bytes are stored uncompressed, by default 256.
+        cache_size : int, optional
+            Number of messages kept in the encode/decode caches, by default 4096.
+        '''
+        # NOTE: set attributes
+        self.serde = serde or JsonPlusSerializer()
+        self.blob_store = blob_store
+        self.compression_level = compression_level
+        self.min_compress_size = min_compress_size
+        self.cache_size = cache_size
+
+        # NOTE: caches
+        # message object identity -> (message, blob key), avoids re-encoding
+        # the unchanged history on every checkpoint
+        self._encode_cache: OrderedDict[int, Tuple[BaseMessage, str]] = \
+            OrderedDict()
+        # blob key -> decoded message
+        self._decode_cache: OrderedDict[str, BaseMessage] = OrderedDict()
+
+    @property
+    def dedup_enabled(self) -> bool:
+        """Returns True if message deduplication is enabled."""
+        return self.blob_store is not None
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        '''
+        Serialize a checkpoint value.
+
+        Parameters
+        ----------
+        obj : Any
+            The value to serialize.
+
+        Returns
+        -------
+        Tuple[str, bytes]
+            The type tag and the serialized payload.
+        '''
+        # SECTION: message lists (deduplicated)
+        if self.dedup_enabled and self._is_message_list(obj):
+            refs = [self._put_message(message) for message in obj]
+            return MESSAGE_REFS_TYPE, zlib.compress(
+                ormsgpack.packb(refs),
+                self.compression_level
+            )
+
+        # SECTION: other values
+        type_, data = self.serde.dumps_typed(obj)
+
+        # NOTE: compress large payloads only
+        if len(data) >= self.min_compress_size:
+            return f"{type_}{ZLIB_SUFFIX}", zlib.compress(
+                data,
+                self.compression_level
+            )
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        '''
+        Deserialize a checkpoint value.
+
+        Parameters
+        ----------
+        data : Tuple[str, bytes]
+            The type tag and the serialized payload.
+
+        Returns
+        -------
+        Any
+            The deserialized value.
+        '''
+        type_, data_ = data
+
+        # SECTION: message lists (deduplicated)
+        if type_ == MESSAGE_REFS_TYPE:
+            refs: List[str] = ormsgpack.unpackb(zlib.decompress(data_))
+            return [self._get_message(ref) for ref in refs]
+
+        # SECTION: compressed values
+        if type_.endswith(ZLIB_SUFFIX):
+            return self.serde.loads_typed(
+                (type_[:-len(ZLIB_SUFFIX)], zlib.decompress(data_))
+            )
+
+        # SECTION: values written by the inner serializer
+        return self.serde.loads_typed((type_, data_))
+
+    @staticmethod
+    def _is_message_list(obj: Any) -> bool:
+        """Check whether the value is a non-empty list of langchain messages."""
+        return (
+            isinstance(obj, list) and
+            len(obj) > 0 and
+            all(isinstance(item, BaseMessage) for item in obj)
+        )
+
+    def _put_message(self, message: BaseMessage) -> str:
+        """Store a message in the blob store and return its content hash."""
+        # NOTE: the same message object is shared by all checkpoints of a thread
+        store: Dict[str, bytes] = self.blob_store  # type: ignore[assignment]
+        cached = self._encode_cache.get(id(message))
+        if (
+            cached is not None and
+            cached[0] is message and
+            cached[1] in store
+        ):
+            self._encode_cache.move_to_end(id(message))
+            return cached[1]
+
+        type_, data = self.serde.dumps_typed(message)
+        # NOTE: content-addressed key
+        key = hashlib.blake2b(
+            type_.encode() + BLOB_SEPARATOR + data,
+            digest_size=16
+        ).hexdigest()
+
+        # NOTE: store only once
+        if key not in store:
+            store[key] = type_.encode() + BLOB_SEPARATOR + zlib.compress(
+                data,
+                self.compression_level
+            )
+
+        # NOTE: keep a reference so the object id cannot be reused
+        self._encode_cache[id(message)] = (message, key)
+        if len(self._encode_cache) > self.cache_size:
+            self._encode_cache.popitem(last=False)
+        return key
+
+    def _get_message(self, key: str) -> BaseMessage:
+        """Load a message from the blob store by its content hash."""
+        cached = self._decode_cache.get(key)
+        if cached is not None:
+            self._decode_cache.move_to_end(key)
+            return cached.model_copy()
+
+        store: Dict[str, bytes] = self.blob_store  # type: ignore[assignment]
+        if store is None or key not in store:
+            raise KeyError(f"Message blob not found in blob store: {key}")
+
+        type_, _, payload = store[key].partition(BLOB_SEPARATOR)
+        message = self.serde.loads_typed(
+            (type_.decode(), zlib.decompress(payload))
+        )
+
+        # NOTE: cache the decoded message, callers get a copy
+        self._decode_cache[key] = message
+        if len(self._decode_cache) > self.cache_size:
+            self._decode_cache.popitem(last=False)
+        return message.model_copy()
+
+    def collect_garbage(self, payloads: Iterable[Tuple[str, bytes]]) -> int:
+        '''
+        Remove the message blobs that none of the payloads refers to.
+
+        Blobs are shared by the threads (and forks) that contain the same message, so
+        they are not owned by a thread: after a thread is deleted, pass the payloads
+        still held by the checkpointer and the unreachable blobs are removed.
+
+        Parameters
+        ----------
+        payloads : Iterable[Tuple[str, bytes]]
+            Every (type tag, payload) pair written by this serializer and still stored.
+
+        Returns
+        -------
+        int
+            The number of blobs removed.
+        '''
+        if not self.dedup_enabled:
+            return 0
+        store: Dict[str, bytes] = self.blob_store  # type: ignore[assignment]
+
+        # NOTE: blobs reachable from a stored message list
+        live = set()
+        for type_, data in payloads:
+            if type_ == MESSAGE_REFS_TYPE:
+                live.update(ormsgpack.unpackb(zlib.decompress(data)))
+
+        dead = [key for key in store if key not in live]
+        for key in dead:
+            del store[key]
+            # NOTE: encode cache entries are checked against the store on use
+            self._decode_cache.pop(key, None)
+        if dead:
+            logger.info(f"Removed {len(dead)} unreferenced message blobs")
+        return len(dead)
@@ -0,0 +1,59 @@
+# import libs
+import logging
+from typing import (
+    Iterator,
+    Optional,
+    Tuple
+)
+from langgraph.checkpoint.memory import InMemorySaver
+# local
+from .checkpoint_serde import CompactSerializer
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+
+class CompactMemorySaver(InMemorySaver):
+    '''
+    In-memory checkpointer storing compact checkpoints.
+
+    Messages are deduplicated in the blob store of its `CompactSerializer`, and the
+    blobs no other thread refers to are removed when a thread is deleted, so the store
+    does not outgrow the checkpoints it serves.
+    '''
+
+    def __init__(self, serde: Optional[CompactSerializer] = None):
+        '''
+        Initialize the compact in-memory checkpointer.
+
+        Parameters
+        ----------
+        serde : CompactSerializer, optional
+            The serializer, by default a `CompactSerializer` with a dict blob store.
+        '''
+        self.compact_serde = serde or CompactSerializer(blob_store={})
+        super().__init__(serde=self.compact_serde)
+
+    def _payloads(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield every serialized value still stored: checkpoints, channels and writes."""
+        for namespaces in self.storage.values():
+            for checkpoints in namespaces.values():
+                for checkpoint, _, _ in checkpoints.values():
+                    yield checkpoint
+        yield from self.blobs.values()
+        for writes in self.writes.values():
+            for _, _, value, _ in writes.values():
+                yield value
+
+    def delete_thread(self, thread_id: str) -> None:
+        '''
+        Delete the checkpoints and writes of a thread and the message blobs only it
+        referred to.
+
+        Parameters
+        ----------
+        thread_id : str
+            Identifier for the chat thread.
+        '''
+        super().delete_thread(thread_id)
+        self.compact_serde.collect_garbage(self._payloads())
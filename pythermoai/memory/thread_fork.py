@@ -0,0 +1,102 @@
+# import libs
+import logging
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Any
+)
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
+# local
+from .config_memory import generate_thread_id
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+
+async def fork_thread(
+    checkpointer: BaseCheckpointSaver,
+    thread_id: str,
+    checkpoint_id: Optional[str] = None,
+    new_thread_id: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Fork a thread at a checkpoint into a new thread.
+
+    The checkpoint (channel values, versions and pending writes) is written as the
+    first checkpoint of the new thread, so the new thread continues from the parent's
+    state without re-running any tool call. With `CompactSerializer` message blobs are
+    content-addressed, so the forked history is shared with the parent and only new
+    turns of either thread take extra space (copy-on-write).
+
+    Parameters
+    ----------
+    checkpointer : BaseCheckpointSaver
+        The checkpointer of the agent that owns the thread.
+    thread_id : str
+        Identifier for the parent thread.
+    checkpoint_id : str, optional
+        The checkpoint to fork from, by default the latest checkpoint of the thread.
+    new_thread_id : str, optional
+        Identifier for the new thread, by default a generated one.
+
+    Returns
+    -------
+    Tuple[str, str]
+        The new thread_id and the checkpoint_id it starts from.
+    """
+    # SECTION: load the parent checkpoint
+    source_config: Dict[str, Any] = {
+        "thread_id": thread_id,
+        "checkpoint_ns": "",
+    }
+    if checkpoint_id:
+        source_config["checkpoint_id"] = checkpoint_id
+
+    checkpoint_tuple = await checkpointer.aget_tuple(
+        RunnableConfig(configurable=source_config)
+    )
+    if checkpoint_tuple is None:
+        raise ValueError(
+            f"Checkpoint not found for thread {thread_id}"
+            + (f" at {checkpoint_id}" if checkpoint_id else ""))
+
+    checkpoint = checkpoint_tuple.checkpoint
+    parent_checkpoint_id = checkpoint["id"]
+
+    # SECTION: write the checkpoint into the new thread
+    new_thread_id = new_thread_id or generate_thread_id()
+    if new_thread_id == thread_id:
+        raise ValueError("The new thread_id must differ from the parent thread_id.")
+
+    metadata = {
+        **checkpoint_tuple.metadata,
+        "source": "fork",
+        "forked_from": {
+            "thread_id": thread_id,
+            "checkpoint_id": parent_checkpoint_id,
+        },
+    }
+    new_config = await checkpointer.aput(
+        RunnableConfig(configurable={
+            "thread_id": new_thread_id,
+            "checkpoint_ns": "",
+        }),
+        checkpoint,
+        metadata,  # type: ignore[arg-type]
+        checkpoint["channel_versions"]
+    )
+
+    # NOTE: carry over pending writes grouped by task
+    writes_by_task: Dict[str, List[Tuple[str, Any]]] = {}
+    for task_id, channel, value in checkpoint_tuple.pending_writes or []:
+        writes_by_task.setdefault(task_id, []).append((channel, value))
+    for task_id, writes in writes_by_task.items():
+        await checkpointer.aput_writes(new_config, writes, task_id)
+
+    logger.info(
+        f"Forked thread {thread_id} at checkpoint {parent_checkpoint_id} into {new_thread_id}")
+
+    return new_thread_id, parent_checkpoint_id
@@ -4,9 +4,17 @@ from .chat import (
     AssistantMessage,
     ChatMessage,
     AgentMessage,
-    TokenMetadata
+    TokenMetadata,
+    StreamEvent
+)
+from .llm import (
+    AgentConfig,
+    LlmConfig,
+    RetryPolicy,
+    FallbackModel,
+    HedgingPolicy,
+    CascadePolicy
 )
-from .llm import AgentConfig, LlmConfig
 from .api import (
     AppInfo,
     AgentDetails,
@@ -14,6 +22,17 @@ from .api import (
     OverallSettings,
     ApiConfigSummary
 )
+from .threads import ThreadMetrics, ThreadForkRequest
+from .runs import RunLimits
+from .tables import (
+    ColumnMapping,
+    TableIssue,
+    TableStructure,
+    EquationBody,
+    CheckPoint,
+    RowCheck,
+    ThermoTable
+)
 
 __all__ = [
     "stdioMCP",
@@ -24,11 +43,26 @@ __all__ = [
     "ChatMessage",
     "AgentConfig",
     "LlmConfig",
+    "RetryPolicy",
+    "FallbackModel",
+    "HedgingPolicy",
+    "CascadePolicy",
     "AppInfo",
     "AgentDetails",
     "LlmDetails",
     "OverallSettings",
     "ApiConfigSummary",
     "AgentMessage",
-    "TokenMetadata"
+    "TokenMetadata",
+    "StreamEvent",
+    "ThreadMetrics",
+    "ThreadForkRequest",
+    "RunLimits",
+    "ColumnMapping",
+    "TableIssue",
+    "TableStructure",
+    "EquationBody",
+    "CheckPoint",
+    "RowCheck",
+    "ThermoTable"
 ]
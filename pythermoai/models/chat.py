@@ -3,10 +3,14 @@ from typing import (
     Optional,
     List,
     Literal,
-    Dict
+    Dict,
+    Any
 )
 import time
 from pydantic import BaseModel, Field
+# local
+from .runs import RunLimits
+from .tables import ThermoTable
 
 
 class UserMessage(BaseModel):
@@ -53,6 +57,21 @@ class ChatMessage(BaseModel):
     agent_selection: Optional[str] = Field(
         None, description="Selected agent for the chat"
     )
+    include_history: Optional[bool] = Field(
+        False,
+        description="Return the full thread history in messages instead of the current turn only"
+    )
+    run_id: Optional[str] = Field(
+        None,
+        description="Identifier for the agent run, used to cancel it with POST /runs/{run_id}/cancel"
+    )
+    limits: Optional[RunLimits] = Field(
+        None, description="Limits of this run, overriding the agent's limits"
+    )
+    tables: Optional[List[ThermoTable]] = Field(
+        None,
+        description="YAML tables of the assistant message, parsed and validated; None if it has none"
+    )
 
 
 class AgentMessage(BaseModel):
@@ -89,3 +108,15 @@ class TokenMetadata(BaseModel):
     """
     input_tokens: int = Field(0, description="Number of input tokens")
     output_tokens: int = Field(0, description="Number of output tokens")
+
+
+class StreamEvent(BaseModel):
+    """
+    Model for events streamed to the client during an agent run.
+    """
+    event: Literal[
+        "start", "token", "tool_call", "tool_result", "final", "error", "cancelled"
+    ] = Field(..., description="Type of the event")
+    data: Dict[str, Any] = Field(
+        default_factory=dict, description="Payload of the event"
+    )
@@ -1,4 +1,5 @@
 # import libs
+import random
 from typing import Dict, Union, List, Optional
 from pydantic import BaseModel, Field
 
@@ -36,6 +37,113 @@ class AgentConfig(BaseModel):
     )
 
 
+class RetryPolicy(BaseModel):
+    """
+    Model for the retries of a failed LLM call, with jittered exponential backoff.
+
+    Only transient errors (429, overloaded, timeouts, 5xx, connection errors) are
+    retried; when the retries of a model are exhausted the next fallback model is used.
+    """
+    max_retries: int = Field(
+        default=2, ge=0, description="Maximum number of retries of a call on the same model"
+    )
+    initial_delay: float = Field(
+        default=0.5, ge=0, description="Backoff (in seconds) before the first retry"
+    )
+    max_delay: float = Field(
+        default=8.0, ge=0, description="Maximum backoff (in seconds) between retries"
+    )
+    multiplier: float = Field(
+        default=2.0, ge=1, description="Growth factor of the backoff between retries"
+    )
+    max_retry_after: float = Field(
+        default=30.0, ge=0, description="Longest Retry-After (in seconds) waited for, longer ones fail over at once"
+    )
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Return the seconds to wait before retry number `attempt` (from 0), with full
+        jitter, and at least the provider's Retry-After.
+        """
+        backoff = min(self.max_delay, self.initial_delay * self.multiplier ** attempt)
+        return max(random.uniform(0, backoff), retry_after or 0.0)
+
+
+class FallbackModel(BaseModel):
+    """
+    Model for a fallback LLM, used when the calls to the previous model keep failing.
+    """
+    model_provider: str = Field(
+        ..., description="Provider of the fallback model (e.g., 'anthropic')"
+    )
+    model_name: str = Field(
+        ..., description="Name of the fallback model"
+    )
+    temperature: Optional[float] = Field(
+        default=None, description="Temperature of the fallback model, by default the primary's"
+    )
+    max_tokens: Optional[int] = Field(
+        default=None, description="Maximum number of tokens of the fallback model, by default the primary's"
+    )
+
+
+class HedgingPolicy(BaseModel):
+    """
+    Model for hedged LLM calls: a call still running after a percentile of the recent
+    latencies is duplicated, the first response wins and the other is cancelled.
+    """
+    percentile: float = Field(
+        default=0.95, gt=0, lt=1, description="Percentile of the recent latencies after which a call is hedged"
+    )
+    max_hedge_rate: float = Field(
+        default=0.1, ge=0, le=1, description="Maximum fraction of the calls that may be hedged"
+    )
+    min_samples: int = Field(
+        default=20, ge=1, description="Number of latencies recorded before calls are hedged"
+    )
+    min_delay: float = Field(
+        default=0.5, ge=0, description="Shortest wait (in seconds) before a hedge is sent"
+    )
+    model_provider: Optional[str] = Field(
+        default=None, description="Provider of the model receiving the hedges, by default the same model"
+    )
+    model_name: Optional[str] = Field(
+        default=None, description="Name of the model receiving the hedges, by default the same model"
+    )
+
+
+class CascadePolicy(BaseModel):
+    """
+    Model for the model cascade: requests go to a small/fast model by default and are
+    escalated to the configured (large) model by local heuristics or when the small
+    model's answer fails validation.
+    """
+    model_provider: str = Field(
+        description="Provider of the small model (e.g., 'openai', 'google')"
+    )
+    model_name: str = Field(
+        description="Name of the small model"
+    )
+    temperature: Optional[float] = Field(
+        default=None, description="Temperature of the small model, by default the large model's"
+    )
+    max_tokens: Optional[int] = Field(
+        default=None, description="Maximum number of tokens of the small model, by default the large model's"
+    )
+    max_table_rows: int = Field(
+        default=40, ge=0, description="Rows of the table in the request above which it is escalated"
+    )
+    max_table_columns: int = Field(
+        default=12, ge=0, description="Columns of the table in the request above which it is escalated"
+    )
+    max_equation_terms: int = Field(
+        default=12, ge=0, description="Operators and functions of an equation in the request above which it is escalated"
+    )
+    validate_output: bool = Field(
+        default=True, description="Escalate when the small model's answer is not a valid YAML table"
+    )
+
+
 class LlmConfig(BaseModel):
     model_provider: str = Field(
         default="openai",
@@ -53,3 +161,19 @@ class LlmConfig(BaseModel):
         default=2048,
         description="Maximum number of tokens for the LLM model"
     )
+    retry: Optional[RetryPolicy] = Field(
+        default=None,
+        description="Retry policy of the LLM calls"
+    )
+    fallbacks: Optional[List[FallbackModel]] = Field(
+        default=None,
+        description="Ordered provider/model pairs used when the LLM keeps failing"
+    )
+    hedging: Optional[HedgingPolicy] = Field(
+        default=None,
+        description="Hedging of the slow LLM calls, disabled by default"
+    )
+    cascade: Optional[CascadePolicy] = Field(
+        default=None,
+        description="Small/large model cascade of the LLM calls, disabled by default"
+    )
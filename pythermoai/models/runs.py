@@ -0,0 +1,32 @@
+# import libs
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class RunLimits(BaseModel):
+    """
+    Model for the limits of an agent run (one chat turn).
+
+    When a limit is reached the agent stops calling tools and writes a best-effort
+    final answer from what it gathered so far.
+    """
+    max_steps: Optional[int] = Field(
+        None, ge=1, description="Maximum number of LLM calls in the turn"
+    )
+    max_tool_calls: Optional[int] = Field(
+        None, ge=0, description="Maximum number of tool calls in the turn"
+    )
+    max_tokens: Optional[int] = Field(
+        None, ge=1, description="Maximum number of LLM tokens (input + output) used in the turn"
+    )
+    max_seconds: Optional[float] = Field(
+        None, gt=0, description="Maximum wall-clock time (in seconds) of the turn"
+    )
+
+    def merge(self, other: Optional["RunLimits"]) -> "RunLimits":
+        """
+        Return these limits overridden by the limits set in `other`.
+        """
+        if other is None:
+            return self
+        return self.model_copy(update=other.model_dump(exclude_none=True))
@@ -0,0 +1,132 @@
+# import libs
+from typing import (
+    Any,
+    List,
+    Literal,
+    Optional,
+    Union
+)
+from pydantic import BaseModel, Field
+
+
+class ColumnMapping(BaseModel):
+    """
+    Model for the mapping of a pasted column header to a column of the YAML table.
+    """
+    column: str = Field(
+        ..., description="Descriptive column name, hyphenated (e.g., Critical-Temperature)"
+    )
+    symbol: str = Field(
+        ..., description="Symbol of the property, from THERMODYNAMIC_SYMBOLS or a short CamelCase fallback"
+    )
+    unit: Optional[str] = Field(
+        None, description="Unit of the values of the column, None if dimensionless"
+    )
+
+
+class TableIssue(BaseModel):
+    """
+    Model for a problem found while validating a YAML table.
+    """
+    code: str = Field(
+        ..., description="Kind of problem (e.g., row_width, not_numeric, state)"
+    )
+    message: str = Field(..., description="Description of the problem")
+    severity: Literal["error", "warning"] = Field(
+        "error", description="Errors make the table invalid, warnings do not"
+    )
+    column: Optional[str] = Field(
+        None, description="Column of the problem, None if it concerns the table"
+    )
+    rows: List[int] = Field(
+        default_factory=list, description="Indices (from 0) of the VALUES rows concerned"
+    )
+
+
+class TableStructure(BaseModel):
+    """
+    Model for the STRUCTURE section of a YAML table.
+    """
+    columns: List[Any] = Field(default_factory=list, description="STRUCTURE.COLUMNS")
+    symbol: List[Any] = Field(default_factory=list, description="STRUCTURE.SYMBOL")
+    unit: List[Any] = Field(default_factory=list, description="STRUCTURE.UNIT")
+    conversion: Optional[List[Any]] = Field(
+        None, description="STRUCTURE.CONVERSION, data tables only"
+    )
+
+
+class EquationBody(BaseModel):
+    """
+    Model for an equation of the EQUATIONS section of a YAML table.
+    """
+    name: str = Field(..., description="Key of the equation (e.g., EQ-1)")
+    body: List[str] = Field(
+        default_factory=list, description="Lines of BODY, the last one assigning res[...]"
+    )
+    body_integral: Optional[List[str]] = Field(None, description="BODY-INTEGRAL")
+    body_first_derivative: Optional[List[str]] = Field(
+        None, description="BODY-FIRST-DERIVATIVE"
+    )
+    body_second_derivative: Optional[List[str]] = Field(
+        None, description="BODY-SECOND-DERIVATIVE"
+    )
+
+
+class CheckPoint(BaseModel):
+    """
+    Model for an equation evaluated at a check point of a row (e.g., VaPr(Tmin)).
+    """
+    column: str = Field(..., description="Column of the expected value (e.g., VaPr(Tmin))")
+    argument: str = Field(..., description="Column of the argument (e.g., Tmin)")
+    at: Optional[float] = Field(None, description="Value of the argument")
+    expected: Optional[float] = Field(None, description="Value of the column")
+    computed: Optional[float] = Field(
+        None, description="Value computed by the equation, None if not finite"
+    )
+    relative_error: Optional[float] = Field(
+        None, description="|computed - expected| / |expected|, None if not computed"
+    )
+    passed: bool = Field(True, description="Whether the error is within the tolerance")
+
+
+class RowCheck(BaseModel):
+    """
+    Model for the self-check of the equation of a VALUES row at its check points.
+    """
+    row: int = Field(..., description="Index (from 0) of the VALUES row")
+    name: Optional[str] = Field(None, description="Name of the component")
+    equation: Optional[int] = Field(None, description="Eq index of the row")
+    points: List[CheckPoint] = Field(default_factory=list, description="Check points")
+    max_relative_error: Optional[float] = Field(
+        None, description="Largest relative error of the computed points"
+    )
+    passed: bool = Field(True, description="Whether every check point passed")
+
+
+class ThermoTable(BaseModel):
+    """
+    Model for a data or equation table parsed from the YAML answer of an agent.
+    """
+    name: Optional[str] = Field(
+        None, description="Key of the table (e.g., Vapor-Pressure), None for top-level tables"
+    )
+    kind: Literal["data", "equations"] = Field(
+        "data", description="'equations' if the table has an EQUATIONS section"
+    )
+    table_id: Optional[Union[int, str]] = Field(None, description="TABLE-ID")
+    description: Optional[str] = Field(None, description="DESCRIPTION")
+    equations: List[EquationBody] = Field(
+        default_factory=list, description="EQUATIONS, in order"
+    )
+    structure: TableStructure = Field(
+        default_factory=TableStructure, description="STRUCTURE"
+    )
+    values: List[Any] = Field(default_factory=list, description="VALUES rows")
+    issues: List[TableIssue] = Field(
+        default_factory=list, description="Problems found by the validation"
+    )
+    valid: bool = Field(True, description="Whether the validation found no error")
+    checks: List[RowCheck] = Field(
+        default_factory=list,
+        description="Self-check of the equations of the rows at their check points"
+    )
@@ -0,0 +1,46 @@
+# import libs
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ThreadMetrics(BaseModel):
+    """
+    Model for per-thread queueing metrics of the chat endpoints.
+    """
+    thread_id: str = Field(..., description="Identifier for the chat thread")
+    queue_depth: int = Field(
+        0, description="Number of turns waiting for the thread"
+    )
+    running: bool = Field(
+        False, description="Whether a turn is currently running on the thread"
+    )
+    completed_turns: int = Field(
+        0, description="Number of turns completed on the thread"
+    )
+    last_wait_time: float = Field(
+        0.0, description="Wait time (in seconds) of the last turn"
+    )
+    max_wait_time: float = Field(
+        0.0, description="Maximum wait time (in seconds) of a turn"
+    )
+    total_wait_time: float = Field(
+        0.0, description="Total wait time (in seconds) of all turns"
+    )
+    last_activity: Optional[float] = Field(
+        None, description="Timestamp of the last lock acquisition or release"
+    )
+
+
+class ThreadForkRequest(BaseModel):
+    """
+    Model for forking a thread at a checkpoint into a new thread.
+    """
+    agent_selection: str = Field(
+        ..., description="Agent that owns the thread"
+    )
+    checkpoint_id: Optional[str] = Field(
+        None, description="Checkpoint to fork from, latest if not provided"
+    )
+    new_thread_id: Optional[str] = Field(
+        None, description="Identifier for the new thread, generated if not provided"
+    )
@@ -0,0 +1,77 @@
+from .units import (
+    PROPERTY_DIMENSIONS,
+    STANDARD_UNITS,
+    normalize_unit,
+    unit_conversion
+)
+from .converter import (
+    TableConversion,
+    convert_table,
+    extract_table,
+    map_header
+)
+from .validation import (
+    STATES,
+    KNOWN_SYMBOLS,
+    validate_table
+)
+from .parser import (
+    TableParseError,
+    extract_yaml_blocks,
+    parse_tables,
+    read_tables,
+    format_table
+)
+from .repair import (
+    TableRepair,
+    RepairStats,
+    repair_tables,
+    repair_prompt,
+    get_repair_stats
+)
+from .compiler import (
+    BodyCompileError,
+    CompiledBody,
+    TableEquations,
+    body_hash,
+    compile_body,
+    compile_table
+)
+from .checks import (
+    DEFAULT_CHECK_TOLERANCE,
+    check_columns,
+    check_table
+)
+
+__all__ = [
+    "PROPERTY_DIMENSIONS",
+    "STANDARD_UNITS",
+    "normalize_unit",
+    "unit_conversion",
+    "TableConversion",
+    "convert_table",
+    "extract_table",
+    "map_header",
+    "STATES",
+    "KNOWN_SYMBOLS",
+    "validate_table",
+    "TableParseError",
+    "extract_yaml_blocks",
+    "parse_tables",
+    "read_tables",
+    "format_table",
+    "TableRepair",
+    "RepairStats",
+    "repair_tables",
+    "repair_prompt",
+    "get_repair_stats",
+    "BodyCompileError",
+    "CompiledBody",
+    "TableEquations",
+    "body_hash",
+    "compile_body",
+    "compile_table",
+    "DEFAULT_CHECK_TOLERANCE",
+    "check_columns",
+    "check_table",
+]
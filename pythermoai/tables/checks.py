@@ -0,0 +1,171 @@
+# import libs
+import logging
+import re
+from typing import (
+    Dict,
+    List,
+    Tuple
+)
+import numpy as np
+# local
+from ..models import CheckPoint, RowCheck, TableIssue, ThermoTable
+from .compiler import BodyCompileError, TableEquations, float_column
+from .validation import EQ_COLUMN
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: largest relative error of a check point, by default
+DEFAULT_CHECK_TOLERANCE = 0.05
+
+# NOTE: check columns, `<result>(<argument column>)`, e.g. VaPr(Tmin)
+_CHECK_COLUMN = re.compile(r"^\s*([^()\s]+)\s*\(\s*([^()\s]+)\s*\)\s*$")
+
+
+def check_columns(table: ThermoTable) -> List[Tuple[int, int, str]]:
+    '''
+    Return the check columns of an equation table, as (column, argument column,
+    result symbol): `VaPr(Tmin)` is the value of VaPr at the Tmin of the row.
+    '''
+    columns = [str(column) for column in table.structure.columns]
+    symbols = table.structure.symbol
+    last = len(columns) - 1 if columns[-1:] == [EQ_COLUMN] else len(columns)
+    found = []
+    for index in range(4, last):
+        match = _CHECK_COLUMN.match(columns[index])
+        if not match or match.group(2) not in columns[4:last]:
+            continue
+        symbol = symbols[index] if index < len(symbols) and symbols[index] else match.group(1)
+        found.append((index, columns.index(match.group(2), 4), str(symbol)))
+    return found
+
+
+def _argument_symbol(equations: TableEquations, argument: str) -> str:
+    '''
+    Return the symbol of the body argument of an argument column: Tmin is T.
+    '''
+    symbols = {symbol for compiled in equations.equations.values() for symbol in compiled.args}
+    matches = [symbol for symbol in symbols if argument.startswith(symbol)]
+    return max(matches, key=len) if matches else argument
+
+
+def check_table(
+    table: ThermoTable,
+    tolerance: float = DEFAULT_CHECK_TOLERANCE
+) -> ThermoTable:
+    '''
+    Check that the equations of an equation table reproduce the check points of its
+    own rows, e.g. VaPr(Tmin) and VaPr(Tmax) at Tmin and Tmax.
+
+    The equations are compiled (`compile_table`) and every row is evaluated at all its
+    check points in one vectorized pass. Rows whose relative error exceeds the
+    tolerance, or whose equation does not give a finite value, are reported by a
+    `self_check` error, one per check column, and the diagnostics of every row are
+    set in `checks`. Only valid equation tables whose equations take one argument are
+    checked; points with a null argument or expected value are skipped.
+
+    Parameters
+    ----------
+    table : ThermoTable
+        The table, validated by `validate_table`.
+    tolerance : float, optional
+        Largest relative error of a check point, by default 0.05.
+
+    Returns
+    -------
+    ThermoTable
+        The same table, with `checks` set and, when a row fails, the `self_check`
+        issues added and `valid` False.
+    '''
+    table.checks = []
+    table.issues = [issue for issue in table.issues if issue.code != "self_check"]
+    if table.kind != "equations" or not table.valid or not table.values:
+        return table
+    points = check_columns(table)
+    if not points:
+        return table
+
+    try:
+        equations = TableEquations(table)
+    except BodyCompileError as e:
+        table.issues.append(TableIssue(
+            code="self_check", message=f"Equations not checked: {e}", severity="warning"))
+        return table
+    if not equations.equations or any(
+            len(compiled.args) != 1 for compiled in equations.equations.values()):
+        return table
+
+    # SECTION: arguments and expected values, (rows, points)
+    columns: Dict[int, np.ndarray] = {}
+    for index in {i for point in points for i in point[:2]}:
+        columns[index] = float_column(table.values, index)
+    at = np.stack([columns[argument] for _, argument, _ in points], axis=1)
+    expected = np.stack([columns[column] for column, _, _ in points], axis=1)
+
+    # SECTION: one pass over every row and point
+    names = table.structure.columns
+    arguments: Dict[str, List[int]] = {}
+    for j, (_, argument, _) in enumerate(points):
+        arguments.setdefault(_argument_symbol(equations, str(names[argument])), []).append(j)
+    computed = np.full(at.shape, np.nan)
+    for symbol, js in arguments.items():
+        try:
+            results = equations.evaluate({symbol: at[:, js]}, per_row=True)
+        except (KeyError, ValueError, ArithmeticError) as e:
+            table.issues.append(TableIssue(
+                code="self_check", message=f"Equations not checked: {e}",
+                severity="warning"))
+            return table
+        for k, j in enumerate(js):
+            if points[j][2] in results:
+                computed[:, j] = results[points[j][2]][:, k]
+
+    # NOTE: relative to the expected value, absolute when it is 0
+    with np.errstate(all="ignore"):
+        scale = np.where(expected == 0, 1.0, np.abs(expected))
+        error = np.abs(computed - expected) / scale
+    skipped = np.isnan(at) | np.isnan(expected)
+    finite = np.isfinite(computed)
+    failed = ~skipped & (~finite | (error > tolerance))
+
+    # SECTION: diagnostics
+    eq = float_column(table.values, len(names) - 1)
+    errors = np.where(~skipped & finite, error, np.nan)
+    for i, row in enumerate(table.values):
+        row_points = [
+            CheckPoint(
+                column=str(names[column]),
+                argument=str(names[argument]),
+                at=None if np.isnan(at[i, j]) else float(at[i, j]),
+                expected=None if np.isnan(expected[i, j]) else float(expected[i, j]),
+                computed=float(computed[i, j]) if finite[i, j] else None,
+                relative_error=None if np.isnan(errors[i, j]) else float(errors[i, j]),
+                passed=not failed[i, j],
+            )
+            for j, (column, argument, _) in enumerate(points)
+            if not skipped[i, j]
+        ]
+        row_errors = errors[i][~np.isnan(errors[i])]
+        table.checks.append(RowCheck(
+            row=i,
+            name=str(row[1]),
+            equation=None if np.isnan(eq[i]) else int(eq[i]),
+            points=row_points,
+            max_relative_error=float(row_errors.max()) if row_errors.size else None,
+            passed=not failed[i].any(),
+        ))
+
+    for j in np.flatnonzero(failed.any(axis=0)):
+        column = str(names[points[j][0]])
+        table.issues.append(TableIssue(
+            code="self_check",
+            message=(
+                f"{column} computed by the equation at {names[points[j][1]]} differs "
+                f"from VALUES by more than {tolerance:.0%}"),
+            column=column,
+            rows=[int(row) for row in np.flatnonzero(failed[:, j])],
+        ))
+    if failed.any():
+        table.valid = False
+        logger.info(f"Self-check failed for {int(failed.any(axis=1).sum())} rows")
+    return table
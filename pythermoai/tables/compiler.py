@@ -0,0 +1,523 @@
+# import libs
+import ast
+import hashlib
+import logging
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple
+)
+import numpy as np
+# local
+from ..models import ThermoTable
+from .validation import EQ_NUMBER, EQ_COLUMN, reference_symbol
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: compiled bodies kept, by BODY hash
+BODY_CACHE_SIZE = 256
+
+# NOTE: functions of BODY, by the name written after `math.`, `np.` or bare
+FUNCTIONS: Dict[str, Callable] = {
+    "exp": np.exp,
+    "expm1": np.expm1,
+    "log": np.log,
+    "log10": np.log10,
+    "log2": np.log2,
+    "log1p": np.log1p,
+    "sqrt": np.sqrt,
+    "pow": np.power,
+    "power": np.power,
+    "abs": np.abs,
+    "fabs": np.abs,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "arcsin": np.arcsin,
+    "arccos": np.arccos,
+    "arctan": np.arctan,
+    "sinh": np.sinh,
+    "cosh": np.cosh,
+    "tanh": np.tanh,
+}
+
+# NOTE: constants of BODY
+CONSTANTS: Dict[str, float] = {"pi": float(np.pi), "e": float(np.e)}
+
+# NOTE: modules the functions and constants may be written with
+_MODULES = {"math", "np", "numpy"}
+
+# NOTE: containers of BODY
+_ARGS, _PARMS, _RES = "args", "parms", "res"
+
+# NOTE: operators of BODY
+_OPERATORS = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.FloorDiv, ast.Mod,
+    ast.USub, ast.UAdd,
+)
+
+# NOTE: the bodies of an equation
+BODY_KINDS = ("body", "body_integral", "body_first_derivative", "body_second_derivative")
+
+
+class BodyCompileError(ValueError):
+    '''
+    Raised when a BODY is not valid Python or uses anything outside the whitelist.
+    '''
+
+
+def body_source(body: Sequence[str]) -> str:
+    '''
+    Return the source of a BODY, one statement per line.
+    '''
+    return "\n".join(line.strip() for line in body if line and line.strip())
+
+
+def body_hash(body: Sequence[str]) -> str:
+    '''
+    Return the hash of a BODY, the key of its compiled code.
+    '''
+    return hashlib.sha256(body_source(body).encode("utf-8")).hexdigest()
+
+
+class _BodyTransformer(ast.NodeTransformer):
+    '''
+    Check the nodes of a BODY against the whitelist and rewrite its references:
+    `args[...]`, `parms[...]` and `res[...]` become local names, `math.<f>` the NumPy
+    function of `FUNCTIONS`.
+    '''
+
+    def __init__(self):
+        self.args: Dict[str, str] = {}
+        self.parms: Dict[str, str] = {}
+        self.results: Dict[str, str] = {}
+        self.assigned: set = set()
+        # NOTE: numbers, as float64 globals of the function
+        self.constants: Dict[float, str] = {}
+
+    def _constant(self, value: float, node: ast.AST) -> ast.AST:
+        # NOTE: Python ints and floats would make `9**9**9**9` run for ever, or `1/0`
+        # raise; float64 overflows to inf
+        if value not in self.constants:
+            self.constants[value] = f"_k{len(self.constants)}"
+        return ast.copy_location(ast.Name(id=self.constants[value], ctx=ast.Load()), node)
+
+    def _reference(self, node: ast.Subscript) -> Tuple[str, str]:
+        if not isinstance(node.value, ast.Name) or node.value.id not in (_ARGS, _PARMS, _RES):
+            raise BodyCompileError("Only args[...], parms[...] and res[...] can be indexed")
+        if not isinstance(node.slice, ast.Constant) or not isinstance(node.slice.value, str):
+            raise BodyCompileError(f"{node.value.id}[...] needs a quoted key")
+        return node.value.id, node.slice.value
+
+    def _name(self, container: str, key: str) -> str:
+        names = {_ARGS: self.args, _PARMS: self.parms, _RES: self.results}[container]
+        if key not in names:
+            names[key] = f"_{container[0]}{len(names)}"
+        return names[key]
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        allowed = (
+            ast.Module, ast.Assign, ast.BinOp, ast.UnaryOp, ast.Load, ast.Store,
+        ) + _OPERATORS
+        if not isinstance(node, allowed):
+            raise BodyCompileError(f"{type(node).__name__} is not allowed in BODY")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise BodyCompileError(f"Constant {node.value!r} is not allowed in BODY")
+        try:
+            return self._constant(float(node.value), node)
+        except OverflowError as e:
+            raise BodyCompileError("Constant too large in BODY") from e
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        container, key = self._reference(node)
+        if isinstance(node.ctx, ast.Store):
+            if container != _RES:
+                raise BodyCompileError(f"Only res[...] can be assigned, not {container}[...]")
+            name = self._name(container, key)
+            self.assigned.add(name)
+            return ast.copy_location(ast.Name(id=name, ctx=ast.Store()), node)
+        if container == _RES and key not in self.results:
+            raise BodyCompileError(f"res['{key}'] is read before it is assigned")
+        return ast.copy_location(
+            ast.Name(id=self._name(container, key), ctx=ast.Load()), node)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        # NOTE: intermediate variables, and bare functions and constants
+        if isinstance(node.ctx, ast.Store):
+            if node.id.startswith("_") or node.id in (_ARGS, _PARMS, _RES):
+                raise BodyCompileError(f"{node.id} cannot be assigned")
+            self.assigned.add(node.id)
+            return node
+        if node.id in self.assigned:
+            return node
+        if node.id in CONSTANTS:
+            return self._constant(CONSTANTS[node.id], node)
+        raise BodyCompileError(f"Unknown name {node.id} in BODY")
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if not isinstance(node.value, ast.Name) or node.value.id not in _MODULES:
+            raise BodyCompileError("Only math.<function> attributes are allowed in BODY")
+        if node.attr in CONSTANTS:
+            return self._constant(CONSTANTS[node.attr], node)
+        raise BodyCompileError(f"{node.value.id}.{node.attr} is not allowed in BODY")
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        function = node.func
+        if isinstance(function, ast.Attribute) and isinstance(function.value, ast.Name) \
+                and function.value.id in _MODULES:
+            name = function.attr
+        elif isinstance(function, ast.Name):
+            name = function.id
+        else:
+            name = None
+        if name not in FUNCTIONS:
+            raise BodyCompileError(f"Function {ast.unparse(function)} is not allowed in BODY")
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise BodyCompileError(f"{name}() takes positional arguments only")
+        return ast.copy_location(ast.Call(
+            func=ast.Name(id=f"_f_{name}", ctx=ast.Load()),
+            args=[self.visit(arg) for arg in node.args],
+            keywords=[]
+        ), node)
+
+    def visit_Assign(self, node: ast.Assign) -> ast.AST:
+        if len(node.targets) != 1:
+            raise BodyCompileError("Chained assignments are not allowed in BODY")
+        # NOTE: the value first, so `x = x + 1` reads x before it is assigned
+        node.value = self.visit(node.value)
+        node.targets = [self.visit(node.targets[0])]
+        return node
+
+
+class CompiledBody:
+    '''
+    A BODY compiled to a vectorized function of NumPy arrays.
+
+    The function takes the arrays of the arguments and of the parameters, keyed by
+    symbol (`T`, `C1`, ...), and returns the arrays of the results keyed by symbol.
+    Arrays broadcast against each other, so one call evaluates every point for every
+    component.
+    '''
+
+    def __init__(
+        self,
+        digest: str,
+        source: str,
+        function: Callable[..., Tuple[Any, ...]],
+        args: Dict[str, str],
+        parms: Dict[str, str],
+        results: Dict[str, str]
+    ):
+        # NOTE: set attributes
+        self.digest = digest
+        self.source = source
+        self.function = function
+        # NOTE: keys as written in BODY, e.g. "temperature | T | K"
+        self.arg_keys = list(args)
+        self.parm_keys = list(parms)
+        self.result_keys = list(results)
+
+    @property
+    def args(self) -> List[str]:
+        return [reference_symbol(key) for key in self.arg_keys]
+
+    @property
+    def parms(self) -> List[str]:
+        return [reference_symbol(key) for key in self.parm_keys]
+
+    @property
+    def results(self) -> List[str]:
+        return [reference_symbol(key) for key in self.result_keys]
+
+    def __call__(
+        self,
+        args: Dict[str, Any],
+        parms: Dict[str, Any]
+    ) -> Dict[str, np.ndarray]:
+        '''
+        Evaluate the body.
+
+        Parameters
+        ----------
+        args : Dict[str, ArrayLike]
+            Arguments, keyed by symbol or by their key in BODY.
+        parms : Dict[str, ArrayLike]
+            Parameters and constants, keyed by symbol or by their key in BODY.
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            Results, keyed by symbol.
+        '''
+        def _pick(values: Dict[str, Any], keys: List[str], kind: str) -> List[Any]:
+            picked = []
+            for key in keys:
+                symbol = reference_symbol(key)
+                if key in values:
+                    picked.append(values[key])
+                elif symbol in values:
+                    picked.append(values[symbol])
+                else:
+                    raise KeyError(f"Missing {kind} {symbol}")
+            return picked
+
+        inputs = _pick(args, self.arg_keys, "argument") + \
+            _pick(parms, self.parm_keys, "parameter")
+        with np.errstate(all="ignore"):
+            outputs = self.function(*inputs)
+        return {
+            symbol: np.asarray(output, dtype=np.float64)
+            for symbol, output in zip(self.results, outputs)
+        }
+
+
+@lru_cache(maxsize=BODY_CACHE_SIZE)
+def _compile_source(digest: str, source: str) -> CompiledBody:
+    try:
+        tree = ast.parse(source, mode="exec")
+    except SyntaxError as e:
+        raise BodyCompileError(f"BODY is not valid Python: {e.msg} (line {e.lineno})") from e
+    if not tree.body or not all(isinstance(statement, ast.Assign) for statement in tree.body):
+        raise BodyCompileError("BODY must be assignments only")
+
+    transformer = _BodyTransformer()
+    tree = transformer.visit(tree)
+    if not transformer.results:
+        raise BodyCompileError("BODY does not assign res[...]")
+
+    # SECTION: def _body(<args>, <parms>): <statements>; return (<results>)
+    parameters = list(transformer.args.values()) + list(transformer.parms.values())
+    function = ast.FunctionDef(
+        name="_body",
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(arg=name) for name in parameters],
+            kwonlyargs=[], kw_defaults=[], defaults=[]
+        ),
+        body=tree.body + [ast.Return(value=ast.Tuple(
+            elts=[ast.Name(id=name, ctx=ast.Load()) for name in transformer.results.values()],
+            ctx=ast.Load()
+        ))],
+        decorator_list=[],
+        returns=None,
+        type_params=[]
+    )
+    module = ast.fix_missing_locations(ast.Module(body=[function], type_ignores=[]))
+    namespace: Dict[str, Any] = {"__builtins__": {}}
+    namespace.update({f"_f_{name}": fn for name, fn in FUNCTIONS.items()})
+    namespace.update({name: np.float64(value) for value, name in transformer.constants.items()})
+    exec(compile(module, f"<BODY {digest[:12]}>", "exec"), namespace)
+    return CompiledBody(
+        digest=digest,
+        source=source,
+        function=namespace["_body"],
+        args=transformer.args,
+        parms=transformer.parms,
+        results=transformer.results,
+    )
+
+
+def compile_body(body: Sequence[str]) -> CompiledBody:
+    '''
+    Compile a BODY into a vectorized NumPy function.
+
+    Only assignments of arithmetic on numbers, `args[...]`, `parms[...]`, `res[...]`,
+    intermediate variables, the functions of `FUNCTIONS` (written bare, `math.` or
+    `np.`) and `pi`/`e` are allowed; anything else raises before the code is built.
+    Compiled bodies are cached by the hash of their source.
+
+    Parameters
+    ----------
+    body : Sequence[str]
+        The lines of BODY, as in `EquationBody.body`.
+
+    Returns
+    -------
+    CompiledBody
+        The compiled body.
+
+    Raises
+    ------
+    BodyCompileError
+        If the body is not valid Python or uses anything outside the whitelist.
+    '''
+    source = body_source(body)
+    return _compile_source(hashlib.sha256(source.encode("utf-8")).hexdigest(), source)
+
+
+def float_column(values: List[Any], index: int) -> np.ndarray:
+    '''
+    Return a column of VALUES as a float array, null and text cells as NaN.
+    '''
+    return np.fromiter(
+        (
+            cell if isinstance(cell, (int, float)) and not isinstance(cell, bool)
+            else np.nan
+            for cell in (row[index] for row in values)
+        ),
+        dtype=np.float64, count=len(values))
+
+
+def parameter_column(table: ThermoTable, key: str) -> Optional[int]:
+    '''
+    Return the index of the column of a `parms[...]` key: the column of that name,
+    else the first parameter or constant column with that symbol.
+    '''
+    structure = table.structure
+    symbol = reference_symbol(key)
+    last = len(structure.columns) - 1 if structure.columns[-1:] == [EQ_COLUMN] \
+        else len(structure.columns)
+    for candidates in (structure.columns, structure.symbol):
+        for index in range(4, last):
+            if index < len(candidates) and str(candidates[index]) in (key, symbol):
+                return index
+    return None
+
+
+class TableEquations:
+    '''
+    The equations of a table, compiled, with the parameters of its rows as arrays.
+
+    Rows are grouped by their Eq index and each group is evaluated by one call of its
+    compiled body, so a whole temperature array is evaluated for every component at
+    once.
+    '''
+
+    def __init__(self, table: ThermoTable, kind: str = "body"):
+        if kind not in BODY_KINDS:
+            raise ValueError(f"kind must be one of {', '.join(BODY_KINDS)}")
+        # NOTE: set attributes
+        self.table = table
+        self.kind = kind
+        self.names = [str(row[1]) for row in table.values]
+        self.rows = len(table.values)
+
+        # SECTION: compiled equations, by Eq index
+        self.equations: Dict[int, CompiledBody] = {}
+        for position, equation in enumerate(table.equations, start=1):
+            body = getattr(equation, kind)
+            if body:
+                # NOTE: EQ-<k> is equation k, else equations count from 1
+                match = EQ_NUMBER.search(equation.name)
+                self.equations[int(match.group(1)) if match else position] = \
+                    compile_body(body)
+
+        # SECTION: parameter arrays and row groups
+        columns: Dict[int, np.ndarray] = {}
+        self.parameters: Dict[int, Dict[str, np.ndarray]] = {}
+        self.groups: Dict[int, np.ndarray] = {}
+        eq = float_column(table.values, len(table.structure.columns) - 1) \
+            if self.rows else np.zeros(0)
+        for index, compiled in self.equations.items():
+            rows = np.flatnonzero(eq == index)
+            if len(self.equations) == 1:
+                rows = np.arange(self.rows)
+            self.groups[index] = rows
+            parameters = {}
+            for key in compiled.parm_keys:
+                column = parameter_column(table, key)
+                if column is None:
+                    raise BodyCompileError(f"parms['{key}'] is not a column of the table")
+                if column not in columns:
+                    columns[column] = float_column(table.values, column)
+                parameters[key] = columns[column][rows]
+            self.parameters[index] = parameters
+
+    @property
+    def results(self) -> List[str]:
+        return list(dict.fromkeys(
+            symbol for compiled in self.equations.values() for symbol in compiled.results))
+
+    def evaluate(
+        self,
+        args: Dict[str, Any],
+        per_row: bool = False
+    ) -> Dict[str, np.ndarray]:
+        '''
+        Evaluate the equations of every row.
+
+        Parameters
+        ----------
+        args : Dict[str, ArrayLike]
+            Arguments keyed by symbol (e.g. `{"T": temperatures}`).
+        per_row : bool, optional
+            False (default): the arguments are shared by every row and the results have
+            the shape (rows, *argument shape). True: the first axis of the arguments is
+            the row, e.g. each row at its own bounds, and the results have the shape of
+            the arguments.
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            Results keyed by symbol, NaN for the rows of other equations.
+        '''
+        arrays = {key: np.asarray(value, dtype=np.float64) for key, value in args.items()}
+        shape = np.broadcast_shapes(*(array.shape for array in arrays.values())) \
+            if arrays else ()
+        if per_row:
+            if not shape or shape[0] != self.rows:
+                raise ValueError(f"per_row arguments need a first axis of {self.rows} rows")
+            out_shape = shape
+        else:
+            out_shape = (self.rows,) + shape
+        extra = len(out_shape) - 1
+
+        results: Dict[str, np.ndarray] = {}
+        for index, compiled in self.equations.items():
+            rows = self.groups[index]
+            if not rows.size:
+                continue
+            parms = {
+                key: values.reshape((-1,) + (1,) * extra)
+                for key, values in self.parameters[index].items()
+            }
+            group_args = {
+                key: np.broadcast_to(value, shape)[rows] if per_row else value
+                for key, value in arrays.items()
+            }
+            for symbol, values in compiled(group_args, parms).items():
+                if symbol not in results:
+                    results[symbol] = np.full(out_shape, np.nan)
+                if len(self.groups) == 1 and rows.size == self.rows:
+                    results[symbol] = np.broadcast_to(values, out_shape).copy() \
+                        if values.shape != out_shape else values
+                else:
+                    results[symbol][rows] = values
+        return results
+
+
+def compile_table(table: ThermoTable, kind: str = "body") -> TableEquations:
+    '''
+    Compile the equations of an equation table, see `TableEquations`.
+
+    Parameters
+    ----------
+    table : ThermoTable
+        An equation table, as parsed by `parse_tables`.
+    kind : str, optional
+        The body to compile: "body" (default), "body_integral",
+        "body_first_derivative" or "body_second_derivative".
+
+    Returns
+    -------
+    TableEquations
+        The compiled equations and the parameters of the rows.
+
+    Raises
+    ------
+    BodyCompileError
+        If a body cannot be compiled or references a parameter the table lacks.
+    '''
+    return TableEquations(table, kind=kind)
@@ -0,0 +1,517 @@
+# import libs
+import csv
+import json
+import re
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+# local
+from ..agents.symbols import THERMODYNAMIC_SYMBOLS
+from ..models import ColumnMapping
+from .units import (
+    PROPERTY_DIMENSIONS,
+    STANDARD_UNITS,
+    unit_conversion
+)
+from .yaml_format import NULLS, flow_item, flow_value
+
+# NOTE: first four columns of every data table
+FIXED_COLUMNS = ["No.", "Name", "Formula", "State"]
+
+# NOTE: pasted headers of the fixed columns
+FIXED_HEADERS = {
+    "no": "No.",
+    "nr": "No.",
+    "number": "No.",
+    "index": "No.",
+    "id": "No.",
+    "name": "Name",
+    "component": "Name",
+    "compound": "Name",
+    "species": "Name",
+    "substance": "Name",
+    "chemical": "Name",
+    "formula": "Formula",
+    "chemical_formula": "Formula",
+    "molecular_formula": "Formula",
+    "state": "State",
+    "phase": "State",
+}
+
+# NOTE: common names of the properties of THERMODYNAMIC_SYMBOLS
+PROPERTY_ALIASES = {
+    "t": "temperature",
+    "p": "pressure",
+    "tc": "critical_temperature",
+    "pc": "critical_pressure",
+    "vc": "critical_molar_volume",
+    "zc": "critical_compressibility_factor",
+    "mw": "molecular_weight",
+    "m": "molecular_weight",
+    "molar_mass": "molecular_weight",
+    "molecular_mass": "molecular_weight",
+    "tb": "boiling_temperature",
+    "nbp": "boiling_temperature",
+    "boiling_point": "boiling_temperature",
+    "normal_boiling_point": "boiling_temperature",
+    "normal_boiling_temperature": "boiling_temperature",
+    "tm": "melting_temperature",
+    "tf": "melting_temperature",
+    "melting_point": "melting_temperature",
+    "freezing_point": "melting_temperature",
+    "omega": "acentric_factor",
+    "w": "acentric_factor",
+    "acentric": "acentric_factor",
+    "pvap": "vapor_pressure",
+    "psat": "vapor_pressure",
+    "vapour_pressure": "vapor_pressure",
+    "saturation_pressure": "vapor_pressure",
+    "hf": "enthalpy_of_formation",
+    "dhf": "enthalpy_of_formation",
+    "heat_of_formation": "enthalpy_of_formation",
+    "standard_enthalpy_of_formation": "enthalpy_of_formation",
+    "gf": "Gibbs_energy_of_formation",
+    "dgf": "Gibbs_energy_of_formation",
+    "gibbs_free_energy_of_formation": "Gibbs_energy_of_formation",
+    "standard_gibbs_energy_of_formation": "Gibbs_energy_of_formation",
+    "hvap": "enthalpy_of_vaporization",
+    "dhvap": "enthalpy_of_vaporization",
+    "heat_of_vaporization": "enthalpy_of_vaporization",
+    "enthalpy_of_vaporisation": "enthalpy_of_vaporization",
+    "hfus": "enthalpy_of_fusion",
+    "dhfus": "enthalpy_of_fusion",
+    "heat_of_fusion": "enthalpy_of_fusion",
+    "heat_of_combustion": "standard_net_enthalpies_of_combustion",
+    "enthalpy_of_combustion": "standard_net_enthalpies_of_combustion",
+    "liquid_heat_capacity": "liquid_heat_capacity_at_constant_pressure",
+    "ideal_gas_heat_capacity": "ideal_gas_heat_capacity_at_constant_pressure",
+}
+
+# NOTE: words kept in lower case in column names
+_SMALL_WORDS = {"of", "at", "and", "in"}
+
+# NOTE: states at reference conditions
+_STATES = {
+    "g": "g", "gas": "g", "vapor": "g", "vapour": "g", "v": "g",
+    "l": "l", "liquid": "l", "liq": "l",
+    "s": "s", "solid": "s", "cr": "s", "crystal": "s", "c": "s",
+}
+
+_HEADER_UNIT = (
+    re.compile(r"^(.*?)\s*[\(\[]\s*([^\)\]]*?)\s*[\)\]]\s*$"),
+    re.compile(r"^(.*?)\s+/\s*(\S.*)$"),
+    re.compile(r"^(.*?),\s*(\S.*)$"),
+)
+_CELL = re.compile(
+    r"^([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)"
+    r"(?:\s*(?:x|×|\*)\s*10\^?\(?([-+]?\d+)\)?)?"
+    r"(?:\s*±\s*\S+)?\s*(.*)$"
+)
+_THOUSANDS = re.compile(r"^[-+]?\d{1,3}(?:,\d{3})+(?:\.\d+)?$")
+_WORD = re.compile(r"[a-z0-9]+")
+_DELIMITERS = ("|", "\t", ";", ",")
+
+
+def _key(name: str) -> str:
+    return "_".join(_WORD.findall(name.lower().replace("vapour", "vapor")))
+
+
+# SECTION: header lookup, built once
+_PROPERTY_INDEX: Dict[str, str] = {}
+for _name, _symbol in THERMODYNAMIC_SYMBOLS.items():
+    _PROPERTY_INDEX[_key(_name)] = _name
+    _PROPERTY_INDEX[_key(_symbol)] = _name
+for _alias, _name in PROPERTY_ALIASES.items():
+    _PROPERTY_INDEX.setdefault(_alias, _name)
+
+
+def column_name(property_name: str) -> str:
+    '''
+    Return the descriptive column name of a property, e.g. `Critical-Temperature`.
+    '''
+    words = property_name.split("_")
+    return "-".join(
+        word if word in _SMALL_WORDS or word[:1].isupper() else word.capitalize()
+        for word in words
+    )
+
+
+def split_header(header: str) -> Tuple[str, Optional[str]]:
+    '''
+    Split a pasted header into its name and unit: `Tc (K)`, `Tc [K]`, `Tc / K` and
+    `Tc, K` all give ("Tc", "K").
+    '''
+    header = header.strip()
+    for pattern in _HEADER_UNIT:
+        match = pattern.match(header)
+        if match and match.group(1).strip():
+            return match.group(1).strip(), match.group(2).strip() or None
+    return header, None
+
+
+def map_header(header: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    '''
+    Map a pasted header to a fixed column or a property of THERMODYNAMIC_SYMBOLS.
+
+    Returns
+    -------
+    tuple
+        The fixed column name (or None), the property name (or None) and the unit of
+        the header (or None).
+    '''
+    name, unit = split_header(header)
+    key = _key(name)
+    if key in FIXED_HEADERS and unit is None:
+        return FIXED_HEADERS[key], None, None
+    # NOTE: the whole header may be a name, e.g. "Molecular Weight, g/mol" vs "No."
+    return None, _PROPERTY_INDEX.get(key) or _PROPERTY_INDEX.get(_key(header)), unit
+
+
+def parse_cell(cell: str) -> Tuple[Optional[float], Optional[str]]:
+    '''
+    Parse a numeric cell into its value and the unit written after it, if any.
+
+    Returns
+    -------
+    tuple
+        The value (None for an empty or non-numeric cell) and the unit (or None).
+    '''
+    text = cell.strip().strip('"').replace("−", "-").replace(" ", "")
+    if text.lower() in NULLS:
+        return None, None
+    if _THOUSANDS.match(text):
+        text = text.replace(",", "")
+    match = _CELL.match(text)
+    if not match:
+        return None, None
+    value = float(match.group(1))
+    if match.group(2):
+        value *= 10.0 ** int(match.group(2))
+    return value, match.group(3).strip() or None
+
+
+def parse_state(cell: str) -> Optional[str]:
+    '''
+    Return "g", "l" or "s" for a pasted state or phase, None if unknown.
+    '''
+    return _STATES.get(cell.strip().strip("()").lower())
+
+
+def _split(line: str, delimiter: str) -> List[str]:
+    if delimiter == "|":
+        return [cell.strip() for cell in line.strip().strip("|").split("|")]
+    return [cell.strip() for cell in next(csv.reader([line], delimiter=delimiter))]
+
+
+def extract_table(text: str) -> Optional[Tuple[List[str], List[List[str]], List[str]]]:
+    '''
+    Extract the largest CSV, TSV or Markdown table of a text.
+
+    Returns
+    -------
+    tuple | None
+        The header cells, the rows of cells and the other lines of the text, or None
+        if there is no table (a header and at least one row with a number).
+    '''
+    lines = [line.strip() for line in text.strip().splitlines()]
+    best: Optional[Tuple[int, int, str]] = None
+    for delimiter in _DELIMITERS:
+        start, width = 0, 0
+        for index, line in enumerate(lines + [""]):
+            # NOTE: markdown separator rows belong to the table
+            if delimiter == "|" and width and line and set(line) <= set("|-: "):
+                continue
+            cells = len(_split(line, delimiter)) if delimiter in line else 0
+            if cells >= 2 and cells == width:
+                continue
+            rows = [
+                row for row in lines[start:index]
+                if not (delimiter == "|" and set(row) <= set("|-: "))
+            ]
+            if width >= 2 and len(rows) >= 2 and (best is None or len(rows) > best[1] - best[0]):
+                if any(re.search(r"\d", row) for row in rows[1:]):
+                    best = (start, index, delimiter)
+            start, width = index, cells
+    if best is None:
+        return None
+    start, end, delimiter = best
+    rows = [
+        _split(line, delimiter) for line in lines[start:end]
+        if not (delimiter == "|" and set(line) <= set("|-: "))
+    ]
+    prose = lines[:start] + lines[end:]
+    return rows[0], rows[1:], [line for line in prose if line]
+
+
+class TableConversion:
+    '''
+    A pasted table converted to the YAML table of the data agent.
+
+    `unmapped` lists the headers mapped neither to a fixed column nor to a known
+    property; they have no column until a mapping is given for them. `extra_requests`
+    lists the properties mentioned in the rest of the message that are not in the
+    table, which the converter cannot answer. `unresolved` lists the property columns
+    with a value of unknown unit, or without a unit; their values are not converted.
+    '''
+
+    def __init__(
+        self,
+        columns: List[str],
+        symbols: List[Optional[str]],
+        units: List[Optional[str]],
+        rows: List[List[Any]],
+        unmapped: List[str],
+        extra_requests: List[str],
+        warnings: List[str],
+        table_id: int = 1,
+        description: Optional[str] = None,
+        unresolved: Optional[List[str]] = None
+    ):
+        # NOTE: set attributes
+        self.columns = columns
+        self.symbols = symbols
+        self.units = units
+        self.rows = rows
+        self.unmapped = unmapped
+        self.extra_requests = extra_requests
+        self.warnings = warnings
+        self.unresolved = unresolved or []
+        self.table_id = table_id
+        self.description = description or self.describe()
+
+    @property
+    def complete(self) -> bool:
+        '''
+        Whether the conversion answers the request without the LLM.
+        '''
+        return not self.unmapped and not self.extra_requests and not self.unresolved
+
+    def describe(self) -> str:
+        properties = ", ".join(self.columns[len(FIXED_COLUMNS):]) or "Properties"
+        names = [str(row[1]) for row in self.rows if row[1]]
+        if len(names) > 3:
+            names = names[:3] + [f"{len(names) - 3} more"]
+        return f"{properties} of {', '.join(names)}" if names else properties
+
+    def to_yaml(self) -> str:
+        '''
+        Render the table in the YAML structure of `DATA_AGENT_PROMPT`.
+        '''
+        fixed = [None] * len(FIXED_COLUMNS)
+        structure = {
+            "COLUMNS": self.columns,
+            "SYMBOL": fixed + self.symbols[len(FIXED_COLUMNS):],
+            "UNIT": fixed + self.units[len(FIXED_COLUMNS):],
+            "CONVERSION": fixed + [1] * (len(self.columns) - len(FIXED_COLUMNS)),
+        }
+        lines = [
+            f"TABLE-ID: {self.table_id}",
+            "DESCRIPTION:",
+            f"  {json.dumps(self.description, ensure_ascii=False)}",
+            "DATA: []",
+            "STRUCTURE:",
+        ]
+        for key, items in structure.items():
+            lines.append(f"  {key}: [{', '.join(flow_item(item) for item in items)}]")
+        lines.append("VALUES:")
+        for row in self.rows:
+            lines.append(f"  - [{', '.join(flow_value(item) for item in row)}]")
+        return "\n".join(lines) + "\n"
+
+
+def _infer_state(tb: Optional[float], tm: Optional[float]) -> Optional[str]:
+    # NOTE: standard phase at 298.15 K from the normalized Tb and Tm
+    if tm is not None and tm > 298.15:
+        return "s"
+    if tb is not None and tb < 298.15:
+        return "g"
+    if tb is not None and tm is not None:
+        return "l"
+    return None
+
+
+def _mentioned_properties(prose: List[str]) -> List[str]:
+    text = " " + _key(" ".join(prose)).replace("_", " ") + " "
+    found = []
+    for name in THERMODYNAMIC_SYMBOLS:
+        words = " " + _key(name).replace("_", " ") + " "
+        if words in text:
+            found.append(name)
+    # NOTE: a longer name covers the names inside it (critical temperature, temperature)
+    return [
+        name for name in found
+        if not any(other != name and _key(name) in _key(other) for other in found)
+    ]
+
+
+def _conversion(dimension: str, unit: Optional[str]) -> Optional[Tuple[float, float]]:
+    '''
+    Return the (scale, offset) of a unit, None if it is unknown or missing: only
+    dimensionless values need no unit.
+    '''
+    if not unit:
+        return (1.0, 0.0) if dimension == "dimensionless" else None
+    return unit_conversion(dimension, unit)
+
+
+def convert_table(
+    text: str,
+    header_map: Optional[Dict[str, ColumnMapping]] = None,
+    table_id: int = 1,
+    description: Optional[str] = None
+) -> Optional[TableConversion]:
+    '''
+    Convert a CSV, TSV or Markdown table pasted in a message to the YAML table of the
+    data agent, without the LLM.
+
+    Headers are mapped to the fixed columns (No., Name, Formula, State) and to the
+    properties of THERMODYNAMIC_SYMBOLS by name, symbol or common alias. Values are
+    normalized to the standard unit of their property, taken from the header or the
+    cell, so every CONVERSION factor is 1. A column with a value of unknown unit, or
+    without a unit (dimensionless properties aside), is not converted and is listed in
+    `unresolved`. The State of a component without one is
+    inferred from its boiling and melting temperatures, when given.
+
+    Parameters
+    ----------
+    text : str
+        The message with the pasted table.
+    header_map : Dict[str, ColumnMapping], optional
+        Mappings of the headers the converter cannot map, e.g. given by the LLM.
+        Their values are kept as they are.
+    table_id : int, optional
+        The TABLE-ID, by default 1.
+    description : str, optional
+        The DESCRIPTION, by default built from the columns and the names.
+
+    Returns
+    -------
+    TableConversion | None
+        The converted table, or None if the text has no table.
+    '''
+    extracted = extract_table(text)
+    if extracted is None:
+        return None
+    headers, cells, prose = extracted
+    header_map = header_map or {}
+
+    # SECTION: map the headers
+    fixed_index: Dict[str, int] = {}
+    properties: List[Tuple[int, str, Optional[str], Optional[str], Optional[str]]] = []
+    unmapped: List[str] = []
+    unresolved: List[str] = []
+    warnings: List[str] = []
+    for index, header in enumerate(headers):
+        fixed, property_name, unit = map_header(header)
+        if fixed is not None and fixed not in fixed_index:
+            fixed_index[fixed] = index
+        elif property_name is not None:
+            # NOTE: (index, column, symbol, header unit, property)
+            properties.append((
+                index,
+                column_name(property_name),
+                THERMODYNAMIC_SYMBOLS[property_name],
+                unit,
+                property_name
+            ))
+        elif header in header_map:
+            mapping = header_map[header]
+            properties.append((index, mapping.column, mapping.symbol, mapping.unit, None))
+        else:
+            unmapped.append(header)
+
+    # NOTE: the first column names the components when no header says so
+    if "Name" not in fixed_index and cells:
+        first = [row[0] for row in cells if row]
+        if 0 not in fixed_index.values() and all(parse_cell(cell)[0] is None for cell in first):
+            fixed_index["Name"] = 0
+            unmapped = [header for header in unmapped if header != headers[0]]
+
+    # SECTION: convert the values
+    columns = list(FIXED_COLUMNS)
+    symbols: List[Optional[str]] = [None] * len(FIXED_COLUMNS)
+    units: List[Optional[str]] = [None] * len(FIXED_COLUMNS)
+    values: List[List[Any]] = [[] for _ in cells]
+    for index, column, symbol, header_unit, property_name in properties:
+        dimension = PROPERTY_DIMENSIONS.get(property_name or "")
+        parsed = [
+            parse_cell(row_cells[index]) if index < len(row_cells) else (None, None)
+            for row_cells in cells
+        ]
+        column_values = [value for value, _ in parsed]
+        unit = header_unit
+        if dimension:
+            # NOTE: the unit of each value, from the cell or the header
+            sources = {
+                cell_unit or header_unit for value, cell_unit in parsed if value is not None
+            }
+            conversions = {source: _conversion(dimension, source) for source in sources}
+            unknown = [source for source, factor in conversions.items() if factor is None]
+            if unknown:
+                # NOTE: nothing converted, a column never mixes units
+                unresolved.append(column)
+                if None in unknown:
+                    warnings.append(f"No unit for {column}")
+                for source in sorted(source for source in unknown if source):
+                    warnings.append(f"Unknown unit {source!r} of {column}")
+                unit = next(iter(sources)) if len(sources) == 1 else None
+            else:
+                unit = STANDARD_UNITS[dimension]
+                column_values = []
+                for value, cell_unit in parsed:
+                    if value is not None:
+                        scale, offset = conversions[cell_unit or header_unit]
+                        value = value * scale + offset
+                    column_values.append(value)
+        for row, value in zip(values, column_values):
+            row.append(value)
+        columns.append(column)
+        symbols.append(symbol)
+        units.append(unit)
+
+    # SECTION: fixed columns
+    def cell(row_cells: List[str], name: str) -> Optional[str]:
+        index = fixed_index.get(name)
+        if index is None or index >= len(row_cells):
+            return None
+        return row_cells[index].strip().strip('"') or None
+
+    property_names = [item[4] for item in properties]
+    rows: List[List[Any]] = []
+    for number, (row_cells, row_values) in enumerate(zip(cells, values), start=1):
+        state = cell(row_cells, "State")
+        state = parse_state(state) if state else None
+        if state is None:
+            tb = row_values[property_names.index("boiling_temperature")] \
+                if "boiling_temperature" in property_names else None
+            tm = row_values[property_names.index("melting_temperature")] \
+                if "melting_temperature" in property_names else None
+            state = _infer_state(tb, tm)
+        rows.append([
+            number,
+            cell(row_cells, "Name"),
+            cell(row_cells, "Formula"),
+            state,
+            *row_values
+        ])
+
+    # NOTE: properties asked for in the message but not pasted
+    extra_requests = [
+        name for name in _mentioned_properties(prose) if name not in property_names
+    ]
+    return TableConversion(
+        columns=columns,
+        symbols=symbols,
+        units=units,
+        rows=rows,
+        unmapped=unmapped,
+        extra_requests=extra_requests,
+        warnings=warnings,
+        unresolved=unresolved,
+        table_id=table_id,
+        description=description
+    )
@@ -0,0 +1,410 @@
+# import libs
+import json
+import logging
+import math
+import re
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+import yaml
+# local
+from ..models import EquationBody, TableStructure, ThermoTable
+from .yaml_format import flow_item, flow_value
+from .checks import check_table
+from .validation import validate_table
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: libyaml parser when available
+_BaseLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class TableLoader(_BaseLoader):  # type: ignore[misc, valid-type]
+    '''
+    Safe YAML loader reading exponents without a dot (`1e-5`, `2E+03`) as floats,
+    as YAML 1.2 does.
+    '''
+
+
+TableLoader.add_implicit_resolver(
+    "tag:yaml.org,2002:float",
+    re.compile(r"^[-+]?(?:\d[\d_]*)?(?:\.[\d_]*)?[eE][-+]?\d+$"),
+    list("-+0123456789.")
+)
+
+# NOTE: fenced YAML blocks of a markdown answer
+_YAML_FENCE = re.compile(r"```(?:ya?ml)?[ \t]*\n(.*?)```", re.DOTALL)
+
+# NOTE: first line of an unfenced table, `TABLE-ID:` or a table name key
+_TABLE_START = re.compile(r"^(?:TABLE-ID:|[A-Za-z][\w\- ()]*:\s*$)", re.MULTILINE)
+
+# NOTE: one-line flow rows of VALUES, read without the YAML parser
+_VALUES_KEY = re.compile(r"^(\s*)VALUES:\s*$")
+_FLOW_ROW = re.compile(r"^\s*-\s*\[(.*)\]\s*(?:#.*)?$")
+_COMMENT = re.compile(r"^\s*(?:#.*)?$")
+_CELL = re.compile(
+    r"""\s*(?:"((?:[^"\\]|\\.)*)"|'((?:[^']|'')*)'|([^,\[\]{}'"#]*?))\s*(,|$)""")
+_INT = re.compile(r"^[-+]?(?:0|[1-9][\d_]*)$")
+_FLOAT = re.compile(
+    r"^[-+]?(?:\d[\d_]*\.[\d_]*(?:[eE][-+]?\d+)?|\.\d[\d_]*(?:[eE][-+]?\d+)?"
+    r"|\d[\d_]*[eE][-+]?\d+)$")
+_PLAIN = {
+    "": None, "~": None, "null": None, "Null": None, "NULL": None,
+    "true": True, "True": True, "TRUE": True,
+    "false": False, "False": False, "FALSE": False,
+    ".inf": float("inf"), "+.inf": float("inf"), "-.inf": float("-inf"),
+    ".nan": float("nan"), ".NaN": float("nan"),
+}
+_NUMBER_START = frozenset("-+.0123456789")
+_PLACEHOLDER = "__values_{}__"
+
+# NOTE: "None" written in STRUCTURE and BODY-* fields
+_NONE = ("None", "none", "NONE", "null", "~", "")
+
+
+class TableParseError(ValueError):
+    '''
+    Raised when the YAML of an answer cannot be parsed.
+    '''
+
+    def __init__(self, message: str, line: Optional[int] = None, source: str = ""):
+        super().__init__(message)
+        self.line = line
+        self.source = source
+
+
+def yaml_block_spans(text: str) -> List[Tuple[int, int]]:
+    '''
+    Return the (start, end) offsets of the YAML blocks of an answer: its fenced blocks
+    with a table, or else the text from the first line starting a table.
+    '''
+    spans = [
+        match.span(1) for match in _YAML_FENCE.finditer(text)
+        if "STRUCTURE" in match.group(1)
+    ]
+    if spans or "STRUCTURE" not in text:
+        return spans
+    match = _TABLE_START.search(text)
+    return [(match.start() if match else 0, len(text))]
+
+
+def extract_yaml_blocks(text: str) -> List[str]:
+    '''
+    Return the YAML blocks of an answer, see `yaml_block_spans`.
+    '''
+    return [text[start:end] for start, end in yaml_block_spans(text)]
+
+
+def _scalar(text: str) -> Any:
+    # NOTE: the YAML 1.1 plain scalars of a row, with YAML 1.2 exponents; other
+    # numbers (octal, hexadecimal, sexagesimal) are left to the YAML parser
+    if text in _PLAIN:
+        return _PLAIN[text]
+    if _INT.match(text):
+        return int(text.replace("_", ""))
+    if _FLOAT.match(text):
+        return float(text.replace("_", ""))
+    if text[:1] in _NUMBER_START:
+        raise ValueError(text)
+    return text
+
+
+def parse_flow_row(text: str) -> Optional[List[Any]]:
+    '''
+    Parse the inside of a one-line flow sequence (`1, "Methane", 'CH4', g, 16.04`)
+    as YAML would, or return None if it needs the YAML parser.
+    '''
+    row: List[Any] = []
+    position, end = 0, len(text)
+    if not text.strip():
+        return row
+    while position <= end:
+        match = _CELL.match(text, position)
+        if match is None or match.end() == position and position < end:
+            return None
+        double, single, plain, separator = match.groups()
+        if double is not None:
+            if "\\" in double:
+                return None
+            row.append(double)
+        elif single is not None:
+            row.append(single.replace("''", "'"))
+        else:
+            try:
+                row.append(_scalar(plain))
+            except ValueError:
+                return None
+        position = match.end()
+        # NOTE: a trailing comma ends the sequence, as in YAML
+        if not separator or not text[position:].strip():
+            break
+    return row if position >= end or not text[position:].strip() else None
+
+
+def _parse_rows(rows: List[str]) -> Optional[List[List[Any]]]:
+    if not rows:
+        return None
+    # NOTE: rows of numbers and double-quoted text are JSON, read at once
+    try:
+        section = json.loads("[[" + "],[".join(rows) + "]]")
+        if not any(
+                isinstance(cell, float) and not math.isfinite(cell)
+                for row in section for cell in row):
+            return section
+    except ValueError:
+        pass
+    section = []
+    for row in rows:
+        cells = parse_flow_row(row)
+        if cells is None:
+            return None
+        section.append(cells)
+    return section
+
+
+def _split_values(block: str) -> Tuple[str, Dict[str, List[Any]]]:
+    '''
+    Take the one-line flow rows of the VALUES sections out of a block, parsed, and
+    leave a placeholder in their place. Sections with other rows stay in the block.
+    '''
+    lines = block.splitlines()
+    kept: List[str] = []
+    rows: Dict[str, List[Any]] = {}
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        kept.append(line)
+        i += 1
+        match = _VALUES_KEY.match(line)
+        if match is None:
+            continue
+        found: List[str] = []
+        j = i
+        while j < len(lines):
+            row = _FLOW_ROW.match(lines[j])
+            if row is None:
+                if _COMMENT.match(lines[j]) and j + 1 < len(lines) and \
+                        _FLOW_ROW.match(lines[j + 1]):
+                    j += 1
+                    continue
+                break
+            found.append(row.group(1))
+            j += 1
+        section = _parse_rows(found)
+        if section:
+            key = _PLACEHOLDER.format(len(rows))
+            rows[key] = section
+            kept[-1] = f"{match.group(1)}VALUES: {key}"
+            i = j
+    return "\n".join(kept), rows
+
+
+def load_yaml(block: str) -> Any:
+    '''
+    Load a YAML block with the table loader.
+
+    The one-line rows of VALUES, the bulk of large tables, are parsed apart from the
+    YAML parser (see `parse_flow_row`), which loads the rest of the block.
+
+    Raises
+    ------
+    TableParseError
+        If the block is not valid YAML.
+    '''
+    text, rows = _split_values(block)
+    try:
+        data = yaml.load(text, Loader=TableLoader)
+    except yaml.YAMLError as e:
+        try:
+            # NOTE: report the error on the lines of the block
+            yaml.load(block, Loader=TableLoader)
+        except yaml.YAMLError as error:
+            e = error
+        mark = getattr(e, "problem_mark", None)
+        line = mark.line + 1 if mark is not None else None
+        raise TableParseError(f"Invalid YAML: {e}", line=line, source=block) from e
+    if rows:
+        _restore_values(data, rows)
+    return data
+
+
+def _restore_values(data: Any, rows: Dict[str, List[Any]]):
+    # NOTE: wherever the VALUES key ended up, e.g. under a mis-indented STRUCTURE
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, str) and value in rows:
+                data[key] = rows[value]
+            else:
+                _restore_values(value, rows)
+
+
+def _none(value: Any) -> Any:
+    return None if isinstance(value, str) and value.strip() in _NONE else value
+
+
+def _lines(value: Any) -> Optional[List[str]]:
+    value = _none(value)
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return [str(line) for line in value if _none(line) is not None]
+    return [str(value)]
+
+
+def table_sections(data: Any) -> Dict[Optional[str], Dict[str, Any]]:
+    '''
+    Return the tables of a loaded YAML document by name: a data table at the top level
+    (named None) or tables one level down, keyed by their name.
+    '''
+    if not isinstance(data, dict):
+        return {}
+    if "STRUCTURE" in data or "VALUES" in data:
+        return {None: data}
+    return {
+        str(name): value for name, value in data.items()
+        if isinstance(value, dict) and ("STRUCTURE" in value or "VALUES" in value)
+    }
+
+
+def build_table(name: Optional[str], section: Dict[str, Any]) -> ThermoTable:
+    '''
+    Build the typed table of a loaded YAML section, without validating it.
+    '''
+    structure = section.get("STRUCTURE")
+    structure = structure if isinstance(structure, dict) else {}
+
+    def _list(key: str) -> List[Any]:
+        value = structure.get(key)
+        return [_none(item) for item in value] if isinstance(value, list) else []
+
+    conversion = structure.get("CONVERSION")
+    equations = section.get("EQUATIONS")
+    description = section.get("DESCRIPTION")
+    values = section.get("VALUES")
+    return ThermoTable(
+        name=name,
+        kind="equations" if "EQUATIONS" in section else "data",
+        table_id=section.get("TABLE-ID"),
+        description=" ".join(str(description).split()) if description is not None else None,
+        equations=[
+            EquationBody(
+                name=str(key),
+                body=_lines(equation.get("BODY")) or [],
+                body_integral=_lines(equation.get("BODY-INTEGRAL")),
+                body_first_derivative=_lines(equation.get("BODY-FIRST-DERIVATIVE")),
+                body_second_derivative=_lines(equation.get("BODY-SECOND-DERIVATIVE")),
+            )
+            for key, equation in equations.items()
+            if isinstance(equation, dict)
+        ] if isinstance(equations, dict) else [],
+        structure=TableStructure(
+            columns=_list("COLUMNS"),
+            symbol=_list("SYMBOL"),
+            unit=_list("UNIT"),
+            conversion=[_none(item) for item in conversion]
+            if isinstance(conversion, list) else None,
+        ),
+        values=values if isinstance(values, list) else [],
+    )
+
+
+def format_table(table: ThermoTable) -> str:
+    '''
+    Render a table in the YAML structure of `DATA_AGENT_PROMPT` or, for equation
+    tables, of `EQUATIONS_AGENT_PROMPT`.
+    '''
+    indent = "  " if table.name is not None else ""
+    lines = [f"{table.name}:"] if table.name is not None else []
+    lines.append(f"{indent}TABLE-ID: {flow_value(table.table_id)}")
+    if table.description is not None:
+        lines += [
+            f"{indent}DESCRIPTION:",
+            f"{indent}  {json.dumps(table.description, ensure_ascii=False)}",
+        ]
+    if table.kind == "equations":
+        lines.append(f"{indent}EQUATIONS:")
+        for equation in table.equations:
+            lines += [f"{indent}  {equation.name}:", f"{indent}    BODY:"]
+            lines += [
+                f"{indent}      - {json.dumps(line, ensure_ascii=False)}"
+                for line in equation.body
+            ]
+            for key, body in (
+                ("BODY-INTEGRAL", equation.body_integral),
+                ("BODY-FIRST-DERIVATIVE", equation.body_first_derivative),
+                ("BODY-SECOND-DERIVATIVE", equation.body_second_derivative),
+            ):
+                if not body:
+                    lines.append(f"{indent}    {key}: None")
+                    continue
+                lines.append(f"{indent}    {key}:")
+                lines += [
+                    f"{indent}      - {json.dumps(line, ensure_ascii=False)}"
+                    for line in body
+                ]
+    else:
+        lines.append(f"{indent}DATA: []")
+
+    structure = table.structure
+    lists = {"COLUMNS": structure.columns, "SYMBOL": structure.symbol, "UNIT": structure.unit}
+    if structure.conversion is not None:
+        lists["CONVERSION"] = structure.conversion
+    lines.append(f"{indent}STRUCTURE:")
+    for key, items in lists.items():
+        lines.append(f"{indent}  {key}: [{', '.join(flow_item(item) for item in items)}]")
+    lines.append(f"{indent}VALUES:")
+    for row in table.values:
+        cells = row if isinstance(row, list) else [row]
+        lines.append(f"{indent}  - [{', '.join(flow_value(item) for item in cells)}]")
+    return "\n".join(lines) + "\n"
+
+
+def parse_tables(text: str, validate: bool = True) -> List[ThermoTable]:
+    '''
+    Parse the YAML tables of an agent answer into typed tables.
+
+    Parameters
+    ----------
+    text : str
+        The answer of the agent, with the YAML fenced or not.
+    validate : bool, optional
+        Whether to validate the tables (see `validate_table`) and check the equations
+        against the check points of their rows (see `check_table`), by default True.
+
+    Returns
+    -------
+    List[ThermoTable]
+        The tables, empty if the answer has none.
+
+    Raises
+    ------
+    TableParseError
+        If a YAML block of the answer is not valid YAML.
+    '''
+    tables: List[ThermoTable] = []
+    for block in extract_yaml_blocks(text):
+        for name, section in table_sections(load_yaml(block)).items():
+            tables.append(build_table(name, section))
+    if validate:
+        for table in tables:
+            check_table(validate_table(table))
+    return tables
+
+
+def read_tables(content: Any) -> Optional[List[ThermoTable]]:
+    '''
+    Return the validated tables of a message content, or None if it has none or its
+    YAML does not parse.
+    '''
+    if not isinstance(content, str) or "STRUCTURE" not in content:
+        return None
+    try:
+        return parse_tables(content) or None
+    except TableParseError as e:
+        logger.info(f"Tables of the answer not parsed: {e}")
+        return None
@@ -0,0 +1,542 @@
+# import libs
+import json
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple
+)
+# local
+from ..models import ThermoTable
+from .converter import (
+    FIXED_COLUMNS,
+    map_header,
+    parse_cell,
+    parse_state
+)
+from .parser import (
+    TableParseError,
+    build_table,
+    format_table,
+    load_yaml,
+    parse_flow_row,
+    table_sections,
+    yaml_block_spans
+)
+from .units import normalize_unit
+from .checks import check_table
+from .validation import STATES, validate_table
+from .yaml_format import NULLS
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# NOTE: rows listed per issue in a repair prompt
+MAX_PROMPT_ROWS = 5
+
+# NOTE: keys of the table schemas, by nesting level below the table
+_TABLE_KEYS = {"TABLE-ID", "DESCRIPTION", "DATA", "EQUATIONS", "STRUCTURE", "VALUES"}
+_STRUCTURE_KEYS = {"COLUMNS", "SYMBOL", "UNIT", "CONVERSION"}
+_BODY_KEYS = {"BODY", "BODY-INTEGRAL", "BODY-FIRST-DERIVATIVE", "BODY-SECOND-DERIVATIVE"}
+_EQ_KEY = re.compile(r"^EQ-?\d+$", re.IGNORECASE)
+
+_KEY_LINE = re.compile(r"^(\s*)([^\s#\-\[][^:#]*?):(?:\s+(.*?))?\s*$")
+_ITEM_LINE = re.compile(r"^(\s*)-(?:\s+(.*?))?\s*$")
+_FLOW_LINE = re.compile(r"^(\s*(?:-\s*|[^:#\[]+:\s*))\[(.*?)(\])?\s*(#.*)?$")
+_FLOW_CELL = re.compile(r"\"(?:[^\"\\]|\\.)*\"|'(?:[^']|'')*'|[^,\"']+|,")
+_IDENTIFIER = re.compile(r"^[A-Za-z_][\w().\-]*$")
+_EQ_INDEX = re.compile(r"^(?:eq)?[-_ ]?(\d+)$", re.IGNORECASE)
+
+
+# SECTION: text fixes, for blocks that do not parse
+def _join(lines: List[str], block: str) -> str:
+    return "\n".join(lines) + ("\n" if block.endswith("\n") else "")
+
+
+def _fix_tabs(block: str) -> str:
+    return block.replace("\t", "  ")
+
+
+def _fix_trailing_text(block: str) -> str:
+    # NOTE: prose after the table, e.g. the sources of the data
+    lines = block.splitlines()
+    for index, line in enumerate(lines):
+        if index and line.strip() and not line[0].isspace() and not _KEY_LINE.match(line) \
+                and not line.startswith(("-", "#", "[")):
+            return _join(lines[:index], block)
+    return block
+
+
+def _fix_flow_cells(text: str) -> str:
+    # NOTE: empty cells of a flow sequence become null, commas in quotes are kept
+    if not text.strip():
+        return text
+    cells = [""]
+    for token in _FLOW_CELL.findall(text):
+        if token == ",":
+            cells.append("")
+        else:
+            cells[-1] += token
+    return ", ".join(cell.strip() or "null" for cell in cells)
+
+
+def _fix_flow_rows(block: str) -> str:
+    lines = []
+    for line in block.splitlines():
+        match = _FLOW_LINE.match(line)
+        if match:
+            prefix, inside, closed, comment = match.groups()
+            cells = _fix_flow_cells(inside)
+            # NOTE: only rows with empty cells or without their closing bracket
+            if not closed or cells.replace(" ", "") != inside.replace(" ", ""):
+                line = f"{prefix}[{cells}]" + (f"  {comment}" if comment else "")
+        lines.append(line)
+    return _join(lines, block)
+
+
+def _fix_body_lines(block: str) -> str:
+    # NOTE: expressions of BODY spread on several lines, or with `: ` and ` #` in
+    # them, become one quoted item per assignment
+    lines = block.splitlines()
+    fixed: List[str] = []
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        fixed.append(line)
+        index += 1
+        match = _KEY_LINE.match(line)
+        if not match or match.group(2).strip() not in _BODY_KEYS or match.group(3):
+            continue
+        indent = len(match.group(1))
+        items: List[List[str]] = []
+        while index < len(lines):
+            current = lines[index]
+            if current.strip() and len(current) - len(current.lstrip()) <= indent:
+                break
+            item = _ITEM_LINE.match(current)
+            if item:
+                items.append([item.group(2) or ""])
+            elif current.strip() and items:
+                items[-1].append(current.strip())
+            index += 1
+        for parts in items:
+            text = " ".join(part for part in parts if part)
+            if len(parts) == 1 and text[:1] in "'\"" and text[-1:] == text[:1]:
+                fixed.append(f"{' ' * (indent + 2)}- {text}")
+            else:
+                fixed.append(f"{' ' * (indent + 2)}- {json.dumps(text, ensure_ascii=False)}")
+    return _join(fixed, block)
+
+
+def _fix_indentation(block: str) -> str:
+    # NOTE: indentation of the schema keys, from the table keys they belong to
+    lines: List[str] = []
+    base = 0
+    parent = ""
+    for line in block.splitlines():
+        text = line.strip()
+        if not text or text.startswith("#"):
+            continue
+        key = _KEY_LINE.match(line)
+        name = key.group(2).strip() if key and not text.startswith("-") else None
+        if name in _TABLE_KEYS:
+            level, parent = base, name
+        elif name in _STRUCTURE_KEYS and parent in ("STRUCTURE", "COLUMNS"):
+            level, parent = base + 2, "COLUMNS"
+        elif name is not None and _EQ_KEY.match(name) and parent in ("EQUATIONS", "EQ", "BODY"):
+            level, parent = base + 2, "EQ"
+        elif name in _BODY_KEYS and parent in ("EQ", "BODY"):
+            level, parent = base + 4, "BODY"
+        elif text.startswith("-") and parent == "VALUES":
+            level = base + 2
+        elif text.startswith("-") and parent == "BODY":
+            level = base + 6
+        elif name is not None and not key.group(3) and not line[0].isspace():
+            # NOTE: name of a table, its keys one level down
+            level, base, parent = 0, 2, ""
+        elif parent == "DESCRIPTION":
+            level = base + 2
+        else:
+            level = len(line) - len(line.lstrip())
+        lines.append(" " * level + text)
+    return _join(lines, block)
+
+
+# NOTE: in the order they are tried
+TEXT_FIXES: List[Tuple[str, Callable[[str], str]]] = [
+    ("tabs", _fix_tabs),
+    ("trailing_text", _fix_trailing_text),
+    ("flow_rows", _fix_flow_rows),
+    ("body_lines", _fix_body_lines),
+    ("indentation", _fix_indentation),
+]
+
+
+def _load_block(block: str, fixes: List[str]) -> Tuple[Any, str]:
+    '''
+    Load a YAML block, applying the text fixes one after the other until it parses.
+    '''
+    try:
+        return load_yaml(block), block
+    except TableParseError as e:
+        error = e
+    for name, fix in TEXT_FIXES:
+        fixed = fix(block)
+        if fixed == block:
+            continue
+        block = fixed
+        fixes.append(name)
+        try:
+            return load_yaml(block), block
+        except TableParseError as e:
+            error = e
+    raise error
+
+
+# SECTION: structural fixes, for tables that parse
+def _fix_nesting(section: Dict[str, Any]) -> bool:
+    '''
+    Move the keys parsed under the wrong parent (an indentation that still parses,
+    e.g. VALUES inside STRUCTURE) back to their place, in place.
+    '''
+    moved = False
+    structure = section.get("STRUCTURE")
+    if not isinstance(structure, dict):
+        structure = {}
+    for key in [key for key in structure if key in _TABLE_KEYS and key not in section]:
+        section[key] = structure.pop(key)
+        moved = True
+    for key in [key for key in section if key in _STRUCTURE_KEYS]:
+        structure.setdefault(key, section.pop(key))
+        moved = True
+    if moved:
+        section["STRUCTURE"] = structure
+    return moved
+
+
+def _number(cell: Any, unit: Any) -> Tuple[bool, Any]:
+    '''
+    Return whether a text cell of a numeric column was fixed, and its value.
+    '''
+    text = cell.strip()
+    if text.lower() in NULLS or text.lower() in ("unknown", "not available"):
+        return True, None
+    value, cell_unit = parse_cell(text)
+    if value is not None and (
+            cell_unit is None or normalize_unit(cell_unit) == normalize_unit(str(unit))):
+        return True, int(value) if text.lstrip("+-").isdigit() else value
+    return False, cell
+
+
+def _repair_table(table: ThermoTable, fixes: List[str]):
+    '''
+    Fix the structural defects reported by the validation of a table, in place.
+    '''
+    structure = table.structure
+    columns = len(structure.columns)
+    fixed: set = set()
+
+    # SECTION: STRUCTURE
+    if columns >= 4 and [str(column) for column in structure.columns[:4]] != FIXED_COLUMNS:
+        if [map_header(str(column))[0] for column in structure.columns[:4]] == FIXED_COLUMNS:
+            structure.columns[:4] = FIXED_COLUMNS
+            fixed.add("fixed_columns")
+    properties = columns - len(FIXED_COLUMNS)
+    for key in ("symbol", "unit") + (("conversion",) if table.kind == "data" else ()):
+        items = getattr(structure, key) or []
+        if key == "conversion" and not items:
+            items = [None] * len(FIXED_COLUMNS) + [1] * properties
+        elif properties > 0 and len(items) == properties:
+            items = [None] * len(FIXED_COLUMNS) + list(items)
+        else:
+            continue
+        setattr(structure, key, items)
+        fixed.add("structure_padding")
+
+    # SECTION: rows flagged by the validation
+    flagged = sorted({
+        row for issue in table.issues if issue.severity == "error" for row in issue.rows
+    })
+    last = columns - 1 if table.kind == "equations" else columns
+    units = structure.unit if len(structure.unit) == columns else [None] * columns
+    for index in flagged:
+        row = table.values[index]
+        if isinstance(row, str):
+            cells = parse_flow_row(row.strip().strip("[]"))
+            if cells is None:
+                continue
+            row = cells
+            fixed.add("row_format")
+        if not isinstance(row, list):
+            continue
+        row = list(row)
+
+        # NOTE: a row one cell short, or with extra empty cells
+        if len(row) == columns - 1:
+            if table.kind == "data":
+                row.append(None)
+                fixed.add("short_row")
+            elif len(table.equations) == 1:
+                row.append(1)
+                fixed.add("short_row")
+        elif len(row) > columns and all(cell is None for cell in row[columns:]):
+            row = row[:columns]
+            fixed.add("long_row")
+        if len(row) != columns or columns < 4:
+            table.values[index] = row
+            continue
+
+        # NOTE: No. and State
+        if row[0] is None or isinstance(row[0], float) and row[0].is_integer():
+            row[0] = index + 1 if row[0] is None else int(row[0])
+            fixed.add("row_numbers")
+        elif isinstance(row[0], str) and row[0].strip().isdigit():
+            row[0] = int(row[0])
+            fixed.add("row_numbers")
+        if isinstance(row[3], str) and row[3] not in STATES and parse_state(row[3]):
+            row[3] = parse_state(row[3])
+            fixed.add("state")
+
+        # NOTE: numbers written as text, and symbols in place of values
+        for j in range(4, last):
+            cell = row[j]
+            if not isinstance(cell, str):
+                continue
+            ok, value = _number(cell, units[j])
+            if ok:
+                row[j] = value
+                fixed.add("numeric_text" if value is not None else "null_text")
+            elif table.kind == "data" and _IDENTIFIER.match(cell.strip()):
+                # NOTE: no value to recover, null as for a value not found
+                row[j] = None
+                fixed.add("symbol_in_values")
+
+        # NOTE: equation index
+        if table.kind == "equations" and not isinstance(row[-1], int):
+            match = _EQ_INDEX.match(str(row[-1]).strip().replace(".0", ""))
+            if match:
+                row[-1] = int(match.group(1))
+                fixed.add("eq_index")
+        table.values[index] = row
+
+    fixes.extend(sorted(fixed))
+
+
+# SECTION: repair
+class TableRepair:
+    '''
+    Result of the local repair of the YAML tables of an answer.
+
+    `text` is the answer with its tables rendered again when a fix was applied, the
+    original answer otherwise. `fixes` lists the fixes applied, `error` the YAML error
+    left when a block still does not parse.
+    '''
+
+    def __init__(
+        self,
+        text: str,
+        tables: List[ThermoTable],
+        fixes: List[str],
+        error: Optional[TableParseError] = None
+    ):
+        # NOTE: set attributes
+        self.text = text
+        self.tables = tables
+        self.fixes = fixes
+        self.error = error
+
+    @property
+    def valid(self) -> bool:
+        return self.error is None and bool(self.tables) and \
+            all(table.valid for table in self.tables)
+
+    @property
+    def repaired(self) -> bool:
+        return bool(self.fixes)
+
+    def problems(self) -> List[str]:
+        '''
+        Describe the errors left, one line each, with the offending rows.
+        '''
+        if self.error is not None:
+            lines = self.error.source.splitlines()
+            problem = str(self.error).splitlines()[0]
+            if self.error.line and 0 < self.error.line <= len(lines):
+                return [f"{problem} at line {self.error.line}: {lines[self.error.line - 1].strip()}"]
+            return [problem]
+        if not self.tables:
+            return ["The answer has no YAML table with STRUCTURE and VALUES."]
+        problems = []
+        for table in self.tables:
+            where = f"Table {table.name}: " if table.name else ""
+            for issue in table.issues:
+                if issue.severity != "error":
+                    continue
+                problem = f"{where}{issue.message}"
+                if issue.rows:
+                    shown = [
+                        f"[{', '.join(json.dumps(cell, ensure_ascii=False) for cell in table.values[row])}]"
+                        if isinstance(table.values[row], list) else json.dumps(table.values[row])
+                        for row in issue.rows[:MAX_PROMPT_ROWS]
+                    ]
+                    more = len(issue.rows) - MAX_PROMPT_ROWS
+                    problem += "; rows: " + "; ".join(shown) + (
+                        f" (and {more} more)" if more > 0 else "")
+                problems.append(problem)
+        return problems
+
+
+def repair_tables(text: str) -> TableRepair:
+    '''
+    Repair the YAML tables of an answer locally, without the LLM.
+
+    Blocks that do not parse get the text fixes (tabs, prose after the table, empty
+    cells and unclosed flow rows, multi-line BODY expressions, indentation of the schema
+    keys) until they do. Tables with validation errors then get the structural fixes:
+    fixed column names, padding of SYMBOL/UNIT/CONVERSION, rows one cell short or with
+    extra nulls, No., State names, numbers written as text, symbols in the VALUES of
+    data tables (set to null) and equation indices. Repaired tables are validated again
+    and rendered in the schema of the agents. The equations are then checked against
+    the check points of their rows (`check_table`); rows that fail are left to the
+    model.
+
+    Parameters
+    ----------
+    text : str
+        The answer of the agent.
+
+    Returns
+    -------
+    TableRepair
+        The repaired answer, its tables and the fixes applied.
+    '''
+    fixes: List[str] = []
+    tables: List[ThermoTable] = []
+    pieces: List[str] = []
+    position = 0
+    for start, end in yaml_block_spans(text):
+        block = text[start:end]
+        block_fixes: List[str] = []
+        try:
+            data, _ = _load_block(block, block_fixes)
+        except TableParseError as e:
+            return TableRepair(text, [], fixes + block_fixes, error=e)
+
+        sections = table_sections(data)
+        if any([_fix_nesting(section) for section in sections.values()]):
+            block_fixes.append("nesting")
+        block_tables = [
+            validate_table(build_table(name, section))
+            for name, section in sections.items()
+        ]
+        for table in block_tables:
+            if not table.valid:
+                _repair_table(table, block_fixes)
+                validate_table(table)
+            # NOTE: wrong numbers are not repaired locally, only reported
+            check_table(table)
+        tables.extend(block_tables)
+        fixes.extend(block_fixes)
+
+        # NOTE: the block is rendered again only when it was fixed
+        pieces.append(text[position:start])
+        if block_fixes:
+            rendered = "\n".join(format_table(table).rstrip("\n") for table in block_tables)
+            # NOTE: prose cut from the end of the block stays after it
+            trailing = block[len(_fix_trailing_text(block)):] \
+                if "trailing_text" in block_fixes else ""
+            pieces.append(rendered + ("\n" if block.endswith("\n") else "") + trailing)
+        else:
+            pieces.append(block)
+        position = end
+    pieces.append(text[position:])
+    return TableRepair("".join(pieces), tables, fixes)
+
+
+def repair_prompt(repair: TableRepair) -> str:
+    '''
+    Build the message asking the model to fix the problems local repair left, and
+    nothing else.
+    '''
+    problems = "\n".join(f"- {problem}" for problem in repair.problems())
+    return (
+        "Your last answer has problems in its YAML tables that could not be fixed "
+        "automatically:\n"
+        f"{problems}\n"
+        "Fix only these problems and return the complete corrected YAML table(s) in the "
+        "same structure, with no other change and no tool calls."
+    )
+
+
+# SECTION: repair rates
+class RepairStats:
+    '''
+    Outcome of the checks of the answers with YAML tables: valid as returned, repaired
+    locally, repaired by a re-prompt of the model or left invalid, and the count of
+    each fix.
+    '''
+
+    def __init__(self):
+        self.answers = 0
+        self.valid = 0
+        self.repaired_locally = 0
+        self.reprompts = 0
+        self.repaired_by_llm = 0
+        self.unrepaired = 0
+        self.fixes: Dict[str, int] = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, repair: TableRepair, reprompt: bool = False):
+        '''
+        Record the outcome of a local repair, of the answer (reprompt False) or of the
+        answer of a re-prompt.
+        '''
+        with self.lock:
+            for fix in repair.fixes:
+                self.fixes[fix] += 1
+            if reprompt:
+                self.reprompts += 1
+                self.repaired_by_llm += int(repair.valid)
+                return
+            self.answers += 1
+            if repair.valid and not repair.repaired:
+                self.valid += 1
+            elif repair.valid:
+                self.repaired_locally += 1
+
+    def fail(self):
+        with self.lock:
+            self.unrepaired += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            defective = self.answers - self.valid
+            return {
+                "answers": self.answers,
+                "valid": self.valid,
+                "repaired_locally": self.repaired_locally,
+                "reprompts": self.reprompts,
+                "repaired_by_llm": self.repaired_by_llm,
+                "unrepaired": self.unrepaired,
+                "defect_rate": defective / self.answers if self.answers else 0.0,
+                "local_repair_rate": self.repaired_locally / defective if defective else 0.0,
+                "llm_repair_rate": self.repaired_by_llm / self.reprompts if self.reprompts else 0.0,
+                "fixes": dict(self.fixes),
+            }
+
+
+# SECTION: process-wide counters
+_repair_stats = RepairStats()
+
+
+def get_repair_stats() -> RepairStats:
+    '''
+    Return the repair counters of the process.
+    '''
+    return _repair_stats
@@ -0,0 +1,169 @@
+# import libs
+import re
+from functools import lru_cache
+from typing import (
+    Dict,
+    Optional,
+    Tuple
+)
+
+# NOTE: dimension of each property of THERMODYNAMIC_SYMBOLS
+PROPERTY_DIMENSIONS: Dict[str, str] = {
+    "temperature": "temperature",
+    "critical_temperature": "temperature",
+    "boiling_temperature": "temperature",
+    "melting_temperature": "temperature",
+    "pressure": "pressure",
+    "critical_pressure": "pressure",
+    "vapor_pressure": "pressure",
+    "molar_volume": "molar_volume",
+    "critical_molar_volume": "molar_volume",
+    "critical_compressibility_factor": "dimensionless",
+    "acentric_factor": "dimensionless",
+    "molecular_weight": "molar_mass",
+    "liquid_density": "density",
+    "gas_density": "density",
+    "enthalpy_of_formation": "molar_energy",
+    "Gibbs_energy_of_formation": "molar_energy",
+    "liquid_enthalpy_of_formation": "molar_energy",
+    "liquid_Gibbs_energy_of_formation": "molar_energy",
+    "ideal_gas_enthalpy_of_formation": "molar_energy",
+    "ideal_gas_Gibbs_energy_of_formation": "molar_energy",
+    "enthalpy_of_vaporization": "molar_energy",
+    "enthalpy_of_fusion": "molar_energy",
+    "standard_net_enthalpies_of_combustion": "molar_energy",
+    "liquid_entropy": "molar_entropy",
+    "ideal_gas_entropy": "molar_entropy",
+    "ideal_gas_heat_capacity_at_constant_pressure": "molar_entropy",
+    "liquid_heat_capacity_at_constant_pressure": "molar_entropy",
+    "solid_heat_capacity": "molar_entropy",
+}
+
+# NOTE: unit the values of a dimension are normalized to
+STANDARD_UNITS: Dict[str, str] = {
+    "temperature": "K",
+    "pressure": "MPa",
+    "molar_volume": "cm3/mol",
+    "dimensionless": "1",
+    "molar_mass": "g/mol",
+    "density": "kg/m3",
+    "molar_energy": "kJ/mol",
+    "molar_entropy": "J/mol.K",
+}
+
+# NOTE: (scale, offset) from a unit to the standard unit, keyed by normalized unit
+UNIT_CONVERSIONS: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "temperature": {
+        "k": (1.0, 0.0),
+        "c": (1.0, 273.15),
+        "f": (5.0 / 9.0, 459.67 * 5.0 / 9.0),
+        "r": (5.0 / 9.0, 0.0),
+    },
+    "pressure": {
+        "pa": (1e-6, 0.0),
+        "kpa": (1e-3, 0.0),
+        "mpa": (1.0, 0.0),
+        "gpa": (1e3, 0.0),
+        "bar": (0.1, 0.0),
+        "mbar": (1e-4, 0.0),
+        "atm": (0.101325, 0.0),
+        "mmhg": (133.322387415e-6, 0.0),
+        "torr": (101325.0 / 760.0 * 1e-6, 0.0),
+        "psi": (6.894757293e-3, 0.0),
+    },
+    "molar_volume": {
+        "cm3/mol": (1.0, 0.0),
+        "ml/mol": (1.0, 0.0),
+        "m3/kmol": (1e3, 0.0),
+        "l/mol": (1e3, 0.0),
+        "dm3/mol": (1e3, 0.0),
+        "m3/mol": (1e6, 0.0),
+    },
+    "dimensionless": {
+        "1": (1.0, 0.0),
+        "-": (1.0, 0.0),
+        "": (1.0, 0.0),
+    },
+    "molar_mass": {
+        "g/mol": (1.0, 0.0),
+        "kg/kmol": (1.0, 0.0),
+        "kg/mol": (1e3, 0.0),
+        "da": (1.0, 0.0),
+        "amu": (1.0, 0.0),
+        "u": (1.0, 0.0),
+    },
+    "density": {
+        "kg/m3": (1.0, 0.0),
+        "g/l": (1.0, 0.0),
+        "g/cm3": (1e3, 0.0),
+        "g/ml": (1e3, 0.0),
+        "kg/l": (1e3, 0.0),
+    },
+    "molar_energy": {
+        "kj/mol": (1.0, 0.0),
+        "j/mol": (1e-3, 0.0),
+        "mj/kmol": (1.0, 0.0),
+        "kj/kmol": (1e-3, 0.0),
+        "j/kmol": (1e-6, 0.0),
+        "kcal/mol": (4.184, 0.0),
+        "cal/mol": (4.184e-3, 0.0),
+    },
+    "molar_entropy": {
+        "j/molk": (1.0, 0.0),
+        "kj/molk": (1e3, 0.0),
+        "kj/kmolk": (1.0, 0.0),
+        "j/kmolk": (1e-3, 0.0),
+        "cal/molk": (4.184, 0.0),
+    },
+}
+
+# NOTE: spelled-out units
+_UNIT_NAMES = {
+    "kelvin": "k",
+    "celsius": "c",
+    "fahrenheit": "f",
+    "rankine": "r",
+    "pascal": "pa",
+    "dimensionless": "1",
+}
+
+_NEGATIVE_POWER = re.compile(r"^(.*?)-1$")
+
+
+@lru_cache(maxsize=256)
+def normalize_unit(unit: Optional[str]) -> str:
+    '''
+    Return the lookup key of a unit: lower case, without degree signs, dots, spaces
+    and parentheses, with the denominators after a single slash (`J/(mol·K)`,
+    `J/mol/K` and `J mol-1 K-1` all give `j/molk`).
+    '''
+    if unit is None:
+        return ""
+    text = unit.strip().lower()
+    for old, new in (
+        ("°", ""), ("deg", ""), ("·", " "), ("*", " "), ("(", " "), (")", " "),
+        ("^", ""), ("³", "3"), ("²", "2"), ("−", "-"), ("⁻¹", "-1"),
+    ):
+        text = text.replace(old, new)
+    text = _UNIT_NAMES.get(text.strip(), text)
+
+    # NOTE: negative powers, e.g. "J mol-1 K-1"
+    tokens = text.replace(".", " ").split()
+    if "/" not in text and any(_NEGATIVE_POWER.match(token) for token in tokens):
+        numerator = [token for token in tokens if not _NEGATIVE_POWER.match(token)]
+        denominator = [_NEGATIVE_POWER.match(token).group(1) for token in tokens
+                       if _NEGATIVE_POWER.match(token)]
+        return "".join(numerator) + "/" + "".join(denominator)
+
+    parts = "".join(tokens).split("/")
+    if len(parts) > 2:
+        return parts[0] + "/" + "".join(parts[1:])
+    return "/".join(parts)
+
+
+def unit_conversion(dimension: str, unit: Optional[str]) -> Optional[Tuple[float, float]]:
+    '''
+    Return the (scale, offset) converting values of a unit to the standard unit of a
+    dimension, or None if the unit is not known.
+    '''
+    return UNIT_CONVERSIONS.get(dimension, {}).get(normalize_unit(unit))
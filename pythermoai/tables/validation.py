@@ -0,0 +1,286 @@
+# import libs
+import re
+from itertools import chain
+from typing import (
+    Any,
+    List,
+    Optional
+)
+import numpy as np
+# local
+from ..agents.symbols import THERMODYNAMIC_SYMBOLS
+from ..models import TableIssue, ThermoTable
+from .converter import FIXED_COLUMNS
+
+# NOTE: states of the State column
+STATES = ("g", "l", "s")
+
+# NOTE: last column of equation tables
+EQ_COLUMN = "Eq"
+
+# NOTE: symbols of THERMODYNAMIC_SYMBOLS
+KNOWN_SYMBOLS = frozenset(THERMODYNAMIC_SYMBOLS.values())
+
+# NOTE: type codes of the cells
+NONE, INT, FLOAT, STR, OTHER = range(5)
+_TYPE_CODES = {type(None): NONE, int: INT, float: FLOAT, str: STR}
+
+# NOTE: `parms['<desc | sym | unit>']` and `args[...]` references of a BODY
+_REFERENCE = re.compile(r"\b(parms|args)\[\s*['\"]([^'\"]*)['\"]\s*\]")
+
+# NOTE: number of an EQUATIONS key, e.g. EQ-1
+EQ_NUMBER = re.compile(r"(\d+)\s*$")
+
+
+def reference_symbol(key: str) -> str:
+    '''
+    Return the symbol of a `'<desc | sym | unit>'` key, the key itself without pipes.
+    '''
+    parts = [part.strip() for part in key.split("|")]
+    return parts[1] if len(parts) >= 2 else parts[0]
+
+
+def _issue(
+    issues: List[TableIssue],
+    code: str,
+    message: str,
+    severity: str = "error",
+    column: Optional[str] = None,
+    rows: Any = ()
+):
+    issues.append(TableIssue(
+        code=code,
+        message=message,
+        severity=severity,  # type: ignore[arg-type]
+        column=column,
+        rows=[int(row) for row in rows],
+    ))
+
+
+def _check_structure(table: ThermoTable, issues: List[TableIssue]) -> int:
+    '''
+    Check the alignment of the STRUCTURE lists and return the number of columns.
+    '''
+    structure = table.structure
+    columns = len(structure.columns)
+    if not columns:
+        _issue(issues, "structure", "STRUCTURE.COLUMNS is missing or empty")
+        return 0
+    lists = {"SYMBOL": structure.symbol, "UNIT": structure.unit}
+    if table.kind == "data":
+        lists["CONVERSION"] = structure.conversion or []
+    for key, items in lists.items():
+        if len(items) != columns:
+            _issue(
+                issues, "structure_alignment",
+                f"STRUCTURE.{key} has {len(items)} entries for {columns} COLUMNS")
+
+    if [str(column) for column in structure.columns[:4]] != FIXED_COLUMNS:
+        _issue(
+            issues, "fixed_columns",
+            f"STRUCTURE.COLUMNS must start with {FIXED_COLUMNS}")
+    if table.kind == "equations" and structure.columns[-1] != EQ_COLUMN:
+        _issue(
+            issues, "eq_column",
+            f"STRUCTURE.COLUMNS of an equation table must end with {EQ_COLUMN}")
+
+    # NOTE: conversion factors of the properties are numbers
+    if table.kind == "data" and structure.conversion:
+        factors = structure.conversion[4:]
+        bad = [
+            str(column) for column, factor in zip(structure.columns[4:], factors)
+            if not isinstance(factor, (int, float)) or isinstance(factor, bool)
+        ]
+        if bad:
+            _issue(
+                issues, "conversion",
+                f"STRUCTURE.CONVERSION of {', '.join(bad)} must be numbers")
+    return columns
+
+
+def _check_symbols(table: ThermoTable, issues: List[TableIssue]):
+    '''
+    Check the symbols of the properties and of the equation references.
+    '''
+    structure = table.structure
+    if table.kind == "data":
+        # NOTE: the fallback rule allows other short symbols
+        for column, symbol in zip(structure.columns[4:], structure.symbol[4:]):
+            if symbol is None:
+                _issue(
+                    issues, "missing_symbol", f"Column {column} has no symbol",
+                    column=str(column))
+            elif str(symbol) not in KNOWN_SYMBOLS:
+                _issue(
+                    issues, "unknown_symbol",
+                    f"Symbol {symbol} of {column} is not in THERMODYNAMIC_SYMBOLS",
+                    severity="warning", column=str(column))
+        return
+
+    # NOTE: parameters of the bodies must be columns of the table
+    symbols = {str(symbol) for symbol in structure.symbol if symbol is not None}
+    columns = {str(column) for column in structure.columns}
+    for equation in table.equations:
+        if not equation.body:
+            _issue(issues, "body", f"{equation.name} has no BODY")
+            continue
+        if not any("res[" in line for line in equation.body):
+            _issue(issues, "body", f"BODY of {equation.name} does not assign res[...]")
+        for kind, key in _REFERENCE.findall("\n".join(equation.body)):
+            symbol = reference_symbol(key)
+            if kind == "parms" and symbol not in symbols and symbol not in columns:
+                _issue(
+                    issues, "unknown_parameter",
+                    f"parms['{key}'] of {equation.name} is not in STRUCTURE")
+            elif kind == "args" and symbol not in KNOWN_SYMBOLS:
+                _issue(
+                    issues, "unknown_symbol",
+                    f"args['{key}'] of {equation.name} is not in THERMODYNAMIC_SYMBOLS",
+                    severity="warning")
+
+
+def _check_values(table: ThermoTable, columns: int, issues: List[TableIssue]):
+    '''
+    Check the VALUES rows column by column, on arrays of cell type codes.
+    '''
+    values = table.values
+    if not values:
+        _issue(issues, "values", "VALUES is missing or empty")
+        return
+    names = [str(column) for column in table.structure.columns]
+
+    # SECTION: row widths
+    widths = np.fromiter(
+        (len(row) if isinstance(row, list) else -1 for row in values),
+        dtype=np.int64, count=len(values))
+    bad = np.flatnonzero(widths != columns)
+    if bad.size:
+        _issue(
+            issues, "row_width", f"VALUES rows must have {columns} entries",
+            rows=bad)
+    good = np.flatnonzero(widths == columns)
+    if not good.size or columns < 4:
+        return
+    rows = [values[i] for i in good] if bad.size else values
+
+    # SECTION: cell types, one pass over the flattened rows
+    flat = list(chain.from_iterable(rows))
+    codes = np.fromiter(
+        (_TYPE_CODES.get(type(cell), OTHER) for cell in flat),
+        dtype=np.int8, count=len(flat)).reshape(len(rows), columns)
+    numeric = (codes == INT) | (codes == FLOAT)
+
+    # NOTE: No. is an integer, unique and increasing
+    numbers = codes[:, 0] == INT
+    if not numbers.all():
+        _issue(
+            issues, "not_numeric", "No. must be an integer", column="No.",
+            rows=good[~numbers])
+    else:
+        index = np.fromiter(
+            (row[0] for row in rows), dtype=np.int64, count=len(rows))
+        if index.size > 1 and not (np.diff(index) > 0).all():
+            _issue(
+                issues, "row_numbers", "No. must be unique and increasing",
+                severity="warning", column="No.")
+
+    # NOTE: Name and Formula are text
+    for j in (1, 2):
+        text = codes[:, j] == STR
+        if not text.all():
+            _issue(
+                issues, "not_text", f"{names[j]} must be text", column=names[j],
+                rows=good[~text])
+
+    # NOTE: State in g, l, s, null when unknown
+    states = np.array([row[3] for row in rows], dtype=object)
+    state = np.logical_or.reduce([states == value for value in STATES])
+    unknown = codes[:, 3] == NONE
+    if not (state | unknown).all():
+        _issue(
+            issues, "state", f"State must be one of {', '.join(STATES)}",
+            column="State", rows=good[~(state | unknown)])
+    if unknown.any():
+        _issue(
+            issues, "missing_value", "State has null values", severity="warning",
+            column="State", rows=good[unknown])
+
+    # SECTION: numeric columns
+    last = columns - 1 if table.kind == "equations" else columns
+    missing = codes[:, 4:last] == NONE
+    wrong = ~numeric[:, 4:last] & ~missing
+    for j in np.flatnonzero(wrong.any(axis=0)):
+        _issue(
+            issues, "not_numeric", f"{names[4 + j]} must be numeric",
+            column=names[4 + j], rows=good[wrong[:, j]])
+    for j in np.flatnonzero(missing.any(axis=0)):
+        _issue(
+            issues, "missing_value", f"{names[4 + j]} has null values",
+            severity="warning", column=names[4 + j], rows=good[missing[:, j]])
+
+    # NOTE: non-finite numbers
+    floats = codes == FLOAT
+    if floats.any():
+        cells = np.array(flat, dtype=object).reshape(len(rows), columns)
+        finite = np.ones(floats.shape, dtype=bool)
+        finite[floats] = np.isfinite(cells[floats].astype(np.float64))
+        for j in np.flatnonzero(~finite.all(axis=0)):
+            _issue(
+                issues, "not_finite", f"{names[j]} has infinite or NaN values",
+                column=names[j], rows=good[~finite[:, j]])
+
+    # SECTION: equation indices
+    if table.kind == "equations":
+        eq = codes[:, -1] == INT
+        if not eq.all():
+            _issue(
+                issues, "eq_index", f"{EQ_COLUMN} must be an integer",
+                column=EQ_COLUMN, rows=good[~eq])
+        elif table.equations:
+            index = np.fromiter(
+                (row[-1] for row in rows), dtype=np.int64, count=len(rows))
+            # NOTE: EQ-<k> is equation k, else equations count from 1
+            known = np.array([
+                int(match.group(1)) if match else position
+                for position, match in enumerate(
+                    (EQ_NUMBER.search(equation.name) for equation in table.equations),
+                    start=1)
+            ], dtype=np.int64)
+            found = np.isin(index, known)
+            if not found.all():
+                _issue(
+                    issues, "eq_index",
+                    f"{EQ_COLUMN} must be the index of an equation of EQUATIONS",
+                    column=EQ_COLUMN, rows=good[~found])
+
+
+def validate_table(table: ThermoTable) -> ThermoTable:
+    '''
+    Validate a parsed table against the YAML schema of the agents.
+
+    Checks the alignment of STRUCTURE (COLUMNS, SYMBOL, UNIT and, for data tables,
+    CONVERSION), the fixed columns, the width of the VALUES rows, the types of the
+    cells (integer No., text Name and Formula, numeric properties, parameters and
+    constants), State in g, l, s, the equation indices, the symbols of the properties
+    and the parameters referenced by the equation bodies. The cells are checked per
+    column on arrays, so thousands of rows validate in milliseconds.
+
+    Parameters
+    ----------
+    table : ThermoTable
+        The table, as parsed by `parse_tables`.
+
+    Returns
+    -------
+    ThermoTable
+        The same table, with `issues` and `valid` set.
+    '''
+    issues: List[TableIssue] = []
+    if table.kind == "equations" and not table.equations:
+        _issue(issues, "equations", "EQUATIONS has no equation")
+    columns = _check_structure(table, issues)
+    _check_symbols(table, issues)
+    _check_values(table, columns, issues)
+    table.issues = issues
+    table.valid = not any(issue.severity == "error" for issue in issues)
+    return table
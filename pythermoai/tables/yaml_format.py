@@ -0,0 +1,44 @@
+# import libs
+import json
+import re
+from typing import Any
+
+# NOTE: spellings of an empty cell
+NULLS = {"", "-", "--", "—", "–", "n/a", "na", "null", "none", "nan", "?"}
+
+# NOTE: flow items written without quotes
+_PLAIN = re.compile(r"^[A-Za-z0-9_.()\-+/ ]+$")
+
+
+def format_number(value: float) -> str:
+    '''
+    Format a number of a YAML table, with 10 significant digits.
+    '''
+    text = f"{value:.10g}"
+    # NOTE: YAML needs a dot in the mantissa to read 1e-05 as a float
+    if "e" in text and "." not in text.split("e")[0]:
+        mantissa, exponent = text.split("e")
+        text = f"{mantissa}.0e{exponent}"
+    return text
+
+
+def flow_item(item: Any) -> str:
+    '''
+    Format an item of a STRUCTURE list (COLUMNS, SYMBOL, UNIT, CONVERSION), quoted
+    only when needed.
+    '''
+    if item is None:
+        return "None"
+    text = str(item)
+    return text if _PLAIN.match(text) else json.dumps(text, ensure_ascii=False)
+
+
+def flow_value(item: Any) -> str:
+    '''
+    Format a cell of a VALUES row: numbers as numbers, null, or a quoted string.
+    '''
+    if item is None:
+        return "null"
+    if isinstance(item, (int, float)):
+        return format_number(item)
+    return json.dumps(item, ensure_ascii=False)
@@ -1,9 +1,33 @@
 from .loader import load_yaml_file
 # message
-from .message_manager import agent_message_analyzer, message_token_counter
+from .message_manager import (
+    agent_message_analyzer,
+    message_token_counter,
+    current_turn_messages
+)
+# serialization
+from .serialization import (
+    json_dumps,
+    message_to_dict,
+    chat_message_to_dict,
+    agent_message_to_dict,
+    encode_chat_message,
+    encode_agent_message,
+    FastJSONResponse,
+    ChatMessageResponse
+)
 
 __all__ = [
     "load_yaml_file",
     "agent_message_analyzer",
     "message_token_counter",
+    "current_turn_messages",
+    "json_dumps",
+    "message_to_dict",
+    "chat_message_to_dict",
+    "agent_message_to_dict",
+    "encode_chat_message",
+    "encode_agent_message",
+    "FastJSONResponse",
+    "ChatMessageResponse",
 ]
@@ -154,6 +154,7 @@ def message_token_counter(
 
         # SECTION: create TokenMetadata
         # NOTE: access to usage_metadata
+        usage_metadata = None
         if isinstance(message, AIMessage):
             # get response metadata to check for usage metadata
             if hasattr(message, 'usage_metadata'):
@@ -182,3 +183,27 @@ def message_token_counter(
         logger.error(f"Error counting tokens: {e}")
         raise HTTPException(
             status_code=500, detail="Failed to count tokens") from e
+
+
+def current_turn_messages(
+    messages: List[Union[ToolMessage, AIMessage, HumanMessage, SystemMessage]]
+) -> List[Union[ToolMessage, AIMessage, HumanMessage, SystemMessage]]:
+    """
+    Returns the messages produced by the current turn of a thread.
+
+    Parameters
+    ----------
+    messages : List[Union[ToolMessage, AIMessage, HumanMessage, SystemMessage]]
+        The full message list of the thread, as returned in the agent state.
+
+    Returns
+    -------
+    List[Union[ToolMessage, AIMessage, HumanMessage, SystemMessage]]
+        The messages after the last user message, i.e. the agent and tool messages
+        produced in reply to it.
+    """
+    # NOTE: a turn starts with the user message
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return messages[index + 1:]
+    return list(messages)
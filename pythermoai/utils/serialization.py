@@ -0,0 +1,165 @@
+# import libs
+import logging
+import json
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Tuple
+)
+from pydantic import BaseModel
+from fastapi.responses import JSONResponse
+from langchain_core.messages import BaseMessage
+# local
+from ..models import ChatMessage, AgentMessage
+
+# NOTE: logger
+logger = logging.getLogger(__name__)
+
+# SECTION: json backend
+# NOTE: orjson is installed with langsmith, fall back to the standard library
+try:
+    import orjson
+
+    def _backend_dumps(obj: Any, default: Callable[[Any], Any]) -> bytes:
+        return orjson.dumps(
+            obj,
+            default=default,
+            option=orjson.OPT_NON_STR_KEYS
+        )
+
+    JSON_BACKEND = "orjson"
+except ImportError:  # pragma: no cover
+    def _backend_dumps(obj: Any, default: Callable[[Any], Any]) -> bytes:
+        return json.dumps(
+            obj,
+            default=default,
+            ensure_ascii=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+
+    JSON_BACKEND = "json"
+
+# SECTION: precomputed encoders
+# NOTE: field names per model class, resolved once per class
+_FIELDS_CACHE: Dict[type, Tuple[str, ...]] = {}
+
+
+def _model_fields(cls: type) -> Tuple[str, ...]:
+    """Return the field names of a pydantic model class (cached)."""
+    fields = _FIELDS_CACHE.get(cls)
+    if fields is None:
+        fields = tuple(cls.model_fields.keys())  # type: ignore[attr-defined]
+        _FIELDS_CACHE[cls] = fields
+    return fields
+
+
+def message_to_dict(message: BaseMessage) -> Dict[str, Any]:
+    """
+    Convert a LangChain message into a JSON-ready dictionary.
+
+    Parameters
+    ----------
+    message : BaseMessage
+        A message object from the LangChain library.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The message fields, as produced by `model_dump`.
+    """
+    return {
+        name: getattr(message, name)
+        for name in _model_fields(type(message))
+    }
+
+
+def _default(obj: Any) -> Any:
+    """Fallback encoder for values the json backend does not support."""
+    if isinstance(obj, BaseMessage):
+        return message_to_dict(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", errors="replace")
+    return str(obj)
+
+
+def chat_message_to_dict(chat_message: ChatMessage) -> Dict[str, Any]:
+    """
+    Convert a ChatMessage into a JSON-ready dictionary.
+
+    Parameters
+    ----------
+    chat_message : ChatMessage
+        The chat message, its messages may hold LangChain message objects.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The chat message fields with messages converted to dictionaries.
+    """
+    data = {
+        name: getattr(chat_message, name)
+        for name in _model_fields(ChatMessage)
+    }
+    messages = data.get("messages")
+    if messages:
+        data["messages"] = [
+            message_to_dict(m) if isinstance(m, BaseMessage) else m
+            for m in messages
+        ]
+    return data
+
+
+def agent_message_to_dict(agent_message: AgentMessage) -> Dict[str, Any]:
+    """
+    Convert an AgentMessage into a JSON-ready dictionary.
+    """
+    return {
+        name: getattr(agent_message, name)
+        for name in _model_fields(AgentMessage)
+    }
+
+
+def json_dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to JSON bytes with the fast backend.
+
+    LangChain messages and pydantic models nested anywhere in the object are encoded
+    as dictionaries.
+    """
+    return _backend_dumps(obj, _default)
+
+
+def encode_chat_message(chat_message: ChatMessage) -> bytes:
+    """Serialize a ChatMessage to JSON bytes."""
+    return json_dumps(chat_message_to_dict(chat_message))
+
+
+def encode_agent_message(agent_message: AgentMessage) -> str:
+    """Serialize an AgentMessage to a JSON text frame."""
+    return json_dumps(agent_message_to_dict(agent_message)).decode("utf-8")
+
+
+# SECTION: responses
+class FastJSONResponse(JSONResponse):
+    '''
+    JSON response rendered with the fast json backend.
+    '''
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+class ChatMessageResponse(FastJSONResponse):
+    '''
+    JSON response for a ChatMessage, bypassing FastAPI's generic `jsonable_encoder`.
+    '''
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, ChatMessage):
+            return encode_chat_message(content)
+        return json_dumps(content)
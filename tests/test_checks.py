@@ -0,0 +1,42 @@
+# import libs
+import pytest
+from pythermoai.agents import EQUATIONS_AGENT_PROMPT
+from pythermoai.tables import check_columns, check_table, repair_tables
+
+
+@pytest.fixture
+def example_table():
+    # NOTE: the vapor pressure example of the equations agent prompt
+    text = EQUATIONS_AGENT_PROMPT.split(
+        "EXAMPLE (Vapor Pressure, Ambrose-Walton form)\n")[1].split("\n\nGUARDRAILS")[0]
+    repair = repair_tables(text)
+    assert repair.valid
+    return repair.tables[0]
+
+
+def test_finds_check_columns(example_table):
+    names = example_table.structure.columns
+    assert [
+        (names[column], names[argument], symbol)
+        for column, argument, symbol in check_columns(example_table)
+    ] == [("VaPr(Tmin)", "Tmin", "VaPr"), ("VaPr(Tmax)", "Tmax", "VaPr")]
+
+
+def test_prompt_example_passes(example_table):
+    table = check_table(example_table)
+    assert table.valid
+    assert len(table.checks) == len(table.values)
+    assert all(check.passed for check in table.checks)
+    assert all(check.max_relative_error < 0.01 for check in table.checks)
+    assert not [issue for issue in table.issues if issue.code == "self_check"]
+
+
+def test_wrong_parameter_fails(example_table):
+    # NOTE: C1 of carbon dioxide off by 10
+    example_table.values[0][4] += 10
+    table = check_table(example_table)
+    assert not table.valid
+    assert [check.passed for check in table.checks] == [False, True, True, True]
+    issues = [issue for issue in table.issues if issue.code == "self_check"]
+    assert [issue.column for issue in issues] == ["VaPr(Tmin)", "VaPr(Tmax)"]
+    assert all(issue.rows == [0] for issue in issues)
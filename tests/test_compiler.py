@@ -0,0 +1,44 @@
+# import libs
+import time
+import numpy as np
+import pytest
+from pythermoai.tables import BodyCompileError, compile_body
+
+
+def test_evaluates_body_vectorized():
+    compiled = compile_body([
+        "x = args['T'] * 2",
+        "res['y | y | 1'] = x + pi + math.sqrt(parms['a'])",
+    ])
+    results = compiled({"T": np.arange(3)}, {"a": 4})
+    np.testing.assert_allclose(results["y"], np.arange(3) * 2 + np.pi + 2)
+
+
+def test_compiled_body_is_cached():
+    body = ["res['y | y | 1'] = args['T'] + 1"]
+    assert compile_body(body) is compile_body(list(body))
+
+
+# NOTE: anything outside the whitelist is rejected at compile time
+@pytest.mark.parametrize("body", [
+    "import os",
+    "res['a | b | c'] = __import__('os')",
+    "res['x'] = args['T'].real",
+    "res['x'] = ().__class__",
+    "res['x'] = math.system(1)",
+    "args['T'] = 1",
+    "res['x'] = 'a'",
+    "res['x'] = [t for t in args['T']]",
+    "res['x'] = lambda: 1",
+])
+def test_rejects_disallowed_nodes(body):
+    with pytest.raises(BodyCompileError):
+        compile_body([body])
+
+
+def test_large_powers_do_not_hang():
+    start = time.perf_counter()
+    compiled = compile_body(["res['x | x | 1'] = 9**9**9**9"])
+    result = compiled({}, {})["x"]
+    assert time.perf_counter() - start < 1.0
+    assert not np.isfinite(result)
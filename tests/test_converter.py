@@ -0,0 +1,44 @@
+# import libs
+import pytest
+from pythermoai.tables import convert_table
+
+
+def test_converts_to_standard_units():
+    conversion = convert_table(
+        "Name,Tc (K),Pc\nMethane,190.6,45.99 bar\nEthane,305.3,4.872 MPa")
+    assert conversion.complete
+    assert conversion.units[4:] == ["K", "MPa"]
+    assert [row[4:] for row in conversion.rows] == [[190.6, 4.599], [305.3, 4.872]]
+
+
+def test_dimensionless_column_needs_no_unit():
+    conversion = convert_table(
+        "Name,Tc (K),Acentric factor\nMethane,190.6,0.011\nEthane,305.3,0.099")
+    assert conversion.complete
+    assert conversion.units[4:] == ["K", "1"]
+
+
+# NOTE: one unknown unit leaves the whole column as it is, never relabelled
+def test_unknown_unit_leaves_column_unconverted():
+    conversion = convert_table(
+        "Name,Tc (K),Pc\nMethane,190.6,45.99 bar\nEthane,305.3,48.72 zz")
+    assert not conversion.complete
+    assert conversion.unresolved == ["Critical-Pressure"]
+    assert conversion.units[4:] == ["K", None]
+    assert [row[5] for row in conversion.rows] == [45.99, 48.72]
+    assert conversion.warnings == ["Unknown unit 'zz' of Critical-Pressure"]
+
+
+@pytest.mark.parametrize("raw", [
+    # no unit in the header
+    "Name,Tc,Pc (bar)\nMethane,190.6,45.99\nEthane,305.3,48.72",
+    # no unit in one of the cells
+    "Name,Tc,Pc (bar)\nMethane,190.6 K,45.99\nEthane,305.3,48.72",
+])
+def test_missing_unit_is_not_assumed(raw):
+    conversion = convert_table(raw)
+    assert not conversion.complete
+    assert conversion.unresolved == ["Critical-Temperature"]
+    assert [row[4] for row in conversion.rows] == [190.6, 305.3]
+    # NOTE: the other column is still converted
+    assert conversion.units[5] == "MPa"
@@ -0,0 +1,51 @@
+# import libs
+import pytest
+from pythermoai.agents.fast_path import (
+    RAW_EQUATIONS,
+    RAW_TABLE,
+    detect_raw_input
+)
+from pythermoai.agents.prompts import DATA_FAST_PATH_PROMPT
+
+
+# NOTE: messages carrying the equations to format
+@pytest.mark.parametrize("content", [
+    "Reformat: ln(P) = A + B/T + C*ln(T) for water, A=73.6, B=-7258, C=-7.3",
+    "P = A - B/(T + C), A=1, B=2, C=3",
+    "Cp = A + B*T + C*T**2 with A=1",
+    "res['x'] = parms['a'] * args['T']",
+])
+def test_detects_correlations(content):
+    assert detect_raw_input(content, RAW_EQUATIONS)
+
+
+# NOTE: requests the agent must answer with its tools
+@pytest.mark.parametrize("content", [
+    "Find the Antoine equation for water, T = 273-373 K",
+    "Give the Antoine equation for water, T = 273-373 K",
+    "Search the vapor pressure, P = A - B/(T + C)",
+    "Cp = 75.3 J/mol/K for water",
+    "x = 5",
+])
+def test_ignores_requests_without_correlation(content):
+    assert not detect_raw_input(content, RAW_EQUATIONS)
+
+
+def test_detects_pasted_table():
+    content = "Name,Tc (K)\nMethane,190.6\nEthane,305.3"
+    assert detect_raw_input(content, RAW_TABLE)
+
+
+@pytest.mark.parametrize("content", [
+    "Find Tc of these: Name,Tc (K)\nMethane,190.6\nEthane,305.3",
+    "What is the critical temperature of methane?",
+])
+def test_ignores_lookups_and_questions(content):
+    assert not detect_raw_input(content, RAW_TABLE)
+
+
+# NOTE: the model answers in the same units as the local converter
+def test_data_prompt_asks_for_standard_units():
+    assert "UNIT → the standard unit" in DATA_FAST_PATH_PROMPT
+    assert "'critical_pressure': 'MPa'" in DATA_FAST_PATH_PROMPT
+    assert "'critical_temperature': 'K'" in DATA_FAST_PATH_PROMPT
@@ -0,0 +1,65 @@
+# import libs
+import asyncio
+import pytest
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+from pythermoai.llms import (
+    CascadeChatModel,
+    FakeChatModel,
+    HedgedChatModel,
+    ResilientChatModel
+)
+from pythermoai.models import CascadePolicy, HedgingPolicy
+
+# NOTE: streamed one word per chunk by the fake model
+ANSWER = "the critical temperature of methane is 190.6 K"
+
+
+@tool
+def search(query: str) -> str:
+    """Search thermodynamic data."""
+    return "nothing"
+
+
+def fake_model() -> FakeChatModel:
+    return FakeChatModel(responses=[ANSWER])
+
+
+def routing_models():
+    return {
+        "resilient": ResilientChatModel(
+            candidates=[fake_model(), fake_model()],
+            labels=["fake/primary", "fake/fallback"]),
+        "hedged": HedgedChatModel(
+            primary=fake_model(), hedge=fake_model(),
+            label="fake/primary", hedge_label="fake/hedge", policy=HedgingPolicy()),
+        "cascade": CascadeChatModel(
+            small=fake_model(), large=fake_model(),
+            small_label="fake/small", large_label="fake/large",
+            policy=CascadePolicy(model_provider="fake", model_name="small")),
+    }
+
+
+async def count_chunks(model) -> int:
+    agent = create_react_agent(model, [search])
+    chunks = 0
+    async for message, _ in agent.astream(
+            {"messages": "Critical temperature of methane?"}, stream_mode="messages"):
+        if message.type == "AIMessageChunk":
+            chunks += 1
+    return chunks
+
+
+# NOTE: with tools bound, the inner models must not stream through the run's callbacks
+@pytest.mark.parametrize("name", ["resilient", "hedged", "cascade"])
+def test_tokens_streamed_once_with_tools(name):
+    expected = asyncio.run(count_chunks(fake_model()))
+    assert expected >= len(ANSWER.split(" "))
+    assert asyncio.run(count_chunks(routing_models()[name])) == expected
+
+
+@pytest.mark.parametrize("name", ["resilient", "hedged", "cascade"])
+def test_bound_tools_reach_inner_model(name):
+    model = routing_models()[name].bind_tools([search])
+    chunks = [chunk.content for chunk in model.stream("Critical temperature of methane?")]
+    assert "".join(chunks) == ANSWER